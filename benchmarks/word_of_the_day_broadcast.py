@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Measures the CPU time of queueing the word of the day for many subscribers, each one sent the message and its photo,
+with the HTTP layer stubbed to return a canned response, before and after the payloads were serialized only once.
+
+Run it from the root of the repository:
+
+    python benchmarks/word_of_the_day_broadcast.py [recipients]
+"""
+
+import json
+import pathlib
+import sys
+import time
+import typing
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / 'src'))
+
+import telegram  # noqa: E402
+
+import queue_bot  # noqa: E402
+
+DEFAULT_RECIPIENTS = 100_000
+
+RESPONSE = json.dumps({
+    'ok': True,
+    'result': {
+        'message_id': 1,
+        'date': 0,
+        'chat': {
+            'id': 1,
+            'type': 'private'
+        },
+        'text': ''
+    }
+}).encode()
+
+HTML = '<b>Cuvântul zilei 19.10.2026:</b>\n\n' + 'definiție <i>lungă</i> ' * 150
+IMAGE_URL = 'https://dexonline.ro/img/wotd/cuvantul-zilei.jpg'
+CAPTION = '© imagine autor'
+
+REPLY_MARKUP = telegram.InlineKeyboardMarkup([[
+    telegram.InlineKeyboardButton('🔗: on', callback_data='w12026/10/19'),
+    telegram.InlineKeyboardButton('Oprește', callback_data='s03')
+]])
+
+
+class StubRequest(queue_bot.QueueRequest):
+    """
+    Keeps the bodies of the requests instead of posting them.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.bodies: typing.List[bytes] = []
+
+    def _request_wrapper(self, *args, **kwargs) -> bytes:
+        self.bodies.append(kwargs['body'])
+
+        return RESPONSE
+
+
+def get_bot(request: StubRequest) -> queue_bot.QueueBot:
+    bot = queue_bot.QueueBot(token='123:abc', request=request, exception_handler=print)
+
+    # The messages are sent right away, so that the rate limiting of the queue isn't measured.
+    bot._is_messages_queued_default = False
+
+    return bot
+
+
+def broadcast_messages(bot: queue_bot.QueueBot, recipients: int) -> None:
+    """
+    Each message goes through the parameters handling of python-telegram-bot, like the broadcast used to.
+    """
+
+    for chat_id in range(recipients):
+        bot.queue_message(
+            chat_id=chat_id,
+            text=HTML,
+            reply_markup=REPLY_MARKUP,
+            parse_mode=telegram.ParseMode.HTML,
+            disable_web_page_preview=True,
+            disable_notification=True
+        )
+
+        bot.queue_photo(
+            chat_id=chat_id,
+            photo=IMAGE_URL,
+            caption=CAPTION,
+            disable_notification=True
+        )
+
+
+def broadcast_payloads(bot: queue_bot.QueueBot, recipients: int) -> None:
+    """
+    The payloads are built like in `main.get_word_of_the_day_payloads`.
+    """
+
+    payloads = [
+        queue_bot.BroadcastPayload('sendMessage', {
+            'text': HTML,
+            'reply_markup': REPLY_MARKUP.to_dict(),
+            'parse_mode': telegram.ParseMode.HTML,
+            'disable_web_page_preview': True,
+            'disable_notification': True
+        }),
+        queue_bot.BroadcastPayload('sendPhoto', {
+            'photo': IMAGE_URL,
+            'caption': CAPTION,
+            'disable_notification': True
+        })
+    ]
+
+    for chat_id in range(recipients):
+        for payload in payloads:
+            bot.queue_payload(
+                chat_id=chat_id,
+                payload=payload
+            )
+
+
+def measure(broadcast: typing.Callable[[queue_bot.QueueBot, int], None], recipients: int) -> typing.Tuple[float, typing.Dict[str, typing.Any]]:
+    """
+    Returns the CPU time of the broadcast, and the last message it sent.
+    """
+
+    request = StubRequest()
+    bot = get_bot(request)
+
+    started_at = time.process_time()
+
+    broadcast(bot, recipients)
+
+    duration = time.process_time() - started_at
+
+    # The threads of the message queue would keep the process running.
+    bot.stop()
+
+    return (duration, json.loads(request.bodies[-2]))
+
+
+def main() -> None:
+    recipients = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_RECIPIENTS
+
+    (messages_duration, message) = measure(broadcast_messages, recipients)
+    (payloads_duration, payload) = measure(broadcast_payloads, recipients)
+
+    # python-telegram-bot serializes the keyboard as a string inside the body.
+    if payload['text'] != message['text'] or payload['reply_markup'] != json.loads(message['reply_markup']):
+        sys.exit('The payloads differ from the messages.')
+
+    for (name, duration) in (('messages', messages_duration), ('payloads', payloads_duration)):
+        print(f'{name}: {duration:.2f} s of CPU for {recipients:,} recipients ({duration / recipients * 1e6:.1f} µs each)')
+
+
+if __name__ == '__main__':
+    main()
@@ -33,6 +33,24 @@ class GlobalConfig:
         'complete_definition.py',
         'queue_bot.py',
         'queue_updater.py',
+        'json_stream.py',
+        'lemmas.py',
+        'inline_queries.py',
+        'stats.py',
+        'negative_cache.py',
+        'rendered_cache.py',
+        'callback_data.py',
+        'keyboards.py',
+        'inline_answers.py',
+        'updates.py',
+        'webhook_replies.py',
+        'lanes.py',
+        'rate_limits.py',
+        'supervisor.py',
+        'startup.py',
+        'response_cache.py',
+        'circuit_breaker.py',
+        'hedging.py',
 
         'config.cfg'
     ]
@@ -5,10 +5,12 @@ import logging
 import typing
 
 import requests
-import requests_cache
-import telegram.ext
+import requests.adapters
+import telegram
 
 import constants
+import lanes
+import stats
 
 logger = logging.getLogger(__name__)
 
@@ -21,24 +23,42 @@ class AnalyticsType(enum.Enum):
 
 
 class AnalyticsHandler:
-    def __init__(self) -> None:
+    def __init__(self, yields_to: typing.Optional[lanes.Lane] = None) -> None:
         self.googleToken: typing.Optional[str] = None
         self.userAgent: typing.Optional[str] = None
 
-    def __google_track(self, analytics_type: AnalyticsType, user: telegram.User, data: str) -> None:
-        if not self.googleToken:
-            return
+        # The hits are sent in the background, without the dexonline cache, and are the first work dropped under load.
+        self.lane = lanes.Lane(
+            name='analytics',
+            workers=constants.ANALYTICS_LANE_WORKERS,
+            max_size=constants.ANALYTICS_LANE_SIZE,
+            yields_to=yields_to
+        )
+        self.__session = requests.Session()
 
+        self.__session.mount('https://', requests.adapters.HTTPAdapter(
+            pool_maxsize=constants.ANALYTICS_LANE_WORKERS
+        ))
+
+    def __google_track(self, analytics_type: AnalyticsType, user: telegram.User, data: str) -> None:
         url = constants.GOOGLE_ANALYTICS_BASE_URL.format(self.googleToken, user.id, analytics_type.value, data)
 
-        with requests_cache.disabled():
-            response = requests.get(url, headers={'User-Agent': self.userAgent or 'TelegramBot'})
+        try:
+            response = self.__session.get(url, headers={'User-Agent': self.userAgent or 'TelegramBot'})
+        except requests.RequestException as error:
+            logger.error(f'Google analytics error: {error}')
 
-            if response.status_code != 200:
-                logger.error(f'Google analytics error: {response.status_code}')
+            return
+
+        if response.status_code != 200:
+            logger.error(f'Google analytics error: {response.status_code}')
+
+    def track(self, analytics_type: AnalyticsType, user: telegram.User, data='') -> None:
+        if not self.googleToken:
+            return
 
-    def track(self, context: telegram.ext.CallbackContext, analytics_type: AnalyticsType, user: telegram.User, data='') -> None:
         if data is None:
             data = ''
 
-        context.dispatcher.run_async(self.__google_track, analytics_type, user, data)
+        if not self.lane.submit(self.__google_track, analytics_type, user, data):
+            stats.increment(constants.STATS_SHED_ANALYTICS)
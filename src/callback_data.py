@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import collections
+import datetime
+import hashlib
+import json
+import threading
+import time
+import typing
+
+import constants
+
+CallbackData = typing.Optional[typing.Dict[str, typing.Any]]
+Payload = typing.Dict[str, typing.Any]
+
+_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+_EMPTY_PREFIX = 'n'
+_DEFINITION_PREFIX = 'p'
+_WORD_OF_THE_DAY_PREFIX = 'w'
+_SUBSCRIPTION_PREFIX = 's'
+_SUBSCRIPTION_ONBOARDING_PREFIX = 'o'
+_TOKEN_PREFIX = 't'
+
+_QUERY_SEPARATOR = ':'
+
+_TOKEN_DIGEST_SIZE = 9
+
+
+def _encode_number(number: int) -> str:
+    if number == 0:
+        return _DIGITS[0]
+
+    digits: typing.List[str] = []
+
+    while number > 0:
+        (number, remainder) = divmod(number, len(_DIGITS))
+
+        digits.append(_DIGITS[remainder])
+
+    return ''.join(reversed(digits))
+
+
+def _decode_number(text: str) -> int:
+    # `int` also accepts signs, underscores and whitespace, which are never encoded.
+    if not text or any(digit not in _DIGITS for digit in text):
+        raise ValueError(f'Invalid number: {text!r}')
+
+    return int(text, len(_DIGITS))
+
+
+def _encode_flag(flag: bool) -> str:
+    return '1' if flag else '0'
+
+
+def _decode_flag(text: str) -> bool:
+    if text not in ('0', '1'):
+        raise ValueError(f'Invalid flag: {text!r}')
+
+    return text == '1'
+
+
+class CallbackDataCodec:
+    """
+    Encodes the inline keyboard buttons payloads as short strings made of a one character prefix followed by the
+    positional fields of the payload, instead of JSON objects. Payloads that still don't fit in the callback data
+    limit are stored in memory under a token derived from their hash, so that rendering the same buttons again reuses
+    the same token, and the least recently used ones are forgotten first.
+    The tokens that aren't in memory yet are also saved with `save_payload`, and the ones that aren't in memory
+    anymore are loaded with `load_payload`, so that they can be shared by several processes. The tokens that are
+    rendered again are saved again at most every `save_interval`, so that the stored ones that are still used stay
+    recent.
+    Decoding returns the same dictionaries that used to be serialized as JSON, which are still accepted for the
+    buttons of the messages sent before.
+    """
+
+    def __init__(self, max_tokens: int, save_payload: typing.Optional[typing.Callable[[str, Payload], None]] = None, load_payload: typing.Optional[typing.Callable[[str], typing.Optional[Payload]]] = None, save_interval: datetime.timedelta = datetime.timedelta(0)) -> None:
+        self._max_tokens = max_tokens
+        self._save_payload = save_payload
+        self._load_payload = load_payload
+        self._save_interval = save_interval.total_seconds()
+
+        self._payloads: typing.OrderedDict[str, Payload] = collections.OrderedDict()
+        self._saved_at: typing.Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def _remember(self, token: str, payload: Payload, is_saving=False) -> bool:
+        """
+        Returns whether the token needs to be saved, because this process hasn't saved it yet, or it saved it too long
+        ago. When `is_saving`, the caller saves it then.
+        """
+
+        now = time.monotonic()
+
+        with self._lock:
+            saved_at = self._saved_at.get(token)
+            is_save_needed = saved_at is None or now - saved_at >= self._save_interval
+
+            self._payloads[token] = payload
+            self._payloads.move_to_end(token)
+
+            if is_saving and is_save_needed:
+                self._saved_at[token] = now
+
+            while len(self._payloads) > self._max_tokens:
+                (forgotten_token, _payload) = self._payloads.popitem(last=False)
+
+                self._saved_at.pop(forgotten_token, None)
+
+        return is_save_needed
+
+    def _fit(self, data: str, payload: Payload) -> str:
+        if len(data.encode()) <= constants.CALLBACK_DATA_LENGTH_LIMIT:
+            return data
+
+        digest = hashlib.blake2b(data.encode(), digest_size=_TOKEN_DIGEST_SIZE).digest()
+        token = base64.urlsafe_b64encode(digest).decode()
+
+        # The answers that embed the token are cached, and stored tokens are deleted by how recently they were saved.
+        if self._remember(token, payload, is_saving=self._save_payload is not None) and self._save_payload is not None:
+            self._save_payload(token, payload)
+
+        return f'{_TOKEN_PREFIX}{token}'
+
+    def get_snapshot(self) -> typing.List[typing.Any]:
+        """
+        The tokens and their payloads, from the least recently used, so that the buttons of the messages sent before a
+        restart keep working.
+        """
+
+        with self._lock:
+            return [[token, payload] for (token, payload) in self._payloads.items()]
+
+    def load_snapshot(self, snapshot: typing.List[typing.Any]) -> None:
+        with self._lock:
+            for (token, payload) in snapshot:
+                self._payloads[token] = payload
+
+            while len(self._payloads) > self._max_tokens:
+                self._payloads.popitem(last=False)
+
+    @staticmethod
+    def is_token(data: str) -> bool:
+        return data.startswith(_TOKEN_PREFIX)
+
+    @staticmethod
+    def encode_empty() -> str:
+        return _EMPTY_PREFIX
+
+    def encode_definition(self, query: typing.Optional[str], offset: int, links_toggle: bool) -> str:
+        data = f'{_DEFINITION_PREFIX}{_encode_flag(links_toggle)}{_encode_number(offset)}'
+
+        if query is not None:
+            data = f'{data}{_QUERY_SEPARATOR}{query}'
+
+        return self._fit(data, {
+            constants.BUTTON_DATA_QUERY_KEY: query,
+            constants.BUTTON_DATA_OFFSET_KEY: offset,
+            constants.BUTTON_DATA_LINKS_TOGGLE_KEY: links_toggle
+        })
+
+    @staticmethod
+    def encode_word_of_the_day(date: typing.Optional[str], links_toggle: bool) -> str:
+        return f'{_WORD_OF_THE_DAY_PREFIX}{_encode_flag(links_toggle)}{date or ""}'
+
+    @staticmethod
+    def encode_subscription(state: int, links_toggle: bool) -> str:
+        return f'{_SUBSCRIPTION_PREFIX}{_encode_flag(links_toggle)}{_encode_number(state)}'
+
+    @staticmethod
+    def encode_subscription_onboarding(state: int) -> str:
+        return f'{_SUBSCRIPTION_ONBOARDING_PREFIX}{_encode_number(state)}'
+
+    def decode(self, data: str) -> CallbackData:
+        """
+        Returns `None` for empty payloads, for unknown or malformed ones and for tokens that have been forgotten.
+        """
+
+        if not data:
+            return None
+
+        try:
+            return self._decode(data)
+        except ValueError:
+            # Truncated or forged payloads.
+            return None
+
+    def _decode(self, data: str) -> CallbackData:
+        prefix = data[0]
+        fields = data[1:]
+
+        if prefix == _DEFINITION_PREFIX:
+            (raw_offset, separator, query) = fields[1:].partition(_QUERY_SEPARATOR)
+
+            return {
+                constants.BUTTON_DATA_QUERY_KEY: query if separator else None,
+                constants.BUTTON_DATA_OFFSET_KEY: _decode_number(raw_offset),
+                constants.BUTTON_DATA_LINKS_TOGGLE_KEY: _decode_flag(fields[:1])
+            }
+
+        if prefix == _WORD_OF_THE_DAY_PREFIX:
+            return {
+                constants.BUTTON_DATA_DATE_KEY: fields[1:] or None,
+                constants.BUTTON_DATA_LINKS_TOGGLE_KEY: _decode_flag(fields[:1]),
+                constants.BUTTON_DATA_SUBSCRIPTION_STATE_KEY: None
+            }
+
+        if prefix == _SUBSCRIPTION_PREFIX:
+            return {
+                constants.BUTTON_DATA_LINKS_TOGGLE_KEY: _decode_flag(fields[:1]),
+                constants.BUTTON_DATA_SUBSCRIPTION_STATE_KEY: _decode_number(fields[1:])
+            }
+
+        if prefix == _SUBSCRIPTION_ONBOARDING_PREFIX:
+            return {
+                constants.BUTTON_DATA_IS_SUBSCRIPTION_ONBOARDING_KEY: True,
+                constants.BUTTON_DATA_SUBSCRIPTION_STATE_KEY: _decode_number(fields)
+            }
+
+        if prefix == _TOKEN_PREFIX:
+            with self._lock:
+                payload = self._payloads.get(fields)
+
+                if payload is not None:
+                    self._payloads.move_to_end(fields)
+
+                    return payload
+
+            if self._load_payload is None:
+                return None
+
+            # Encoded by another process, or before the token was forgotten.
+            payload = self._load_payload(fields)
+
+            if payload is not None:
+                self._remember(fields, payload)
+
+            return payload
+
+        if prefix == _EMPTY_PREFIX:
+            return None
+
+        payload = json.loads(data)
+
+        if not isinstance(payload, dict):
+            return None
+
+        return payload
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import enum
+import logging
+import threading
+import time
+
+import requests
+import requests.adapters
+
+import constants
+import stats
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(enum.Enum):
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+
+class CircuitOpenError(requests.ConnectionError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a server after several consecutive failures, for a while, so that the workers don't all
+    wait for a server that is down or overloaded. The responses slower than `slow_response` count as failures too.
+    After `open_time`, a single request is let through, and its result closes or opens the circuit again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, slow_response: datetime.timedelta, open_time: datetime.timedelta) -> None:
+        self.name = name
+
+        self._failure_threshold = failure_threshold
+        self._slow_response = slow_response.total_seconds()
+        self._open_time = open_time.total_seconds()
+
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._is_probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == CircuitState.CLOSED:
+                return True
+
+            if self._state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self._open_time:
+                self._state = CircuitState.HALF_OPEN
+                self._is_probing = False
+
+            if self._state == CircuitState.HALF_OPEN and not self._is_probing:
+                self._is_probing = True
+
+                return True
+
+            return False
+
+    def _open(self) -> None:
+        if self._state != CircuitState.OPEN:
+            stats.increment(constants.STATS_DEX_CIRCUIT_OPENINGS)
+
+            logger.warning(f'Opened the {self.name} circuit after {self._failures} failures')
+
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._is_probing = False
+
+    def record_success(self, duration: float) -> None:
+        if duration > self._slow_response:
+            self.record_failure()
+
+            return
+
+        with self._lock:
+            if self._state != CircuitState.CLOSED:
+                logger.info(f'Closed the {self.name} circuit')
+
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+            self._is_probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+
+            if self._state == CircuitState.HALF_OPEN or self._failures >= self._failure_threshold:
+                self._open()
+
+    def record_timeout(self, timeout: float) -> bool:
+        """
+        A request that was given less time than a slow response takes doesn't show that the server is slow when it times
+        out, so it's only a failure if it had at least that long. Returns whether it was a failure.
+        """
+
+        if timeout < self._slow_response:
+            with self._lock:
+                # It doesn't show that the server recovered either, so the next request probes it instead.
+                self._is_probing = False
+
+            return False
+
+        self.record_failure()
+
+        return True
+
+
+class CircuitBreakerAdapter(requests.adapters.HTTPAdapter):
+    """
+    Sends the requests through a circuit breaker, with a timeout when they don't have one. The server errors count as
+    failures, and are raised, so that the cached session serves the expired responses instead.
+
+    The body is read before the response is returned, even when it's streamed, so that the slow bodies count as slow
+    responses and the ones that fail midway as failures. The cached session reads the whole body to store it anyway.
+    """
+
+    def __init__(self, circuit_breaker: CircuitBreaker, timeout: datetime.timedelta, connect_timeout: datetime.timedelta, **kwargs) -> None:
+        super().__init__(**kwargs)
+
+        self.circuit_breaker = circuit_breaker
+
+        self._timeout = (connect_timeout.total_seconds(), timeout.total_seconds())
+
+    def send(self, request: requests.PreparedRequest, stream=False, timeout=None, verify=True, cert=None, proxies=None) -> requests.Response:  # type: ignore[override]
+        if not self.circuit_breaker.allow():
+            raise CircuitOpenError(f'The {self.circuit_breaker.name} circuit is open', request=request)
+
+        if timeout is None:
+            timeout = self._timeout
+
+        started_at = time.monotonic()
+
+        try:
+            response = super().send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+
+            # The content is kept by the response, which still streams it afterwards.
+            response.content
+        except requests.Timeout:
+            # The requests bounded by the answer window of their update may have little time left.
+            if self.circuit_breaker.record_timeout(timeout[1] if isinstance(timeout, tuple) else timeout):
+                stats.increment(constants.STATS_DEX_REQUEST_FAILURES)
+
+            raise
+        except Exception:
+            self.circuit_breaker.record_failure()
+
+            stats.increment(constants.STATS_DEX_REQUEST_FAILURES)
+
+            raise
+
+        if response.status_code >= 500:
+            self.circuit_breaker.record_failure()
+
+            stats.increment(constants.STATS_DEX_REQUEST_FAILURES)
+
+            response.close()
+
+            raise requests.HTTPError(f'Server error: {response.status_code}', response=response)
+
+        self.circuit_breaker.record_success(time.monotonic() - started_at)
+
+        return response
@@ -1,18 +1,56 @@
 # -*- coding: utf-8 -*-
 
+from __future__ import annotations
+
 import dataclasses
+import json
 import typing
 
 import telegram
 
+import keyboards
+
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True)
 class CompleteDefinition:
+    __slots__ = ('index', 'title', 'html', 'url', 'keyboard', 'image_url', 'image_author')
+
+    index: int
     title: str
     html: str
     url: str
 
-    inline_keyboard_buttons: typing.List[typing.List[telegram.InlineKeyboardButton]]
+    # The buttons are only built when the definition is sent.
+    keyboard: keyboards.Keyboard
+
+    image_url: typing.Optional[str]
+    image_author: typing.Optional[str]
+
+    @property
+    def inline_keyboard_buttons(self) -> typing.List[typing.List[telegram.InlineKeyboardButton]]:
+        return self.keyboard.get_inline_keyboard_buttons()
+
+    def serialize(self) -> str:
+        return json.dumps([
+            self.index,
+            self.title,
+            self.html,
+            self.url,
+            keyboards.serialize_keyboard(self.keyboard),
+            self.image_url,
+            self.image_author
+        ], ensure_ascii=False)
+
+    @classmethod
+    def deserialize(cls, data: str) -> CompleteDefinition:
+        (index, title, html, url, keyboard, image_url, image_author) = json.loads(data)
 
-    image_url: typing.Optional[str] = None
-    image_author: typing.Optional[str] = None
+        return cls(
+            index=index,
+            title=title,
+            html=html,
+            url=url,
+            keyboard=keyboards.deserialize_keyboard(keyboard),
+            image_url=image_url,
+            image_author=image_author
+        )
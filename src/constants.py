@@ -17,10 +17,11 @@ EPOCH_DATE = datetime.datetime(1970, 1, 1)
 DEX_BASE_URL = 'https://dexonline.ro'
 
 DEX_API_JSON_PATH = '/json'
-DEX_API_SUFFIX_REGEX = regex.compile(fr'{DEX_API_JSON_PATH}(\?t=\d+)?')
+DEX_API_DEFINITIONS_KEY = 'definitions'
+DEX_API_STREAM_CHUNK_SIZE = 16 * 1024
 
-DEX_DEFINITION_API_URL_FORMAT = f'{DEX_BASE_URL}/definitie/{{}}{DEX_API_JSON_PATH}'
-DEX_TODAY_WORD_OF_THE_DAY_URL_FORMAT = f'{DEX_BASE_URL}/cuvantul-zilei{DEX_API_JSON_PATH}?t={{}}'
+DEX_DEFINITION_URL_FORMAT = f'{DEX_BASE_URL}/definitie/{{}}'
+DEX_DEFINITION_API_URL_FORMAT = f'{DEX_DEFINITION_URL_FORMAT}{DEX_API_JSON_PATH}'
 DEX_SPECIFIC_WORD_OF_THE_DAY_URL_FORMAT = f'{DEX_BASE_URL}/cuvantul-zilei/{{}}{DEX_API_JSON_PATH}'
 DEX_SEARCH_URL_FORMAT = f'{DEX_BASE_URL}/text/{{}}'
 
@@ -31,7 +32,19 @@ DEX_AUTHOR_URL = 'https://dexonline.ro/utilizator'
 BOT_START_URL_FORMAT = 'https://telegram.me/{}?start={}'
 
 WORD_REGEX = regex.compile(r'(?P<word>[\p{L}\p{M}\p{N}]+)|(?P<other>\P{L}+)')
+WORD_OF_THE_DAY_TIMEZONE = 'Europe/Bucharest'
+WORD_OF_THE_DAY_DATE_FORMAT = '%Y/%m/%d'
 WORD_OF_THE_DAY_DATE_REGEX = regex.compile(r'(?<=Cuvântul zilei )(?P<day>\d{1,2})\.(?P<month>\d{2})\.(?P<year>\d{4})')
+WORD_OF_THE_DAY_TIME = datetime.time(hour=12)
+
+# The subscribers are spread over this many slots, which are delivered one after another, starting at the word of
+# the day time.
+WORD_OF_THE_DAY_DELIVERY_SLOTS = 60
+WORD_OF_THE_DAY_DELIVERY_SLOT_DURATION = datetime.timedelta(minutes=1)
+
+# When dexonline is unavailable, the word of the day is requested again after this delay, doubled after each attempt.
+WORD_OF_THE_DAY_RETRY_DELAY = datetime.timedelta(minutes=5)
+WORD_OF_THE_DAY_RETRIES = 6
 
 UNICODE_SUPERSCRIPTS = {
     # Source: https://www.fileformat.info/info/unicode/block/superscripts_and_subscripts/list.htm.
@@ -102,6 +115,149 @@ UNICODE_SUPERSCRIPTS = {
     'V': 'ⱽ',
     'W': 'ᵂ'
 }
+UNICODE_SUPERSCRIPTS_ALIASES = {
+    '[': '(',
+    ']': ')'
+}
+
+SUPERSCRIPTS_CACHE_SIZE = 1024
+
+MIGRATIONS_DIRECTORY = 'migrations'
+MIGRATIONS_TABLE = 'migration'
+MIGRATION_FILENAME_REGEX = regex.compile(r'\d{3}_[^.]+\.py$')
+
+INLINE_QUERY_TRACKER_SIZE = 10000
+
+RECENT_UPDATES_SIZE = 10000
+RECENT_UPDATES_TIME = datetime.timedelta(hours=1)
+
+WEBHOOK_REPLY_DEADLINE = datetime.timedelta(seconds=1)
+
+# Before a restart, the updates already received get this long to be handled.
+DRAIN_TIMEOUT = datetime.timedelta(seconds=15)
+DRAIN_CHECK_INTERVAL = datetime.timedelta(milliseconds=100)
+
+# The supervisor waits this long for the workers to drain their updates and exit, before it stops them.
+WORKERS_DRAIN_TIMEOUT = DRAIN_TIMEOUT + datetime.timedelta(seconds=5)
+
+# The handlers spend most of their time waiting for dexonline and for the Bot API, so there are many more workers
+# than cores. The inline and callback queries, the messages and the answers to the throttled callback queries have
+# their own lanes, so that a burst of one can't hold up the others, and the work that doesn't fit in a full lane is
+# dropped. The analytics hits have their own lane too. The messages and the analytics hits are held back while the
+# interactive lane is backlogged, up to a while, because the inline and callback queries have to be answered within
+# seconds.
+INTERACTIVE_LANE_WORKERS = 24
+INTERACTIVE_LANE_SIZE = 1000
+MESSAGES_LANE_WORKERS = 8
+MESSAGES_LANE_SIZE = 200
+THROTTLED_LANE_WORKERS = 1
+THROTTLED_LANE_SIZE = 50
+ANALYTICS_LANE_WORKERS = 2
+ANALYTICS_LANE_SIZE = 500
+LOOKUP_WORKERS = INTERACTIVE_LANE_WORKERS + MESSAGES_LANE_WORKERS
+LANE_MAX_YIELD = datetime.timedelta(seconds=30)
+
+# The dispatcher's own workers only run what isn't handled by a lane.
+DISPATCHER_WORKERS = 4
+DATABASE_WORKERS = 1
+
+# Telegram doesn't accept the answers to the inline and callback queries after a while, so the ones that waited this
+# long for a worker are dropped, and their lookups only get what is left of it.
+INTERACTIVE_ANSWER_WINDOW = datetime.timedelta(seconds=10)
+
+# The requests to dexonline give up in time for the answers to still be accepted, and so do the lookups that follow a
+# redirect, over both their requests. After several consecutive failures, or slow responses, no requests are sent for
+# a while, and the expired cached responses are served meanwhile.
+DEX_CONNECT_TIMEOUT = datetime.timedelta(seconds=2)
+DEX_READ_TIMEOUT = INTERACTIVE_ANSWER_WINDOW / 2
+DEX_LOOKUP_TIMEOUT = DEX_CONNECT_TIMEOUT + DEX_READ_TIMEOUT
+DEX_CIRCUIT_FAILURE_THRESHOLD = 5
+DEX_CIRCUIT_SLOW_RESPONSE = datetime.timedelta(seconds=3)
+DEX_CIRCUIT_OPEN_TIME = datetime.timedelta(seconds=30)
+DEX_UNAVAILABLE_TEXT = 'dexonline nu răspunde acum, încearcă din nou mai târziu.'
+
+# When hedging is enabled, the dexonline requests slower than this percentile of the latest ones are sent again, and
+# each request earns a part of a duplicate request, so that the duplicates stay under the configured budget.
+DEX_HEDGE_PERCENTILE = 95
+DEX_HEDGE_LATENCY_WINDOW = 1000
+DEX_HEDGE_MINIMUM_SAMPLES = 100
+DEX_HEDGE_MINIMUM_DELAY = datetime.timedelta(milliseconds=50)
+DEX_HEDGE_DELAY_REFRESH = 20
+DEX_HEDGE_BUDGET_BURST = 10
+
+# The lookup workers, and their duplicate requests.
+DEX_CONNECTIONS = 2 * LOOKUP_WORKERS
+
+# The supervisor checks this often whether the keeper of its workers is still running, and the workers save their
+# stats this often, so that the stats of all of them can be combined.
+SUPERVISOR_CHECK_INTERVAL = datetime.timedelta(seconds=1)
+WORKER_STATS_INTERVAL = datetime.timedelta(seconds=10)
+WORKER_STATS_PATH_FORMAT = 'stats.{}.json'
+
+# The workers that exit are forked again after this delay, so that one that can't start doesn't keep the keeper busy.
+WORKER_RESPAWN_DELAY = datetime.timedelta(seconds=1)
+
+# Each user can send this many updates at once, and then one every second. The inline queries superseded by a later
+# keystroke of the same user aren't counted.
+RATE_LIMIT_RATE = 1
+RATE_LIMIT_BURST = 20
+RATE_LIMITER_SIZE = 10000
+RATE_LIMITED_TEXT = 'Prea multe cereri, încearcă din nou în câteva secunde.'
+
+# The startup report lists this many of the packages that took the longest to import.
+STARTUP_REPORT_IMPORTS_LIMIT = 10
+
+CALLBACK_DATA_LENGTH_LIMIT = 64
+CALLBACK_DATA_TOKENS_SIZE = 100000
+
+# The tokens are also stored in the database, so that any worker can decode them, and the least recently stored ones
+# are deleted beyond this many, unless the cached answers might still embed them. The tokens that are still rendered
+# are stored again this often, so that they stay recent.
+CALLBACK_DATA_STORED_TOKENS_SIZE = 200000
+CALLBACK_DATA_TOKEN_SAVE_INTERVAL = datetime.timedelta(hours=1)
+KEYBOARD_TEMPLATES_CACHE_SIZE = 2000
+
+STATS_SKIPPED_INLINE_QUERIES = 'Skipped superseded inline queries'
+STATS_DUPLICATE_UPDATES = 'Dropped duplicate updates'
+STATS_WEBHOOK_REPLIES = 'Replies in webhook responses'
+STATS_THROTTLED_UPDATES = 'Throttled updates'
+STATS_THROTTLED_USERS = 'Throttled users'
+STATS_RATE_LIMITER_SIZE = 'Rate limiter size'
+STATS_SHED_UPDATES = 'Updates dropped by full lanes'
+STATS_EXPIRED_UPDATES = 'Queries dropped after the answer window'
+STATS_SHED_ANALYTICS = 'Analytics hits dropped by a full lane'
+STATS_INTERACTIVE_LANE_SIZE = 'Interactive lane size'
+STATS_MESSAGES_LANE_SIZE = 'Messages lane size'
+STATS_THROTTLED_LANE_SIZE = 'Throttled lane size'
+STATS_ANALYTICS_LANE_SIZE = 'Analytics lane size'
+STATS_NEGATIVE_RESULTS_CACHE_HITS = 'Negative cache hits'
+STATS_NEGATIVE_RESULTS_CACHE_SIZE = 'Negative cache size'
+STATS_RENDERED_CACHE_HITS = 'Rendered cache hits'
+STATS_RENDERED_CACHE_SIZE = 'Rendered cache size'
+STATS_INLINE_ANSWERS_CACHE_HITS = 'Inline answers cache hits'
+STATS_INLINE_ANSWERS_CACHE_SIZE = 'Inline answers cache size'
+STATS_RESPONSE_CACHE_HITS = 'Response cache hits'
+STATS_RESPONSE_CACHE_MISSES = 'Response cache misses'
+STATS_RESPONSE_CACHE_EVICTIONS = 'Response cache evictions'
+STATS_STALE_RESPONSES = 'Expired responses served'
+STATS_DEX_REQUEST_FAILURES = 'Failed dexonline requests'
+STATS_DEX_UNAVAILABLE_RESPONSES = 'Responses unavailable from dexonline'
+STATS_DEX_CIRCUIT_OPENINGS = 'dexonline circuit openings'
+STATS_DEX_CIRCUIT_STATE = 'dexonline circuit'
+STATS_DEX_HEDGED_REQUESTS = 'Hedged dexonline requests'
+STATS_DEX_HEDGES_WON = 'Hedged dexonline requests answered by the duplicate'
+STATS_DEX_HEDGE_DELAY = 'dexonline hedge delay'
+STATS_DEX_P99_LATENCY = 'dexonline p99 latency'
+STATS_DEX_PRIMARY_P99_LATENCY = 'dexonline p99 latency without hedging'
+STATS_NORMALIZED_QUERIES = 'Normalized queries'
+STATS_CALLBACK_DATA_TOKENS = 'Callback data tokens'
+
+CEDILLA_TO_COMMA_BELOW_TRANSLATION_TABLE = str.maketrans({
+    'ş': 'ș',
+    'Ş': 'Ș',
+    'ţ': 'ț',
+    'Ţ': 'Ț'
+})
 
 ELLIPSIS = '…'
 DEFINITION_AND_FOOTER_SEPARATOR = '\n\n'
@@ -109,6 +265,36 @@ DEFINITION_AND_FOOTER_SEPARATOR = '\n\n'
 MESSAGE_TITLE_LENGTH_LIMIT = 50
 
 RESULTS_CACHE_TIME = datetime.timedelta(weeks=1)
+SUGGESTIONS_CACHE_TIME = datetime.timedelta(hours=1)
+NEGATIVE_RESULTS_CACHE_TIME = datetime.timedelta(hours=6)
+
+# The responses cache is kept under this size, in bytes, by evicting the least used responses until it's at the target
+# ratio of it. Its free pages are returned to the file system a few at a time during the quiet hours, in the word of
+# the day timezone, when a full vacuum wouldn't matter either.
+RESPONSES_CACHE_LOCATION = 'cache'
+RESPONSES_CACHE_MAX_SIZE = 512 * 1024 * 1024
+RESPONSES_CACHE_EVICTION_TARGET = 0.9
+RESPONSES_CACHE_COMPACTION_INTERVAL = datetime.timedelta(minutes=10)
+RESPONSES_CACHE_QUIET_HOURS = range(3, 6)
+RESPONSES_CACHE_VACUUM_PAGES = 5000
+RESPONSES_CACHE_URLS_BATCH = 1000
+
+# Today's word of the day used to be requested with the current timestamp, which cached a response for each request.
+TIMESTAMPED_WORD_OF_THE_DAY_URL_PATTERN = f'{DEX_BASE_URL}/cuvantul-zilei{DEX_API_JSON_PATH}[?]t=*'
+RESPONSES_CACHE_DESCRIPTION_LIMIT = 20
+
+NEGATIVE_RESULTS_CACHE_SIZE = 10000
+RENDERED_CACHE_SIZE = 1000
+RENDERED_STORE_SIZE = 10000
+INLINE_ANSWERS_CACHE_SIZE = 1000
+NEGATIVE_RESULTS_CACHE_DESCRIPTION_LIMIT = 20
+
+SUGGESTIONS_MINIMUM_QUERY_LENGTH = 2
+SUGGESTIONS_LIMIT = 10
+SUGGESTION_RESULT_ID_DIGEST_SIZE = 16
+SUGGESTION_DESCRIPTION = 'Sugestie'
+SUGGESTION_SEARCH_TEXT = '🔍 Caută'
+SUGGESTIONS_EXACT_SEARCH_TEXT = 'Caută exact acest cuvânt'
 
 PREVIOUS_PAGE_ICON = '⬅'
 PREVIOUS_OVERLAP_PAGE_ICON = '↪'
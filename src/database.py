@@ -4,12 +4,13 @@ from __future__ import annotations
 
 import datetime
 import enum
+import json
 import logging
+import os
 import typing
 import uuid
 
 import peewee
-import peewee_migrate
 import playhouse.sqlite_ext
 import telegram
 
@@ -22,7 +23,14 @@ database = peewee.SqliteDatabase('dex.sqlite')
 
 database.connect()
 
-router = peewee_migrate.Router(database, migrate_table='migration', logger=logger)
+
+def enable_write_ahead_log() -> None:
+    """
+    Lets several processes read the database while another one writes to it. The journal mode is stored in the
+    database file, so it stays enabled.
+    """
+
+    database.execute_sql('PRAGMA journal_mode=WAL')
 
 
 def get_current_datetime() -> str:
@@ -38,6 +46,17 @@ class BaseModel(peewee.Model):
     class Meta:
         database = database
 
+    def save(self, force_insert=False, only=None) -> None:
+        self.updated_at = get_current_datetime()
+
+        if only is not None:
+            only = list(only) + [BaseModel.updated_at]
+
+        super().save(
+            force_insert=force_insert,
+            only=only
+        )
+
 
 class User(BaseModel):
     class Subscription(enum.Enum):
@@ -51,6 +70,12 @@ class User(BaseModel):
     telegram_id = peewee.BigIntegerField(unique=True)
     telegram_username = peewee.TextField(null=True)
     subscription = peewee.IntegerField(default=0)
+    delivery_slot = peewee.IntegerField(default=0)
+
+    @staticmethod
+    def get_default_delivery_slot(telegram_id: int) -> int:
+        # The ids don't follow any pattern that matters here, so they spread the users evenly.
+        return telegram_id % constants.WORD_OF_THE_DAY_DELIVERY_SLOTS
 
     def get_markdown_description(self) -> str:
         if self.telegram_username is None:
@@ -101,14 +126,6 @@ class User(BaseModel):
             f'{self.get_markdown_subscription_description()}'
         )
 
-    def save(self, force_insert=False, only=None) -> None:
-        self.updated_at = get_current_datetime()
-
-        super().save(
-            force_insert=force_insert,
-            only=only
-        )
-
     @classmethod
     def create_or_update_user(cls, id: int, username: typing.Optional[str], bot: telegram.Bot, admin_id: int) -> typing.Optional[User]:
         try:
@@ -116,7 +133,8 @@ class User(BaseModel):
             is_created: bool
 
             (db_user, is_created) = cls.get_or_create(telegram_id=id, defaults={
-                'telegram_username': username
+                'telegram_username': username,
+                'delivery_slot': cls.get_default_delivery_slot(id)
             })
 
             db_user.telegram_username = username
@@ -172,9 +190,182 @@ class User(BaseModel):
 
         return users_table
 
+    @classmethod
+    def get_subscribed_users_in_slot(cls, slot: int) -> peewee.ModelSelect:
+        """
+        The slots are taken modulo the current number of slots, so that the stored ones stay valid when it changes.
+        """
+
+        # Peewee uses `%` for `LIKE`.
+        current_slot = peewee.Expression(cls.delivery_slot, '%', constants.WORD_OF_THE_DAY_DELIVERY_SLOTS)
+
+        return cls.select().where(
+            (cls.subscription == cls.Subscription.accepted.value) &
+            (current_slot == slot)
+        )
+
+
+class WordOfTheDay(BaseModel):
+    date = peewee.TextField(unique=True)
+    record = peewee.TextField()
+    definition = peewee.TextField(null=True)
+    links_definition = peewee.TextField(null=True)
+
+    # The progress of the delivery to the subscribers, which is `None` until it starts.
+    delivered_slots = peewee.IntegerField(null=True)
+    delivered_messages = peewee.IntegerField(default=0)
+
+    class Meta:
+        table_name = 'word_of_the_day'
+
+    @classmethod
+    def get_or_create_for_date(cls, date: str, get_record: typing.Callable[[], str]) -> WordOfTheDay:
+        """
+        Calls `get_record` only if the word of the day of `date` isn't stored yet.
+        """
+
+        word_of_the_day: typing.Optional[WordOfTheDay] = cls.get_or_none(cls.date == date)
+
+        if word_of_the_day is not None:
+            return word_of_the_day
+
+        record = get_record()
+
+        try:
+            (word_of_the_day, _is_created) = cls.get_or_create(date=date, defaults={
+                'record': record
+            })
+        except peewee.PeeweeException as error:
+            logger.error(f'Database error: "{error}" for word of the day: {date}')
+
+            word_of_the_day = cls(date=date, record=record)
+
+        return word_of_the_day
+
+    def save_definitions(self, definition: str, links_definition: str) -> None:
+        self.definition = definition
+        self.links_definition = links_definition
+
+        # The word of the day couldn't be stored.
+        if self.rowid is None:
+            return
+
+        try:
+            self.save(only=[WordOfTheDay.definition, WordOfTheDay.links_definition])
+        except peewee.PeeweeException as error:
+            logger.error(f'Database error: "{error}" for word of the day: {self.date}')
+
+    @classmethod
+    def save_delivery(cls, date: str, delivered_slots: int, delivered_messages: int) -> None:
+        try:
+            cls.update(
+                delivered_slots=delivered_slots,
+                delivered_messages=delivered_messages,
+                updated_at=get_current_datetime()
+            ).where(cls.date == date).execute()
+        except peewee.PeeweeException as error:
+            logger.error(f'Database error: "{error}" for word of the day delivery: {date}')
+
+
+class CallbackDataToken(BaseModel):
+    token = peewee.TextField(unique=True)
+    payload = peewee.TextField()
+
+    class Meta:
+        table_name = 'callback_data_token'
+
+    @classmethod
+    def save_payload(cls, token: str, payload: typing.Dict[str, typing.Any]) -> None:
+        """
+        Stores the token again, as the most recent one, if it's already stored.
+        """
+
+        now = get_current_datetime()
+
+        try:
+            cls.insert(
+                token=token,
+                payload=json.dumps(payload, ensure_ascii=False),
+                updated_at=now
+            ).on_conflict(
+                conflict_target=[cls.token],
+                update={cls.updated_at: now}
+            ).execute()
+        except peewee.PeeweeException as error:
+            logger.error(f'Database error: "{error}" for callback data token: {token}')
+
+    @classmethod
+    def get_payload(cls, token: str) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        try:
+            callback_data_token: typing.Optional[CallbackDataToken] = cls.get_or_none(cls.token == token)
+        except peewee.PeeweeException as error:
+            logger.error(f'Database error: "{error}" for callback data token: {token}')
+
+            return None
+
+        if callback_data_token is None:
+            return None
+
+        return json.loads(callback_data_token.payload)
+
+    @classmethod
+    def trim(cls, max_tokens: int, min_age: datetime.timedelta) -> None:
+        """
+        Deletes the least recently stored tokens beyond `max_tokens`, except those stored within `min_age`, which the
+        cached answers might still embed.
+        """
+
+        kept_tokens = cls.select(cls.rowid).order_by(cls.updated_at.desc()).limit(max_tokens)
+        oldest_kept_time = (datetime.datetime.now() - min_age).strftime(constants.GENERIC_DATE_TIME_FORMAT)
+
+        try:
+            cls.delete().where(cls.rowid.not_in(kept_tokens) & (cls.updated_at < oldest_kept_time)).execute()
+        except peewee.PeeweeException as error:
+            logger.error(f'Database error: "{error}" for callback data tokens')
+
+
+def get_pending_migrations() -> typing.List[str]:
+    """
+    Compares the migration files with the migrations table, because peewee_migrate runs all the migrations again, only
+    to build the models that they expect, before it knows if there is any left to apply.
+    """
+
+    if not os.path.isdir(constants.MIGRATIONS_DIRECTORY):
+        return []
+
+    migrations = sorted(
+        filename[:-len('.py')]
+        for filename in os.listdir(constants.MIGRATIONS_DIRECTORY)
+        if constants.MIGRATION_FILENAME_REGEX.match(filename)
+    )
+
+    if not database.table_exists(constants.MIGRATIONS_TABLE):
+        return migrations
+
+    applied_migrations = {name for (name,) in database.execute_sql(f'SELECT "name" FROM "{constants.MIGRATIONS_TABLE}"')}
+
+    return [migration for migration in migrations if migration not in applied_migrations]
+
+
+def run_migrations() -> None:
+    # It's only needed, and imported, when there are migrations to apply.
+    import peewee_migrate
+
+    router = peewee_migrate.Router(
+        database,
+        migrate_dir=constants.MIGRATIONS_DIRECTORY,
+        migrate_table=constants.MIGRATIONS_TABLE,
+        logger=logger
+    )
+
+    # The tables are created by the migrations, each one with its schema as of that migration, so that the columns
+    # added later aren't there yet when their migrations add them.
+    router.run()
+
 
-migrator = router.migrator
+pending_migrations = get_pending_migrations()
 
-migrator.create_table(User)
+if pending_migrations:
+    logger.info(f'Pending migrations: {pending_migrations}')
 
-router.run()
+    run_migrations()
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import concurrent.futures
+import threading
+import time
+import typing
+
+import requests
+import requests.adapters
+
+import constants
+import stats
+
+
+class LatencyWindow:
+    """
+    The latencies of the latest requests, in seconds.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._latencies: typing.Deque[float] = collections.deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def add(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def get_percentile(self, percentile: float) -> typing.Optional[float]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+
+        if not latencies:
+            return None
+
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percentile / 100))]
+
+
+class HedgeBudget:
+    """
+    Each request earns a fraction of a hedge, so that the hedges are at most that fraction of the requests, with a few
+    saved up for the bursts of slow responses.
+    """
+
+    def __init__(self, ratio: float, burst: int) -> None:
+        self._ratio = ratio
+        self._burst = burst
+
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+    def earn(self) -> None:
+        with self._lock:
+            self._tokens = min(self._burst, self._tokens + self._ratio)
+
+    def spend(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+
+            self._tokens -= 1
+
+            return True
+
+
+class Hedger:
+    """
+    The budget of the duplicate requests, the latencies of the latest requests, and the delay after which a request is
+    duplicated, shared by all the ways the requests to a server are sent.
+    """
+
+    def __init__(self, budget_ratio: float) -> None:
+        self._budget = HedgeBudget(budget_ratio, constants.DEX_HEDGE_BUDGET_BURST)
+
+        # The latencies of the first requests, as if there were no hedging, and those of the responses returned.
+        self.primary_latencies = LatencyWindow(constants.DEX_HEDGE_LATENCY_WINDOW)
+        self.latencies = LatencyWindow(constants.DEX_HEDGE_LATENCY_WINDOW)
+
+        self.hedge_delay: typing.Optional[float] = None
+
+        self._requests_count = 0
+        self._lock = threading.Lock()
+
+    def start_request(self) -> typing.Optional[float]:
+        """
+        Earns the part of a duplicate of the request, and returns the delay after which it's duplicated, or `None` if
+        it isn't.
+        """
+
+        self._budget.earn()
+
+        with self._lock:
+            self._requests_count += 1
+
+            # The percentile is only computed again every few requests, and only once there are enough latencies.
+            if self._requests_count % constants.DEX_HEDGE_DELAY_REFRESH == 0 and len(self.primary_latencies) >= constants.DEX_HEDGE_MINIMUM_SAMPLES:
+                delay = self.primary_latencies.get_percentile(constants.DEX_HEDGE_PERCENTILE)
+
+                if delay is not None:
+                    self.hedge_delay = max(delay, constants.DEX_HEDGE_MINIMUM_DELAY.total_seconds())
+
+            return self.hedge_delay
+
+    def spend(self) -> bool:
+        """
+        Returns whether the budget allows a duplicate request.
+        """
+
+        if not self._budget.spend():
+            return False
+
+        stats.increment(constants.STATS_DEX_HEDGED_REQUESTS)
+
+        return True
+
+
+def _close_response(future: concurrent.futures.Future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+class HedgingAdapter(requests.adapters.BaseAdapter):
+    """
+    Sends a duplicate of the GET requests that are slower than most of the recent ones, through the same adapter, and
+    returns whichever response arrives first. The other one can't be interrupted, so it's closed when it arrives, or
+    dropped before it's sent if it's still waiting for a worker. The duplicates are limited by the hedger's budget.
+    """
+
+    def __init__(self, adapter: requests.adapters.BaseAdapter, hedger: Hedger, workers: int) -> None:
+        super().__init__()
+
+        self._adapter = adapter
+        self._hedger = hedger
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix='hedging'
+        )
+
+    def _send(self, request: requests.PreparedRequest, started_at: float, is_primary: bool, kwargs: typing.Dict[str, typing.Any]) -> requests.Response:
+        # The failures are latencies too, so that the timeouts, which are the slowest requests, raise the hedge delay
+        # instead of leaving only the fast responses in the window.
+        try:
+            return self._adapter.send(request, **kwargs)
+        finally:
+            if is_primary:
+                self._hedger.primary_latencies.add(time.monotonic() - started_at)
+
+    def send(self, request: requests.PreparedRequest, **kwargs: typing.Any) -> requests.Response:  # type: ignore[override]
+        hedge_delay = self._hedger.start_request()
+        started_at = time.monotonic()
+
+        if request.method != 'GET' or hedge_delay is None:
+            response = self._send(request, started_at, True, kwargs)
+
+            self._hedger.latencies.add(time.monotonic() - started_at)
+
+            return response
+
+        primary = self._executor.submit(self._send, request, started_at, True, kwargs)
+        futures = [primary]
+
+        (done, _pending) = concurrent.futures.wait(futures, timeout=hedge_delay)
+
+        if not done and self._hedger.spend():
+            futures.append(self._executor.submit(self._send, request.copy(), time.monotonic(), False, kwargs))
+
+        # The first response that isn't an error, or the error of the primary request if both failed.
+        result: typing.Optional[concurrent.futures.Future] = None
+        pending: typing.Set[concurrent.futures.Future] = set(futures)
+
+        while pending and result is None:
+            (done, pending) = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+
+            result = next((future for future in futures if future in done and future.exception() is None), None)
+
+        if result is None:
+            result = primary
+        elif result is not primary:
+            stats.increment(constants.STATS_DEX_HEDGES_WON)
+
+        for future in futures:
+            if future is not result and not future.cancel():
+                future.add_done_callback(_close_response)
+
+        self._hedger.latencies.add(time.monotonic() - started_at)
+
+        return result.result()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self._adapter.close()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import dataclasses
+import datetime
+import json
+import threading
+import time
+import typing
+
+import telegram
+
+
+@dataclasses.dataclass(frozen=True)
+class InlineAnswer:
+    __slots__ = ('results', 'next_offset')
+
+    # The results, already serialized as they are sent to Telegram.
+    results: str
+
+    next_offset: typing.Optional[str]
+
+
+def get_inline_answer(results: typing.Sequence[telegram.InlineQueryResult], next_offset: typing.Optional[str]) -> InlineAnswer:
+    return InlineAnswer(
+        results=json.dumps([result.to_dict() for result in results]),
+        next_offset=next_offset
+    )
+
+
+class InlineAnswersCache:
+    """
+    Keeps the serialized answers of the most recent inline queries, by their page, so that answering a popular query
+    again doesn't need to render the definitions or build the results.
+    The answers show the spelling of the query that the user typed, in their links and in their buttons, so they are
+    kept by spelling too, under the normalized query, which is the one that is discarded.
+    """
+
+    def __init__(self, max_size: int, expire_after: datetime.timedelta) -> None:
+        self._max_size = max_size
+        self._expire_after = expire_after.total_seconds()
+
+        # The answers of each query, by their spelling and their offset, and their expiration time.
+        self._queries: typing.OrderedDict[str, typing.Tuple[typing.Dict[typing.Tuple[str, str], InlineAnswer], float]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+    def get(self, query: str, spelling: str, offset: str) -> typing.Optional[InlineAnswer]:
+        with self._lock:
+            entry = self._queries.get(query)
+
+            if entry is None:
+                return None
+
+            (answers, expiration_time) = entry
+
+            if expiration_time < time.monotonic():
+                del self._queries[query]
+
+                return None
+
+            self._queries.move_to_end(query)
+
+            return answers.get((spelling, offset))
+
+    def add(self, query: str, spelling: str, offset: str, answer: InlineAnswer) -> None:
+        with self._lock:
+            entry = self._queries.get(query)
+
+            if entry is None:
+                entry = ({}, time.monotonic() + self._expire_after)
+
+                self._queries[query] = entry
+
+            entry[0][(spelling, offset)] = answer
+
+            self._queries.move_to_end(query)
+
+            while len(self._queries) > self._max_size:
+                self._queries.popitem(last=False)
+
+    def discard(self, query: str) -> bool:
+        with self._lock:
+            return self._queries.pop(query, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._queries.clear()
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import threading
+import typing
+
+import telegram
+
+
+class InlineQueryTracker:
+    """
+    Remembers the latest inline query of each user, because Telegram only shows the results of the latest one, so
+    the work for the previous ones can be dropped.
+    """
+
+    def __init__(self, max_users: int) -> None:
+        self._max_users = max_users
+
+        self._latest_query_ids: typing.OrderedDict[int, str] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def track(self, inline_query: telegram.InlineQuery) -> None:
+        user_id = inline_query.from_user.id
+
+        with self._lock:
+            self._latest_query_ids[user_id] = inline_query.id
+            self._latest_query_ids.move_to_end(user_id)
+
+            if len(self._latest_query_ids) > self._max_users:
+                self._latest_query_ids.popitem(last=False)
+
+    def is_superseded(self, inline_query: telegram.InlineQuery) -> bool:
+        latest_query_id = self._latest_query_ids.get(inline_query.from_user.id)
+
+        return latest_query_id is not None and latest_query_id != inline_query.id
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+import json
+import typing
+
+_WHITESPACE = ' \t\n\r'
+
+_decoder = json.JSONDecoder()
+
+
+class _StreamReader:
+    def __init__(self, chunks: typing.Iterable[str]) -> None:
+        self._chunks = iter(chunks)
+
+        self._buffer = ''
+        self._position = 0
+
+        self._is_exhausted = False
+
+    def _read_more(self) -> bool:
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+
+            self._buffer = self._buffer[self._position:] + chunk
+            self._position = 0
+
+            return True
+
+        self._is_exhausted = True
+
+        return False
+
+    def _skip_whitespace(self) -> None:
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in _WHITESPACE:
+                self._position += 1
+
+            if self._position < len(self._buffer) or not self._read_more():
+                return
+
+    def read_character(self) -> str:
+        self._skip_whitespace()
+
+        if self._position >= len(self._buffer):
+            raise json.JSONDecodeError('Unexpected end of stream', self._buffer, self._position)
+
+        character = self._buffer[self._position]
+        self._position += 1
+
+        return character
+
+    def expect_character(self, expected_character: str) -> None:
+        character = self.read_character()
+
+        if character != expected_character:
+            raise json.JSONDecodeError(f'Expected "{expected_character}"', self._buffer, self._position - 1)
+
+    def read_separator(self, closing_character: str) -> bool:
+        """
+        Returns `True` if the container was closed or `False` if another item follows.
+        """
+
+        character = self.read_character()
+
+        if character == closing_character:
+            return True
+
+        if character != ',':
+            raise json.JSONDecodeError(f'Expected "," or "{closing_character}"', self._buffer, self._position - 1)
+
+        return False
+
+    def peek_character(self) -> str:
+        self._skip_whitespace()
+
+        if self._position >= len(self._buffer):
+            return ''
+
+        return self._buffer[self._position]
+
+    def read_value(self) -> typing.Any:
+        self._skip_whitespace()
+
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if self._read_more():
+                    continue
+
+                raise
+
+            # A number at the end of the buffer might continue in the next chunk.
+            if end == len(self._buffer) and not self._is_exhausted and self._read_more():
+                continue
+
+            self._position = end
+
+            return value
+
+
+def iterate_array_items(chunks: typing.Iterable[str], key: str) -> typing.Iterator[typing.Any]:
+    """
+    Yields the items of the array stored under the top level `key` of a JSON object, one by one, as soon as each of
+    them has been received, without waiting for, or parsing, the rest of the document.
+    Raises `KeyError` if the object doesn't contain the key.
+    """
+
+    reader = _StreamReader(chunks)
+
+    reader.expect_character('{')
+
+    if reader.peek_character() == '}':
+        raise KeyError(key)
+
+    while True:
+        current_key = reader.read_value()
+
+        reader.expect_character(':')
+
+        if current_key == key:
+            break
+
+        reader.read_value()
+
+        if reader.read_separator('}'):
+            raise KeyError(key)
+
+    reader.expect_character('[')
+
+    if reader.peek_character() == ']':
+        return
+
+    while True:
+        yield reader.read_value()
+
+        if reader.read_separator(']'):
+            return
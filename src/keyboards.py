@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import dataclasses
+import enum
+import functools
+import threading
+import typing
+
+import telegram
+
+import callback_data
+import constants
+import database
+import stats
+
+InlineKeyboardButtons = typing.List[typing.List[telegram.InlineKeyboardButton]]
+
+callback_data_codec = callback_data.CallbackDataCodec(
+    max_tokens=constants.CALLBACK_DATA_TOKENS_SIZE,
+    save_payload=database.CallbackDataToken.save_payload,
+    load_payload=database.CallbackDataToken.get_payload,
+    save_interval=constants.CALLBACK_DATA_TOKEN_SAVE_INTERVAL
+)
+
+stats.register_gauge(constants.STATS_CALLBACK_DATA_TOKENS, callback_data_codec.__len__)
+
+
+class DefinitionKeyboardTemplate:
+    """
+    The keyboard shared by all the definitions of a query, which only differ by their offset. The callback data of
+    each offset is encoded once, when a keyboard first needs it, and reused by the previous, next and first page
+    buttons of the other definitions. The tokens are encoded each time instead, because the template can outlive them
+    in the codec, and encoding them stores them again.
+    """
+
+    def __init__(self, query: typing.Optional[str], definitions_count: int, links_toggle: bool) -> None:
+        self.query = query
+        self.definitions_count = definitions_count
+        self.links_toggle = links_toggle
+
+        self._callback_data: typing.Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def get_callback_data(self, offset: int) -> str:
+        with self._lock:
+            data = self._callback_data.get(offset)
+
+            if data is not None:
+                return data
+
+        data = callback_data_codec.encode_definition(self.query, offset, self.links_toggle)
+
+        if not callback_data_codec.is_token(data):
+            with self._lock:
+                self._callback_data[offset] = data
+
+        return data
+
+    def get_links_toggle_template(self) -> DefinitionKeyboardTemplate:
+        return get_definition_keyboard_template(self.query, self.definitions_count, not self.links_toggle)
+
+    def get_inline_keyboard_buttons(self, offset: int) -> InlineKeyboardButtons:
+        buttons: InlineKeyboardButtons = []
+
+        if self.definitions_count > 1:
+            is_first_page = offset == 0
+            is_last_page = offset == self.definitions_count - 1
+
+            previous_offset = self.definitions_count - 1 if is_first_page else offset - 1
+            next_offset = 0 if is_last_page else offset + 1
+
+            previous_text = constants.PREVIOUS_OVERLAP_PAGE_ICON if is_first_page else constants.PREVIOUS_PAGE_ICON
+            current_text = f'{offset + 1} / {self.definitions_count}'
+            next_text = constants.NEXT_OVERLAP_PAGE_ICON if is_last_page else constants.NEXT_PAGE_ICON
+
+            first_data = callback_data_codec.encode_empty() if is_first_page else self.get_callback_data(0)
+
+            buttons.append([
+                telegram.InlineKeyboardButton(previous_text, callback_data=self.get_callback_data(previous_offset)),
+                telegram.InlineKeyboardButton(current_text, callback_data=first_data),
+                telegram.InlineKeyboardButton(next_text, callback_data=self.get_callback_data(next_offset))
+            ])
+
+        links_toggle_text = constants.LINKS_TOGGLE_ON_TEXT if self.links_toggle else constants.LINKS_TOGGLE_OFF_TEXT
+        links_toggle_data = self.get_links_toggle_template().get_callback_data(offset)
+
+        buttons.append([
+            telegram.InlineKeyboardButton(links_toggle_text, callback_data=links_toggle_data)
+        ])
+
+        return buttons
+
+
+@functools.lru_cache(maxsize=constants.KEYBOARD_TEMPLATES_CACHE_SIZE)
+def get_definition_keyboard_template(query: typing.Optional[str], definitions_count: int, links_toggle: bool) -> DefinitionKeyboardTemplate:
+    return DefinitionKeyboardTemplate(query, definitions_count, links_toggle)
+
+
+@dataclasses.dataclass(frozen=True)
+class DefinitionKeyboard:
+    __slots__ = ('template', 'offset')
+
+    template: DefinitionKeyboardTemplate
+    offset: int
+
+    def get_inline_keyboard_buttons(self) -> InlineKeyboardButtons:
+        return self.template.get_inline_keyboard_buttons(self.offset)
+
+
+@dataclasses.dataclass(frozen=True)
+class WordOfTheDayKeyboard:
+    __slots__ = ('date', 'links_toggle', 'with_stop')
+
+    date: typing.Optional[str]
+    links_toggle: bool
+    with_stop: bool
+
+    def get_inline_keyboard_buttons(self) -> InlineKeyboardButtons:
+        return get_subscription_notification_inline_keyboard_buttons(self.date, self.links_toggle, self.with_stop)
+
+
+Keyboard = typing.Union[DefinitionKeyboard, WordOfTheDayKeyboard]
+
+
+class KeyboardType(enum.Enum):
+    DEFINITION = 'definition'
+    WORD_OF_THE_DAY = 'word_of_the_day'
+
+
+def serialize_keyboard(keyboard: Keyboard) -> typing.List[typing.Any]:
+    """
+    The fields that the keyboard is built from, without its buttons, which are built again when it's sent.
+    """
+
+    if isinstance(keyboard, DefinitionKeyboard):
+        template = keyboard.template
+
+        return [KeyboardType.DEFINITION.value, template.query, template.definitions_count, template.links_toggle, keyboard.offset]
+
+    return [KeyboardType.WORD_OF_THE_DAY.value, keyboard.date, keyboard.links_toggle, keyboard.with_stop]
+
+
+def deserialize_keyboard(fields: typing.List[typing.Any]) -> Keyboard:
+    (keyboard_type, *arguments) = fields
+
+    if KeyboardType(keyboard_type) is KeyboardType.DEFINITION:
+        (query, definitions_count, links_toggle, offset) = arguments
+
+        return get_definition_keyboard(query, definitions_count, offset, links_toggle)
+
+    (date, links_toggle, with_stop) = arguments
+
+    return WordOfTheDayKeyboard(date, links_toggle, with_stop)
+
+
+def get_definition_keyboard(query: typing.Optional[str], definitions_count: int, offset: int, links_toggle: bool) -> DefinitionKeyboard:
+    return DefinitionKeyboard(
+        template=get_definition_keyboard_template(query, definitions_count, links_toggle),
+        offset=offset
+    )
+
+
+def get_subscription_onboarding_inline_keyboard_buttons() -> InlineKeyboardButtons:
+    no_data = callback_data_codec.encode_subscription_onboarding(database.User.Subscription.denied.value)
+
+    no_button = telegram.InlineKeyboardButton(
+        text='Nu',
+        callback_data=no_data
+    )
+
+    yes_data = callback_data_codec.encode_subscription_onboarding(database.User.Subscription.accepted.value)
+
+    yes_button = telegram.InlineKeyboardButton(
+        text='Da',
+        callback_data=yes_data
+    )
+
+    return [[no_button, yes_button]]
+
+
+def get_subscription_notification_inline_keyboard_buttons(date: typing.Optional[str], links_toggle=False, with_stop=True) -> InlineKeyboardButtons:
+    links_toggle_data = callback_data_codec.encode_word_of_the_day(date, not links_toggle)
+
+    links_toggle_text = constants.LINKS_TOGGLE_ON_TEXT if links_toggle else constants.LINKS_TOGGLE_OFF_TEXT
+
+    links_toggle_button = telegram.InlineKeyboardButton(
+        text=links_toggle_text,
+        callback_data=links_toggle_data
+    )
+
+    subscription_data: str
+    subscription_text: str
+
+    if with_stop:
+        subscription_data = callback_data_codec.encode_subscription(database.User.Subscription.revoked.value, links_toggle)
+
+        subscription_text = 'Oprește'
+    else:
+        subscription_data = callback_data_codec.encode_subscription(database.User.Subscription.accepted.value, links_toggle)
+
+        subscription_text = 'Repornește'
+
+    subscription_button = telegram.InlineKeyboardButton(
+        text=subscription_text,
+        callback_data=subscription_data
+    )
+
+    return [[links_toggle_button, subscription_button]]
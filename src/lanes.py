@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import concurrent.futures
+import logging
+import threading
+import time
+import typing
+
+import constants
+
+logger = logging.getLogger(__name__)
+
+
+class Lane:
+    """
+    A bounded executor for one kind of work, with its own workers, so that a burst of it can't hold up the others.
+    The work submitted while the lane is full is rejected instead of being queued.
+
+    A lane that yields to another one holds its work back while the other one is backlogged, so that its workers don't
+    compete with those of the other one for dexonline and for the Bot API, and so its own work piles up and is rejected
+    first.
+    """
+
+    def __init__(self, name: str, workers: int, max_size: int, yields_to: typing.Optional['Lane'] = None) -> None:
+        self.name = name
+
+        self._workers = workers
+        self._max_size = max_size
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix=name
+        )
+
+        self._held_work: typing.Optional[HeldWork] = None
+
+        if yields_to is not None:
+            self._held_work = HeldWork(yields_to, self._start)
+
+        self._completion_listeners: typing.List[typing.Callable[[], None]] = []
+
+        # The work that is held back, the work waiting for a worker and the work that is running.
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def is_backlogged(self) -> bool:
+        """
+        Whether there is work waiting for a worker.
+        """
+
+        return self._size > self._workers
+
+    def add_completion_listener(self, listener: typing.Callable[[], None]) -> None:
+        """
+        Calls `listener` on the worker each time it finishes some work, so that the work held back while this lane is
+        backlogged is released as soon as it isn't anymore.
+        """
+
+        self._completion_listeners.append(listener)
+
+    def submit(self, function: typing.Callable[..., None], *args: typing.Any) -> bool:
+        """
+        Returns `False` if the lane is full, in which case the function won't be called.
+        """
+
+        with self._lock:
+            if self._size >= self._max_size:
+                return False
+
+            self._size += 1
+
+        if self._held_work is not None:
+            self._held_work.submit(function, args)
+        else:
+            self._start(function, args)
+
+        return True
+
+    def _start(self, function: typing.Callable[..., None], args: typing.Tuple[typing.Any, ...]) -> None:
+        self._executor.submit(self._run, function, args)
+
+    def _run(self, function: typing.Callable[..., None], args: typing.Tuple[typing.Any, ...]) -> None:
+        try:
+            function(*args)
+        except Exception:
+            logger.exception(f'Unhandled error in the {self.name} lane')
+        finally:
+            with self._lock:
+                self._size -= 1
+
+            for listener in self._completion_listeners:
+                listener()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown()
+
+
+class HeldWork:
+    """
+    The work held back while a lane is backlogged. It's passed to `start` once the lane finishes enough of its own work
+    not to be backlogged anymore, without any thread waiting for it meanwhile. It isn't held back for longer than
+    `LANE_MAX_YIELD`, so that it's still done under a sustained backlog.
+    """
+
+    def __init__(self, lane: Lane, start: typing.Callable[[typing.Callable[..., None], typing.Tuple[typing.Any, ...]], None]) -> None:
+        self._lane = lane
+        self._start = start
+
+        self._work: typing.Deque[typing.Tuple[float, typing.Callable[..., None], typing.Tuple[typing.Any, ...]]] = collections.deque()
+        self._lock = threading.Lock()
+
+        lane.add_completion_listener(self.release)
+
+    def __len__(self) -> int:
+        return len(self._work)
+
+    def submit(self, function: typing.Callable[..., None], args: typing.Tuple[typing.Any, ...]) -> None:
+        with self._lock:
+            # The work is started in order, so nothing overtakes the work that is already held back.
+            is_held = len(self._work) > 0 or self._lane.is_backlogged()
+
+            if is_held:
+                self._work.append((time.monotonic(), function, args))
+
+        if is_held:
+            # The work held back for too long is also released here, in case the lane doesn't finish any work for a while.
+            self.release()
+        else:
+            self._start(function, args)
+
+    def release(self) -> None:
+        """
+        Starts the work that no longer has to be held back.
+        """
+
+        max_yield_start = time.monotonic() - constants.LANE_MAX_YIELD.total_seconds()
+        released_work: typing.List[typing.Tuple[typing.Callable[..., None], typing.Tuple[typing.Any, ...]]] = []
+
+        with self._lock:
+            is_backlogged = self._lane.is_backlogged()
+
+            while self._work and (not is_backlogged or self._work[0][0] <= max_yield_start):
+                (_held_at, function, args) = self._work.popleft()
+
+                released_work.append((function, args))
+
+        for (function, args) in released_work:
+            self._start(function, args)
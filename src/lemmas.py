@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import mmap
+import typing
+
+logger = logging.getLogger(__name__)
+
+
+def write_word_list(words_path: str, lemmas_path: str, normalize: typing.Callable[[str], str]) -> int:
+    """
+    Writes the words of a file with one word per line as a word list for `LemmaIndex`, normalized by `normalize`,
+    without duplicates, and sorted by their UTF-8 bytes, which is also the order of their code points. Returns the
+    number of lemmas.
+    """
+
+    with open(words_path, encoding='utf-8') as words_file:
+        lemmas = sorted({lemma for lemma in map(normalize, words_file) if lemma})
+
+    with open(lemmas_path, 'w', encoding='utf-8') as lemmas_file:
+        lemmas_file.writelines(f'{lemma}\n' for lemma in lemmas)
+
+    return len(lemmas)
+
+
+class LemmaIndex:
+    """
+    A word list file with one lemma per line, written by `write_word_list` with the same `normalize` function.
+    The lemmas are matched by their normalized spellings, like the queries are looked up, and the file is
+    memory-mapped and searched in place, so loading it doesn't depend on its size.
+    """
+
+    def __init__(self, path: str, normalize: typing.Callable[[str], str]) -> None:
+        self._normalize = normalize
+        self._lemmas: typing.Union[mmap.mmap, bytes] = b''
+
+        with open(path, 'rb') as file:
+            try:
+                self._lemmas = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                logger.warning(f'Empty word list "{path}"')
+
+    def _get_key(self, word: str) -> bytes:
+        return self._normalize(word).encode()
+
+    def _get_line_start(self, position: int) -> int:
+        """
+        Returns the position of the first line that starts at or after `position`.
+        """
+
+        if position == 0:
+            return 0
+
+        line_end = self._lemmas.find(b'\n', position - 1)
+
+        if line_end == -1:
+            return len(self._lemmas)
+
+        return line_end + 1
+
+    def _get_line(self, start: int) -> typing.Tuple[bytes, int]:
+        end = self._lemmas.find(b'\n', start)
+
+        if end == -1:
+            end = len(self._lemmas)
+
+        return self._lemmas[start:end], end + 1
+
+    def _get_lower_bound(self, key: bytes) -> int:
+        """
+        Returns the position of the first line that isn't smaller than `key`.
+        """
+
+        low = 0
+        high = len(self._lemmas)
+
+        while low < high:
+            middle = (low + high) // 2
+            line_start = self._get_line_start(middle)
+
+            if line_start < len(self._lemmas) and self._get_line(line_start)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        return self._get_line_start(low)
+
+    def __contains__(self, word: str) -> bool:
+        key = self._get_key(word)
+        line_start = self._get_lower_bound(key)
+
+        return line_start < len(self._lemmas) and self._get_line(line_start)[0] == key
+
+    def get_completions(self, prefix: str, limit: int) -> typing.List[str]:
+        key = self._get_key(prefix)
+        completions: typing.List[str] = []
+
+        if not key:
+            return completions
+
+        line_start = self._get_lower_bound(key)
+
+        while line_start < len(self._lemmas) and len(completions) < limit:
+            (line, line_start) = self._get_line(line_start)
+
+            if not line.startswith(key):
+                break
+
+            completions.append(line.decode())
+
+        return completions
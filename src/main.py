@@ -1,29 +1,49 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+# The startup report times the other imports, so it's imported first.
+import startup
+
 import argparse
+import concurrent.futures
 import configparser
 import datetime
+import functools
 import json
 import logging
 import os
+import sqlite3
 import sys
 import threading
+import time
 import typing
 
 import pytz
-import requests_cache
+import telegram.error
 import telegram.ext
-import telegram.utils.request
 
 import analytics
+import complete_definition
 import constants
 import custom_logger
 import database
+import inline_answers
+import inline_queries
+import keyboards
+import lanes
+import lemmas
 import queue_bot
 import queue_updater
+import rate_limits
+import response_cache
+import stats
+import supervisor
 import telegram_utils
+import updates
 import utils
+import webhook_replies
+
+startup.report.finish_imports()
 
 custom_logger.configure_root_logger()
 
@@ -36,14 +56,204 @@ ADMIN_USER_ID: int
 
 updater: queue_updater.QueueUpdater
 analytics_handler: analytics.AnalyticsHandler
+lemma_index: typing.Optional[lemmas.LemmaIndex] = None
+inline_query_tracker = inline_queries.InlineQueryTracker(max_users=constants.INLINE_QUERY_TRACKER_SIZE)
+recent_updates = updates.RecentUpdates(
+    max_size=constants.RECENT_UPDATES_SIZE,
+    expire_after=constants.RECENT_UPDATES_TIME
+)
+recent_updates_path: typing.Optional[str] = None
+cache_snapshot_path: typing.Optional[str] = None
+responses_cache_max_size = constants.RESPONSES_CACHE_MAX_SIZE
+responses_cache_eviction_policy = response_cache.EvictionPolicy.LEAST_RECENTLY_USED
+replies: typing.Optional[webhook_replies.WebhookReplies] = None
+workers_supervisor: typing.Optional[supervisor.Supervisor] = None
+worker_index: typing.Optional[int] = None
+database_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=constants.DATABASE_WORKERS,
+    thread_name_prefix='database'
+)
+interactive_lane = lanes.Lane(
+    name='interactive',
+    workers=constants.INTERACTIVE_LANE_WORKERS,
+    max_size=constants.INTERACTIVE_LANE_SIZE
+)
+messages_lane = lanes.Lane(
+    name='messages',
+    workers=constants.MESSAGES_LANE_WORKERS,
+    max_size=constants.MESSAGES_LANE_SIZE,
+    yields_to=interactive_lane
+)
+throttled_lane = lanes.Lane(
+    name='throttled',
+    workers=constants.THROTTLED_LANE_WORKERS,
+    max_size=constants.THROTTLED_LANE_SIZE
+)
+
+rate_limiter = rate_limits.RateLimiter(
+    rate=constants.RATE_LIMIT_RATE,
+    burst=constants.RATE_LIMIT_BURST,
+    max_users=constants.RATE_LIMITER_SIZE
+)
+
+stats.register_gauge(constants.STATS_RATE_LIMITER_SIZE, rate_limiter.__len__)
+stats.register_gauge(constants.STATS_THROTTLED_USERS, lambda: rate_limiter.throttled_users)
+stats.register_gauge(constants.STATS_INTERACTIVE_LANE_SIZE, interactive_lane.__len__)
+stats.register_gauge(constants.STATS_MESSAGES_LANE_SIZE, messages_lane.__len__)
+stats.register_gauge(constants.STATS_THROTTLED_LANE_SIZE, throttled_lane.__len__)
+
+
+def save_recent_updates() -> None:
+    if recent_updates_path is not None:
+        recent_updates.save(recent_updates_path)
+
+
+def save_caches_snapshot() -> None:
+    if cache_snapshot_path is not None:
+        utils.save_caches_snapshot(cache_snapshot_path)
+
+
+def drain_updates() -> None:
+    """
+    Waits, for a limited time, until the updates already received are handled. Telegram delivers again the updates
+    received after the webhook is stopped.
+    """
+
+    updater.stop_receiving()
+
+    deadline = time.monotonic() + constants.DRAIN_TIMEOUT.total_seconds()
+
+    while time.monotonic() < deadline:
+        if updater.update_queue.empty() and len(interactive_lane) == 0 and len(messages_lane) == 0 and len(throttled_lane) == 0:
+            return
+
+        time.sleep(constants.DRAIN_CHECK_INTERVAL.total_seconds())
+
+    logger.warning('Restarting before all the updates were handled')
 
 
 def stop_and_restart() -> None:
+    # The workers are restarted by the supervisor, after they drain their updates.
+    if workers_supervisor is not None and worker_index is not None:
+        workers_supervisor.request_restart()
+
+        return
+
+    drain_updates()
+
     updater.stop()
+    interactive_lane.shutdown()
+    messages_lane.shutdown()
+    throttled_lane.shutdown()
+    analytics_handler.lane.shutdown()
+    database_executor.shutdown()
+    save_recent_updates()
+    save_caches_snapshot()
+
     os.execl(sys.executable, sys.executable, *sys.argv)
 
 
-def create_or_update_user(bot: telegram.Bot, user: telegram.User) -> None:
+def is_webhook_reply_expected(update: telegram.Update) -> bool:
+    if update.inline_query is not None or update.callback_query is not None:
+        return True
+
+    message = update.message
+
+    return message is not None and message.text is not None and not message.text.startswith('/')
+
+
+def finish_webhook_reply(update: telegram.Update) -> None:
+    if replies is not None:
+        replies.finish(update.update_id)
+
+
+LaneHandler = typing.Callable[[telegram.Update, telegram.ext.CallbackContext, typing.Optional[float]], None]
+
+
+def finishes_webhook_reply(handler: LaneHandler) -> LaneHandler:
+    """
+    Lets the webhook respond as soon as the handler returns, even if it didn't reply.
+    """
+
+    @functools.wraps(handler)
+    def wrapper(update: telegram.Update, context: telegram.ext.CallbackContext, deadline: typing.Optional[float]) -> None:
+        try:
+            handler(update, context, deadline)
+        finally:
+            finish_webhook_reply(update)
+
+    return wrapper
+
+
+def broadcast_to_workers(command: supervisor.ControlCommand, *args: str) -> None:
+    """
+    Applies the command, already applied by this worker, to the other workers.
+    """
+
+    if workers_supervisor is not None and worker_index is not None:
+        workers_supervisor.broadcast(supervisor.ControlMessage(command, args), excluded_index=worker_index)
+
+
+def control_message_handler(message: supervisor.ControlMessage) -> None:
+    if message.command == supervisor.ControlCommand.DISCARD_CACHED_QUERIES:
+        utils.discard_cached_queries(message.args)
+    elif message.command == supervisor.ControlCommand.CLEAR_NEGATIVE_RESULTS:
+        utils.negative_results_cache.clear()
+    elif message.command == supervisor.ControlCommand.DRAIN:
+        drain_updates()
+
+        # The updater is stopped by the main thread, once it's no longer idle.
+        updater.is_idle = False
+
+
+def get_lane_handler(lane: lanes.Lane, handler: LaneHandler, answer_window: typing.Optional[datetime.timedelta] = None) -> typing.Callable[[telegram.Update, telegram.ext.CallbackContext], None]:
+    """
+    Runs the handler in the lane, instead of in the dispatcher's workers. The updates that don't fit in the lane are
+    dropped.
+
+    The updates that must be answered within `answer_window` of being received are dropped if it ends while they wait
+    for a worker, and their handler gets its end as the deadline of their lookups, so that the waiting and the lookup
+    share the window instead of each one having its own.
+    """
+
+    def run(update: telegram.Update, context: telegram.ext.CallbackContext, received_at: float) -> None:
+        deadline = received_at + answer_window.total_seconds() if answer_window is not None else None
+
+        if deadline is not None and time.monotonic() > deadline:
+            stats.increment(constants.STATS_EXPIRED_UPDATES)
+
+            finish_webhook_reply(update)
+
+            return
+
+        try:
+            handler(update, context, deadline)
+        except Exception as error:
+            context.dispatcher.dispatch_error(update, error)
+
+        if not startup.report.is_complete and startup.report.complete('First update'):
+            logger.info(startup.report.get_text(constants.STARTUP_REPORT_IMPORTS_LIMIT))
+
+    @functools.wraps(handler)
+    def wrapper(update: telegram.Update, context: telegram.ext.CallbackContext) -> None:
+        if not lane.submit(run, update, context, time.monotonic()):
+            stats.increment(constants.STATS_SHED_UPDATES)
+
+            finish_webhook_reply(update)
+
+    return wrapper
+
+
+def send_reply(bot: telegram.Bot, update: telegram.Update, method: str, data: typing.Dict[str, typing.Any]) -> None:
+    if replies is not None and replies.offer(update.update_id, method, data):
+        stats.increment(constants.STATS_WEBHOOK_REPLIES)
+
+        return
+
+    telegram_utils.call_method(bot, method, data)
+
+
+def save_user(bot: telegram.Bot, user: telegram.User) -> None:
     db_user = database.User.create_or_update_user(
         id=user.id,
         username=user.username,
@@ -54,17 +264,29 @@ def create_or_update_user(bot: telegram.Bot, user: telegram.User) -> None:
     if db_user is not None:
         prefix = 'New user:'
 
-        bot.send_message(
-            chat_id=ADMIN_USER_ID,
-            text=(
-                f'{telegram_utils.escape_v2_markdown_text(prefix)} '
-                f'{db_user.get_markdown_description()}'
-            ),
-            parse_mode=telegram.ParseMode.MARKDOWN_V2
-        )
+        try:
+            bot.send_message(
+                chat_id=ADMIN_USER_ID,
+                text=(
+                    f'{telegram_utils.escape_v2_markdown_text(prefix)} '
+                    f'{db_user.get_markdown_description()}'
+                ),
+                parse_mode=telegram.ParseMode.MARKDOWN_V2
+            )
+        except telegram.error.TelegramError as error:
+            logger.error(f'New user message error: {error}')
 
 
-def start_command_handler(update: telegram.Update, context: telegram.ext.CallbackContext) -> None:
+def create_or_update_user(bot: telegram.Bot, user: telegram.User) -> concurrent.futures.Future:
+    """
+    The users are saved one at a time, in the order of their updates, by the database executor, so the handlers only
+    wait for it when they read the user afterwards.
+    """
+
+    return database_executor.submit(save_user, bot, user)
+
+
+def start_command_handler(update: telegram.Update, context: telegram.ext.CallbackContext, deadline: typing.Optional[float]) -> None:
     message = update.message
 
     if message is None:
@@ -84,25 +306,40 @@ def start_command_handler(update: telegram.Update, context: telegram.ext.Callbac
     except UnicodeDecodeError:
         pass
 
+    user_saved: typing.Optional[concurrent.futures.Future] = None
+
     if user is not None:
-        create_or_update_user(bot, user)
+        user_saved = create_or_update_user(bot, user)
 
-        analytics_handler.track(context, analytics.AnalyticsType.COMMAND, user, f'/start {query}')
+        analytics_handler.track(analytics.AnalyticsType.COMMAND, user, f'/start {query}')
 
     if query:
         bot.send_chat_action(chat_id, telegram.ChatAction.TYPING)
 
         if user is not None:
-            analytics_handler.track(context, analytics.AnalyticsType.MESSAGE, user, query)
+            analytics_handler.track(analytics.AnalyticsType.MESSAGE, user, query)
 
         links_toggle = False
 
-        (definitions, offset) = utils.get_query_definitions(update, context, query, links_toggle, analytics_handler, cli_args, BOT_NAME)
+        try:
+            (definitions, _offset) = utils.get_query_definitions(update, context, query, links_toggle, analytics_handler, cli_args, BOT_NAME, definition_index=0, deadline=deadline)
+        except utils.DexUnavailableError:
+            bot.send_message(
+                chat_id=chat_id,
+                text=constants.DEX_UNAVAILABLE_TEXT,
+                reply_to_message_id=message_id
+            )
+
+            return
+
+        # The onboarding needs the saved user.
+        if user_saved is not None:
+            user_saved.result()
 
         if len(definitions) == 0:
             telegram_utils.send_no_results_message(bot, chat_id, message_id, query)
         else:
-            definition = definitions[offset]
+            definition = definitions[0]
             reply_markup = telegram.InlineKeyboardMarkup(definition.inline_keyboard_buttons)
 
             bot.send_message(
@@ -161,9 +398,11 @@ def subscribe_command_handler(update: telegram.Update, context: telegram.ext.Cal
     if user is None:
         return
 
-    create_or_update_user(bot, user)
+    user_saved = create_or_update_user(bot, user)
 
-    analytics_handler.track(context, analytics.AnalyticsType.COMMAND, user, '/subscribe')
+    analytics_handler.track(analytics.AnalyticsType.COMMAND, user, '/subscribe')
+
+    user_saved.result()
 
     db_user: database.User = database.User.get_or_none(database.User.telegram_id == user.id)
 
@@ -267,17 +506,259 @@ def clear_command_handler(update: telegram.Update, context: telegram.ext.Callbac
     for query in args:
         bot.send_message(chat_id, utils.clear_definitions_cache(query))
 
+    broadcast_to_workers(supervisor.ControlCommand.DISCARD_CACHED_QUERIES, *map(utils.normalize_query, args))
+
+
+def negative_command_handler(update: telegram.Update, context: telegram.ext.CallbackContext) -> None:
+    message = update.message
+
+    if message is None:
+        return
+
+    bot = context.bot
+
+    chat_id = message.chat_id
+
+    if not telegram_utils.check_admin(bot, context, message, analytics_handler, ADMIN_USER_ID):
+        return
+
+    args = context.args or []
+
+    if 'clear' in args:
+        utils.negative_results_cache.clear()
+
+        broadcast_to_workers(supervisor.ControlCommand.CLEAR_NEGATIVE_RESULTS)
+
+        bot.send_message(chat_id, 'Negative cache successfully cleared')
+    else:
+        bot.send_message(chat_id, utils.get_negative_results_cache_description())
+
+
+def stats_command_handler(update: telegram.Update, context: telegram.ext.CallbackContext) -> None:
+    message = update.message
+
+    if message is None:
+        return
+
+    bot = context.bot
+
+    chat_id = message.chat_id
 
-def inline_query_handler(update: telegram.Update, context: telegram.ext.CallbackContext) -> None:
+    if not telegram_utils.check_admin(bot, context, message, analytics_handler, ADMIN_USER_ID):
+        return
+
+    bot.send_message(chat_id, get_stats_text())
+
+
+def cache_command_handler(update: telegram.Update, context: telegram.ext.CallbackContext) -> None:
+    message = update.message
+
+    if message is None:
+        return
+
+    bot = context.bot
+
+    chat_id = message.chat_id
+
+    if not telegram_utils.check_admin(bot, context, message, analytics_handler, ADMIN_USER_ID):
+        return
+
+    args = context.args or []
+
+    if args and args[0] == 'purge':
+        for pattern in args[1:]:
+            (text, purged_queries) = utils.purge_definitions_cache(pattern)
+
+            broadcast_to_workers(supervisor.ControlCommand.DISCARD_CACHED_QUERIES, *purged_queries)
+
+            bot.send_message(chat_id, text)
+    else:
+        bot.send_message(chat_id, utils.get_responses_cache_description(stats.combine(get_stats_snapshots())))
+
+
+def responses_cache_accesses_job_handler(_context: telegram.ext.CallbackContext) -> None:
+    """
+    Writes the accesses to the responses cache counted by this worker, which isn't the first one.
+    """
+
+    try:
+        utils.responses_cache.flush_accesses()
+    except sqlite3.Error as error:
+        logger.warning(f'Responses cache error: {error}')
+
+
+def responses_cache_job_handler(_context: telegram.ext.CallbackContext) -> None:
+    """
+    Keeps the responses cache under its maximum size, after writing the accesses counted by this worker, and returns
+    its free space to the file system during the quiet hours. It trims the stored callback data tokens and the shared
+    rendered definitions too. It runs
+    only in the first worker, because the workers share the cache.
+
+    It also fills in, a batch at a time, the URLs of the responses cached before they were tracked, and purges the
+    timestamped word of the day responses among them.
+    """
+
+    cache = utils.responses_cache
+
+    try:
+        if cache.fill_urls(constants.RESPONSES_CACHE_URLS_BATCH) > 0:
+            cache.purge(constants.TIMESTAMPED_WORD_OF_THE_DAY_URL_PATTERN)
+
+        stats.increment(
+            constants.STATS_RESPONSE_CACHE_EVICTIONS,
+            cache.evict(responses_cache_max_size, constants.RESPONSES_CACHE_EVICTION_TARGET, responses_cache_eviction_policy)
+        )
+
+        # The cached answers embed the tokens stored when they were rendered, at most one save interval earlier.
+        database.CallbackDataToken.trim(constants.CALLBACK_DATA_STORED_TOKENS_SIZE, constants.RESULTS_CACHE_TIME + constants.CALLBACK_DATA_TOKEN_SAVE_INTERVAL)
+
+        if utils.rendered_definitions_cache.store is not None:
+            utils.rendered_definitions_cache.store.trim(constants.RENDERED_STORE_SIZE)
+
+        if datetime.datetime.now(pytz.timezone(constants.WORD_OF_THE_DAY_TIMEZONE)).hour in constants.RESPONSES_CACHE_QUIET_HOURS:
+            cache.vacuum(constants.RESPONSES_CACHE_VACUUM_PAGES)
+    except sqlite3.Error as error:
+        logger.warning(f'Responses cache error: {error}')
+
+
+def get_worker_stats_path(index: int) -> str:
+    return constants.WORKER_STATS_PATH_FORMAT.format(index)
+
+
+def worker_stats_job_handler(_context: telegram.ext.CallbackContext) -> None:
+    if worker_index is not None:
+        stats.save(get_worker_stats_path(worker_index))
+
+
+def get_stats_snapshots() -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    The stats of each worker that has saved them.
+    """
+
+    if workers_supervisor is None or worker_index is None:
+        return [stats.get_values()]
+
+    # The stats of this worker are current, and the others are at most one interval old.
+    snapshots = [stats.get_values() if index == worker_index else stats.load(get_worker_stats_path(index)) for index in range(workers_supervisor.workers)]
+
+    return [snapshot for snapshot in snapshots if snapshot is not None]
+
+
+def get_stats_text() -> str:
+    if workers_supervisor is None or worker_index is None:
+        return stats.get_stats_text()
+
+    snapshots = get_stats_snapshots()
+
+    return (
+        f'Workers: {len(snapshots)} / {workers_supervisor.workers}\n'
+        f'{stats.get_stats_text(stats.combine(snapshots))}'
+    )
+
+
+def is_inline_query_superseded(inline_query: telegram.InlineQuery) -> bool:
+    if not inline_query_tracker.is_superseded(inline_query):
+        return False
+
+    stats.increment(constants.STATS_SKIPPED_INLINE_QUERIES)
+
+    return True
+
+
+def duplicate_update_handler(update: telegram.Update, _context: telegram.ext.CallbackContext) -> None:
+    if recent_updates.add(update.update_id):
+        return
+
+    stats.increment(constants.STATS_DUPLICATE_UPDATES)
+
+    if replies is not None:
+        replies.finish(update.update_id)
+
+    # The webhook has already acknowledged it, so skipping the rest of the handlers is enough.
+    raise telegram.ext.DispatcherHandlerStop()
+
+
+def is_throttled(user: typing.Optional[telegram.User]) -> bool:
+    if user is None or user.id == ADMIN_USER_ID or rate_limiter.allow(user.id):
+        return False
+
+    stats.increment(constants.STATS_THROTTLED_UPDATES)
+
+    return True
+
+
+def rate_limit_handler(update: telegram.Update, context: telegram.ext.CallbackContext) -> None:
+    # The inline queries are charged by their handler, only when they aren't superseded by the next keystroke.
+    if update.inline_query is not None or not is_throttled(update.effective_user):
+        return
+
+    # Only the callback queries are answered, so that their buttons stop loading. The others are dropped, because
+    # answering them would cost as much as the updates themselves. The answers are sent from their own lane, because
+    # this runs on the dispatcher thread, and they are dropped too when a burst fills it.
+    is_answered = update.callback_query is not None and throttled_lane.submit(send_reply, context.bot, update, 'answerCallbackQuery', {
+        'callback_query_id': update.callback_query.id,
+        'text': constants.RATE_LIMITED_TEXT
+    })
+
+    if not is_answered:
+        finish_webhook_reply(update)
+
+    raise telegram.ext.DispatcherHandlerStop()
+
+
+def inline_query_tracker_handler(update: telegram.Update, _context: telegram.ext.CallbackContext) -> None:
     inline_query = update.inline_query
 
     if inline_query is None:
         return
 
+    # This runs on the dispatcher thread, before the query is queued for the workers.
+    inline_query_tracker.track(inline_query)
+
+
+def answer_query_suggestions(inline_query: telegram.InlineQuery, query: str, lemma_index: lemmas.LemmaIndex) -> bool:
+    """
+    Answers the inline query with the lemmas that it's a strict prefix of, and with a button that looks it up exactly.
+    Returns `False` if there are none.
+    """
+
+    suggestions = utils.get_query_suggestions(query, lemma_index, cli_args, BOT_NAME)
+
+    if len(suggestions) == 0:
+        return False
+
+    suggestions_cache_time = int(constants.SUGGESTIONS_CACHE_TIME.total_seconds())
+
+    if cli_args.debug:
+        suggestions_cache_time = 0
+
+    inline_query.answer(
+        results=suggestions,
+        cache_time=suggestions_cache_time,
+        switch_pm_text=constants.SUGGESTIONS_EXACT_SEARCH_TEXT,
+        switch_pm_parameter=utils.base64_encode(query)
+    )
+
+    return True
+
+
+@finishes_webhook_reply
+def inline_query_handler(update: telegram.Update, context: telegram.ext.CallbackContext, deadline: typing.Optional[float]) -> None:
+    inline_query = update.inline_query
+
+    if inline_query is None:
+        return
+
+    if is_inline_query_superseded(inline_query):
+        return
+
     bot = context.bot
 
     user = inline_query.from_user
 
+    if is_throttled(user):
+        return
+
     create_or_update_user(bot, user)
 
     query = None
@@ -289,7 +770,7 @@ def inline_query_handler(update: telegram.Update, context: telegram.ext.Callback
             query = inline_query.query
 
         if not query:
-            analytics_handler.track(context, analytics.AnalyticsType.EMPTY_QUERY, user)
+            analytics_handler.track(analytics.AnalyticsType.EMPTY_QUERY, user)
 
             return
 
@@ -314,25 +795,77 @@ def inline_query_handler(update: telegram.Update, context: telegram.ext.Callback
 
         logger.info(f'{user_identification} {query}')
 
+    cache_time = int(constants.RESULTS_CACHE_TIME.total_seconds())
+
+    if cli_args.debug:
+        cache_time = 0
+
+    is_answer_cacheable = not cli_args.fragment and cli_args.index is None
+    normalized_query = utils.normalize_query(query or '')
+    displayed_query = utils.get_displayed_query(query or '')
+
+    if is_answer_cacheable:
+        answer = utils.inline_answers_cache.get(normalized_query, displayed_query, inline_query.offset)
+
+        if answer is not None:
+            stats.increment(constants.STATS_INLINE_ANSWERS_CACHE_HITS)
+
+            if not inline_query.offset:
+                analytics_handler.track(analytics.AnalyticsType.INLINE_QUERY, user, query)
+
+            send_reply(bot, update, 'answerInlineQuery', telegram_utils.get_answer_inline_query_data(inline_query.id, answer, cache_time))
+
+            return
+
+    # The partial words are answered with the lemmas that start with them, without looking them up.
+    if lemma_index is not None and query and not inline_query.offset and utils.is_query_suggestible(query, lemma_index):
+        if answer_query_suggestions(inline_query, query, lemma_index):
+            analytics_handler.track(analytics.AnalyticsType.INLINE_QUERY, user, query)
+
+            return
+
     links_toggle = False
 
-    (definitions, offset) = utils.get_query_definitions(update, context, query, links_toggle, analytics_handler, cli_args, BOT_NAME)
+    try:
+        (definitions, offset) = utils.get_query_definitions(update, context, query, links_toggle, analytics_handler, cli_args, BOT_NAME, should_cancel=(lambda: inline_query_tracker.is_superseded(inline_query)), deadline=deadline)
+    except utils.CancelledQueryError:
+        stats.increment(constants.STATS_SKIPPED_INLINE_QUERIES)
 
-    definitions_count = len(definitions)
+        return
+    except utils.DexUnavailableError:
+        if is_inline_query_superseded(inline_query):
+            return
+
+        # Not cached, so that the query is looked up again as soon as dexonline is back.
+        inline_query.answer(
+            results=[],
+            cache_time=0,
+            switch_pm_text=constants.DEX_UNAVAILABLE_TEXT,
+            switch_pm_parameter=utils.base64_encode(query) if query is not None else ''
+        )
 
-    no_results_text = None
-    no_results_parameter = None
+        return
+
+    definitions_count = len(definitions)
 
     if definitions_count == 0:
-        no_results_text = 'Niciun rezultat'
-        no_results_parameter = utils.base64_encode(query) if query is not None else ''
-    else:
-        definitions = definitions[:telegram.constants.MAX_INLINE_QUERY_RESULTS]
+        if is_inline_query_superseded(inline_query):
+            return
 
-    cache_time = int(constants.RESULTS_CACHE_TIME.total_seconds())
+        # The words without definitions are answered with the lemmas that start with them, if any.
+        if lemma_index is not None and query and not inline_query.offset and answer_query_suggestions(inline_query, query, lemma_index):
+            return
 
-    if cli_args.debug:
-        cache_time = 0
+        inline_query.answer(
+            results=[],
+            cache_time=cache_time,
+            switch_pm_text='Niciun rezultat',
+            switch_pm_parameter=utils.base64_encode(query) if query is not None else ''
+        )
+
+        return
+
+    definitions = definitions[:telegram.constants.MAX_INLINE_QUERY_RESULTS]
 
     next_offset = None
 
@@ -340,17 +873,19 @@ def inline_query_handler(update: telegram.Update, context: telegram.ext.Callback
         next_offset = str(offset + telegram.constants.MAX_INLINE_QUERY_RESULTS)
 
     definitions_results = list(map(utils.get_inline_query_definition_result, definitions))
+    answer = inline_answers.get_inline_answer(definitions_results, next_offset)
 
-    inline_query.answer(
-        results=definitions_results,
-        cache_time=cache_time,
-        next_offset=next_offset,
-        switch_pm_text=no_results_text,
-        switch_pm_parameter=no_results_parameter
-    )
+    if is_answer_cacheable:
+        utils.inline_answers_cache.add(normalized_query, displayed_query, inline_query.offset, answer)
+
+    if is_inline_query_superseded(inline_query):
+        return
+
+    send_reply(bot, update, 'answerInlineQuery', telegram_utils.get_answer_inline_query_data(inline_query.id, answer, cache_time))
 
 
-def message_handler(update: telegram.Update, context: telegram.ext.CallbackContext) -> None:
+@finishes_webhook_reply
+def message_handler(update: telegram.Update, context: telegram.ext.CallbackContext, deadline: typing.Optional[float]) -> None:
     message = update.effective_message
 
     if message is None:
@@ -363,8 +898,10 @@ def message_handler(update: telegram.Update, context: telegram.ext.CallbackConte
     chat_id = message.chat.id
     user = message.from_user
 
+    user_saved: typing.Optional[concurrent.futures.Future] = None
+
     if user is not None:
-        create_or_update_user(bot, user)
+        user_saved = create_or_update_user(bot, user)
 
     # Most probably the message was sent via a bot.
     if len(message.entities) > 0:
@@ -373,26 +910,44 @@ def message_handler(update: telegram.Update, context: telegram.ext.CallbackConte
     bot.send_chat_action(chat_id, telegram.ChatAction.TYPING)
 
     if user is not None:
-        analytics_handler.track(context, analytics.AnalyticsType.MESSAGE, user, query)
+        analytics_handler.track(analytics.AnalyticsType.MESSAGE, user, query)
 
     links_toggle = False
 
-    (definitions, offset) = utils.get_query_definitions(update, context, query, links_toggle, analytics_handler, cli_args, BOT_NAME)
+    try:
+        (definitions, _offset) = utils.get_query_definitions(update, context, query, links_toggle, analytics_handler, cli_args, BOT_NAME, definition_index=0, deadline=deadline)
+    except utils.DexUnavailableError:
+        send_reply(bot, update, 'sendMessage', {
+            'chat_id': chat_id,
+            'text': constants.DEX_UNAVAILABLE_TEXT,
+            'reply_to_message_id': message_id
+        })
+
+        return
+
+    # The onboarding needs the saved user.
+    if user_saved is not None:
+        user_saved.result()
 
     if len(definitions) == 0:
         telegram_utils.send_no_results_message(bot, chat_id, message_id, query or '')
     else:
-        definition = definitions[offset]
+        definition = definitions[0]
         reply_markup = telegram.InlineKeyboardMarkup(definition.inline_keyboard_buttons)
-
-        bot.send_message(
-            chat_id=chat_id,
-            text=definition.html,
-            reply_markup=reply_markup,
-            parse_mode=telegram.ParseMode.HTML,
-            disable_web_page_preview=True,
-            reply_to_message_id=message_id
-        )
+        data = {
+            'chat_id': chat_id,
+            'text': definition.html,
+            'reply_markup': reply_markup.to_dict(),
+            'parse_mode': telegram.ParseMode.HTML,
+            'disable_web_page_preview': True,
+            'reply_to_message_id': message_id
+        }
+
+        # The onboarding message must be sent after the definition, so the definition can't wait for the response.
+        if user is not None and utils.is_subscription_onboarding_needed(user):
+            telegram_utils.call_method(bot, 'sendMessage', data)
+        else:
+            send_reply(bot, update, 'sendMessage', data)
 
     if user is not None:
         utils.send_subscription_onboarding_message_if_needed(
@@ -402,7 +957,8 @@ def message_handler(update: telegram.Update, context: telegram.ext.CallbackConte
         )
 
 
-def message_answer_handler(update: telegram.Update, context: telegram.ext.CallbackContext) -> None:
+@finishes_webhook_reply
+def message_answer_handler(update: telegram.Update, context: telegram.ext.CallbackContext, deadline: typing.Optional[float]) -> None:
     callback_query = update.callback_query
 
     if callback_query is None:
@@ -417,7 +973,7 @@ def message_answer_handler(update: telegram.Update, context: telegram.ext.Callba
 
         return
 
-    callback_data = json.loads(raw_callback_data)
+    callback_data = keyboards.callback_data_codec.decode(raw_callback_data)
 
     if not callback_data:
         callback_query.answer()
@@ -490,13 +1046,23 @@ def message_answer_handler(update: telegram.Update, context: telegram.ext.Callba
 
             if is_toggling_links:
                 is_active = db_user.subscription != database.User.Subscription.revoked.value
-                definition = utils.get_word_of_the_day_definition(
-                    date=wotd_date,
-                    links_toggle=links_toggle,
-                    cli_args=cli_args,
-                    bot_name=BOT_NAME,
-                    with_stop=is_active
-                )
+
+                try:
+                    definition = utils.get_word_of_the_day_definition(
+                        date=wotd_date,
+                        links_toggle=links_toggle,
+                        cli_args=cli_args,
+                        bot_name=BOT_NAME,
+                        with_stop=is_active
+                    )
+                except utils.DexUnavailableError:
+                    send_reply(bot, update, 'answerCallbackQuery', {
+                        'callback_query_id': callback_query.id,
+                        'text': constants.DEX_UNAVAILABLE_TEXT
+                    })
+
+                    return
+
                 reply_markup = telegram.InlineKeyboardMarkup(definition.inline_keyboard_buttons)
 
                 bot.edit_message_text(
@@ -508,7 +1074,13 @@ def message_answer_handler(update: telegram.Update, context: telegram.ext.Callba
                     disable_web_page_preview=True
                 )
             else:
-                subscription = database.User.Subscription(state)
+                try:
+                    subscription = database.User.Subscription(state)
+                except ValueError:
+                    # A forged state.
+                    callback_query.answer()
+
+                    return
 
                 db_user.subscription = subscription.value
                 db_user.save()
@@ -523,7 +1095,7 @@ def message_answer_handler(update: telegram.Update, context: telegram.ext.Callba
                         pass
                 else:
                     is_active = db_user.subscription != database.User.Subscription.revoked.value
-                    reply_markup = telegram.InlineKeyboardMarkup(utils.get_subscription_notification_inline_keyboard_buttons(
+                    reply_markup = telegram.InlineKeyboardMarkup(keyboards.get_subscription_notification_inline_keyboard_buttons(
                         date=wotd_date,
                         links_toggle=links_toggle,
                         with_stop=is_active
@@ -548,73 +1120,209 @@ def message_answer_handler(update: telegram.Update, context: telegram.ext.Callba
         query: typing.Optional[str] = callback_data[constants.BUTTON_DATA_QUERY_KEY]
         offset = callback_data[constants.BUTTON_DATA_OFFSET_KEY]
 
-        (definitions, _offset) = utils.get_query_definitions(update, context, query, links_toggle, analytics_handler, cli_args, BOT_NAME)
-        definition = definitions[offset]
+        try:
+            (definitions, _offset) = utils.get_query_definitions(update, context, query, links_toggle, analytics_handler, cli_args, BOT_NAME, definition_index=offset, deadline=deadline)
+        except utils.DexUnavailableError:
+            send_reply(bot, update, 'answerCallbackQuery', {
+                'callback_query_id': callback_query.id,
+                'text': constants.DEX_UNAVAILABLE_TEXT
+            })
+
+            return
+
+        if len(definitions) == 0:
+            callback_query.answer()
+
+            return
+
+        definition = definitions[0]
         reply_markup = telegram.InlineKeyboardMarkup(definition.inline_keyboard_buttons)
+        data: typing.Dict[str, typing.Any] = {
+            'text': definition.html,
+            'reply_markup': reply_markup.to_dict(),
+            'parse_mode': telegram.ParseMode.HTML,
+            'disable_web_page_preview': True
+        }
 
         if is_inline:
-            bot.edit_message_text(
-                text=definition.html,
-                inline_message_id=message_id,
-                reply_markup=reply_markup,
-                parse_mode=telegram.ParseMode.HTML,
-                disable_web_page_preview=True
-            )
+            data['inline_message_id'] = message_id
         else:
-            bot.edit_message_text(
-                text=definition.html,
-                chat_id=chat_id,
-                message_id=message_id,
-                reply_markup=reply_markup,
-                parse_mode=telegram.ParseMode.HTML,
-                disable_web_page_preview=True
-            )
+            data['chat_id'] = chat_id
+            data['message_id'] = message_id
+
+        send_reply(bot, update, 'editMessageText', data)
+
+
+def get_word_of_the_day_payloads(definition: complete_definition.CompleteDefinition) -> typing.List[queue_bot.BroadcastPayload]:
+    reply_markup = telegram.InlineKeyboardMarkup(definition.inline_keyboard_buttons)
+
+    # Only the chat differs between the messages, so their parameters are serialized once for all of them.
+    payloads = [queue_bot.BroadcastPayload('sendMessage', {
+        'text': definition.html,
+        'reply_markup': reply_markup.to_dict(),
+        'parse_mode': telegram.ParseMode.HTML,
+        'disable_web_page_preview': True,
+        'disable_notification': True
+    })]
+
+    url = definition.image_url
+
+    if url is not None:
+        caption = f'© imagine {definition.image_author}'
+
+        if url.endswith('gif'):
+            payloads.append(queue_bot.BroadcastPayload('sendAnimation', {
+                'animation': url,
+                'caption': caption,
+                'disable_notification': True
+            }))
+        else:
+            payloads.append(queue_bot.BroadcastPayload('sendPhoto', {
+                'photo': url,
+                'caption': caption,
+                'disable_notification': True
+            }))
+
+    return payloads
 
 
 def word_of_the_day_job_handler(context: telegram.ext.CallbackContext) -> None:
+    """
+    The retries are scheduled with the number of the previous attempts as their context.
+    """
+
+    job = context.job
+    attempts = typing.cast(int, job.context or 0) if job is not None else 0
+
+    date = utils.get_current_word_of_the_day_date()
+
+    try:
+        word_of_the_day = utils.get_word_of_the_day(date)
+    except utils.DexUnavailableError as error:
+        if attempts >= constants.WORD_OF_THE_DAY_RETRIES:
+            logger.error(f'Could not get the word of the day: {error}')
+
+            telegram_queue_bot.queue_message(
+                chat_id=ADMIN_USER_ID,
+                text='Could not send the word of the day, dexonline is unavailable'
+            )
+
+            return
+
+        delay = constants.WORD_OF_THE_DAY_RETRY_DELAY * 2 ** attempts
+
+        logger.warning(f'Could not get the word of the day, retrying in {delay}: {error}')
+
+        job_queue.run_once(
+            callback=word_of_the_day_job_handler,
+            when=delay,
+            context=attempts + 1
+        )
+
+        return
+
+    # The delivery was already started, before a restart, and it's resumed at startup instead.
+    if word_of_the_day.delivered_slots is not None:
+        return
+
     definition = utils.get_word_of_the_day_definition(
-        date=None,
+        date=date,
         links_toggle=False,
         cli_args=cli_args,
         bot_name=BOT_NAME,
-        with_stop=True
+        with_stop=True,
+        word_of_the_day=word_of_the_day
     )
-    reply_markup = telegram.InlineKeyboardMarkup(definition.inline_keyboard_buttons)
-    users = database.User.select().where(database.User.subscription == database.User.Subscription.accepted.value)
 
-    for user in users:
-        id = user.telegram_id
+    database.WordOfTheDay.save_delivery(date, 0, 0)
 
-        telegram_queue_bot.queue_message(
-            chat_id=id,
-            text=definition.html,
-            reply_markup=reply_markup,
-            parse_mode=telegram.ParseMode.HTML,
-            disable_web_page_preview=True,
-            disable_notification=True
+    job_queue.run_repeating(
+        callback=word_of_the_day_slot_job_handler,
+        interval=constants.WORD_OF_THE_DAY_DELIVERY_SLOT_DURATION,
+        first=0,
+        context=queue_bot.Broadcast(payloads=get_word_of_the_day_payloads(definition), date=date)
+    )
+
+
+def resume_word_of_the_day_delivery(_context: typing.Optional[telegram.ext.CallbackContext] = None) -> None:
+    """
+    Delivers the slots of today's word of the day that were left when the bot was restarted during its delivery. It's
+    called at startup, so when dexonline is unavailable, it's retried later instead.
+    """
+
+    date = utils.get_current_word_of_the_day_date()
+    word_of_the_day: typing.Optional[database.WordOfTheDay] = database.WordOfTheDay.get_or_none(database.WordOfTheDay.date == date)
+
+    if word_of_the_day is None or word_of_the_day.delivered_slots is None or word_of_the_day.delivered_slots >= constants.WORD_OF_THE_DAY_DELIVERY_SLOTS:
+        return
+
+    try:
+        definition = utils.get_word_of_the_day_definition(
+            date=date,
+            links_toggle=False,
+            cli_args=cli_args,
+            bot_name=BOT_NAME,
+            with_stop=True,
+            word_of_the_day=word_of_the_day
         )
+    except utils.DexUnavailableError as error:
+        logger.warning(f'Could not resume the word of the day delivery, retrying in {constants.WORD_OF_THE_DAY_RETRY_DELAY}: {error}')
 
-        url = definition.image_url
+        job_queue.run_once(
+            callback=resume_word_of_the_day_delivery,
+            when=constants.WORD_OF_THE_DAY_RETRY_DELAY
+        )
 
-        if url is not None:
-            caption = f'© imagine {definition.image_author}'
+        return
 
-            if url.endswith('gif'):
-                telegram_queue_bot.queue_animation(
-                    chat_id=id,
-                    animation=url,
-                    caption=caption,
-                    disable_notification=True
-                )
-            else:
-                telegram_queue_bot.queue_photo(
-                    chat_id=id,
-                    photo=url,
-                    caption=caption,
-                    disable_notification=True
-                )
+    logger.info(f'Resuming the word of the day delivery from slot {word_of_the_day.delivered_slots}')
+
+    job_queue.run_repeating(
+        callback=word_of_the_day_slot_job_handler,
+        interval=constants.WORD_OF_THE_DAY_DELIVERY_SLOT_DURATION,
+        first=0,
+        context=queue_bot.Broadcast(
+            payloads=get_word_of_the_day_payloads(definition),
+            date=date,
+            next_slot=word_of_the_day.delivered_slots,
+            sent_messages=word_of_the_day.delivered_messages
+        )
+    )
 
-    sent_messages = len(users)
+
+def word_of_the_day_slot_job_handler(context: telegram.ext.CallbackContext) -> None:
+    """
+    Sends the word of the day to the subscribers of the next slot, so that the messages, and the queries that follow
+    them, are spread over the delivery window instead of arriving all at once. The progress is saved after each slot,
+    so that a restart resumes the delivery instead of losing the slots left.
+    """
+
+    job = context.job
+
+    if job is None:
+        return
+
+    broadcast = typing.cast(queue_bot.Broadcast, job.context)
+
+    for user in database.User.get_subscribed_users_in_slot(broadcast.next_slot).iterator():
+        for payload in broadcast.payloads:
+            telegram_queue_bot.queue_payload(
+                chat_id=user.telegram_id,
+                payload=payload
+            )
+
+        broadcast.sent_messages += 1
+
+    broadcast.next_slot += 1
+
+    database.WordOfTheDay.save_delivery(broadcast.date, broadcast.next_slot, broadcast.sent_messages)
+
+    if broadcast.next_slot < constants.WORD_OF_THE_DAY_DELIVERY_SLOTS:
+        return
+
+    job.schedule_removal()
+
+    sent_messages = broadcast.sent_messages
 
     telegram_queue_bot.queue_message(
         chat_id=ADMIN_USER_ID,
@@ -651,18 +1359,24 @@ def queued_message_error_handler(chat_id: int, exception: Exception) -> None:
 def main() -> None:
     dispatcher = updater.dispatcher
 
-    dispatcher.add_handler(telegram.ext.CommandHandler('start', start_command_handler, pass_args=True))
+    dispatcher.add_handler(telegram.ext.CommandHandler('start', get_lane_handler(messages_lane, start_command_handler), pass_args=True))
     dispatcher.add_handler(telegram.ext.CommandHandler('subscribe', subscribe_command_handler))
 
     dispatcher.add_handler(telegram.ext.CommandHandler('restart', restart_command_handler))
     dispatcher.add_handler(telegram.ext.CommandHandler('logs', logs_command_handler))
     dispatcher.add_handler(telegram.ext.CommandHandler('users', users_command_handler, pass_args=True))
     dispatcher.add_handler(telegram.ext.CommandHandler('clear', clear_command_handler, pass_args=True))
+    dispatcher.add_handler(telegram.ext.CommandHandler('negative', negative_command_handler, pass_args=True))
+    dispatcher.add_handler(telegram.ext.CommandHandler('stats', stats_command_handler))
+    dispatcher.add_handler(telegram.ext.CommandHandler('cache', cache_command_handler, pass_args=True))
 
-    dispatcher.add_handler(telegram.ext.InlineQueryHandler(inline_query_handler, run_async=True))
+    dispatcher.add_handler(telegram.ext.TypeHandler(telegram.Update, duplicate_update_handler), group=-3)
+    dispatcher.add_handler(telegram.ext.TypeHandler(telegram.Update, rate_limit_handler), group=-2)
+    dispatcher.add_handler(telegram.ext.InlineQueryHandler(inline_query_tracker_handler), group=-1)
+    dispatcher.add_handler(telegram.ext.InlineQueryHandler(get_lane_handler(interactive_lane, inline_query_handler, constants.INTERACTIVE_ANSWER_WINDOW)))
 
-    dispatcher.add_handler(telegram.ext.MessageHandler(telegram.ext.Filters.text, message_handler, run_async=True))
-    dispatcher.add_handler(telegram.ext.CallbackQueryHandler(message_answer_handler, run_async=True))
+    dispatcher.add_handler(telegram.ext.MessageHandler(telegram.ext.Filters.text, get_lane_handler(messages_lane, message_handler)))
+    dispatcher.add_handler(telegram.ext.CallbackQueryHandler(get_lane_handler(interactive_lane, message_answer_handler, constants.INTERACTIVE_ANSWER_WINDOW)))
 
     if cli_args.debug:
         logger.info('Started polling')
@@ -671,7 +1385,17 @@ def main() -> None:
     else:
         dispatcher.add_error_handler(error_handler)
 
-        if cli_args.server and not cli_args.polling:
+        if workers_supervisor is not None and worker_index is not None:
+            logger.info(f'Started worker {worker_index}')
+
+            job_queue.run_repeating(
+                callback=worker_stats_job_handler,
+                interval=constants.WORKER_STATS_INTERVAL,
+                first=0
+            )
+
+            updater.start_forwarded(workers_supervisor.get_updates_queue(worker_index), control_message_handler)
+        elif cli_args.server and not cli_args.polling:
             logger.info('Started webhook')
 
             if config:
@@ -687,6 +1411,7 @@ def main() -> None:
                 else:
                     setattr(updater.bot, 'set_webhook', (lambda *args, **kwargs: False))
 
+                updater.webhook_replies = replies
                 updater.start_webhook(
                     listen='0.0.0.0',
                     port=port,
@@ -704,11 +1429,55 @@ def main() -> None:
 
             updater.start_polling(timeout=0.01)
 
+    startup.report.mark('Setup')
+
     logger.info('Bot started. Press Ctrl-C to stop.')
 
-    updater.bot.send_message(ADMIN_USER_ID, 'Bot has been restarted')
+    if worker_index is None or worker_index == 0:
+        updater.bot.send_message(ADMIN_USER_ID, 'Bot has been restarted')
+
     updater.idle()
 
+    # The signals stop the updater before, but the drained workers only stop being idle.
+    updater.stop()
+
+    save_recent_updates()
+    save_caches_snapshot()
+
+
+def run_supervisor() -> None:
+    if workers_supervisor is None:
+        return
+
+    if not config or not config.has_section('Webhook'):
+        logger.error('Missing bot webhook config')
+
+        return
+
+    webhook = config['Webhook']
+
+    port = int(webhook['Port'])
+    key = webhook['Key']
+    cert = webhook['Cert']
+    url = webhook['Url'] + BOT_TOKEN
+
+    if cli_args.set_webhook:
+        with open(cert, 'rb') as cert_file:
+            telegram.Bot(BOT_TOKEN).set_webhook(
+                url=url,
+                certificate=cert_file
+            )
+
+        logger.info('Updated webhook')
+
+    logger.info(f'Started supervisor with {workers_supervisor.workers} workers')
+
+    if workers_supervisor.serve(port, f'/{BOT_TOKEN}', cert, key):
+        os.execl(sys.executable, sys.executable, *sys.argv)
+
+    if workers_supervisor.has_failed:
+        sys.exit(4)
+
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
@@ -722,9 +1491,29 @@ if __name__ == '__main__':
     parser.add_argument('-p', '--polling', action='store_true')
     parser.add_argument('-sw', '--set-webhook', action='store_true')
     parser.add_argument('-s', '--server', action='store_true')
+    parser.add_argument('-w', '--workers', type=int, default=1)
+
+    # A file with a query on each line, like the ones of the inline queries logs.
+    parser.add_argument('-nr', '--normalization-report')
+
+    # A file with a word on each line, written as the autocomplete word list.
+    parser.add_argument('-wl', '--word-list', nargs=2, metavar=('WORDS', 'LEMMAS'))
 
     cli_args = parser.parse_args()
 
+    if cli_args.normalization_report:
+        with open(cli_args.normalization_report, encoding='utf-8') as queries_file:
+            logger.info(utils.get_normalization_report(line.rstrip('\n') for line in queries_file))
+
+        sys.exit(0)
+
+    if cli_args.word_list:
+        (words_path, lemmas_path) = cli_args.word_list
+
+        logger.info(f'Wrote {lemmas.write_word_list(words_path, lemmas_path, utils.normalize_query)} lemmas to "{lemmas_path}"')
+
+        sys.exit(0)
+
     if cli_args.debug:
         logger.info('Debug')
 
@@ -749,7 +1538,31 @@ if __name__ == '__main__':
 
         sys.exit(2)
 
-    request = telegram.utils.request.Request(con_pool_size=8)
+    if cli_args.workers > 1:
+        if cli_args.debug or not cli_args.server or cli_args.polling:
+            logger.error('The workers need the webhook')
+
+            sys.exit(3)
+
+        workers_supervisor = supervisor.Supervisor(cli_args.workers)
+
+        # The workers share the databases, so they are switched to the write-ahead log, and each worker opens them
+        # again after the fork.
+        database.enable_write_ahead_log()
+        utils.enable_cache_write_ahead_log()
+        utils.enable_shared_rendered_cache()
+
+        database.database.close()
+
+        worker_index = workers_supervisor.fork_workers()
+
+        if worker_index is None:
+            run_supervisor()
+
+            sys.exit(0)
+
+    # One connection for each worker, and the others needed by the updater and the message queue.
+    request = queue_bot.QueueRequest(con_pool_size=constants.LOOKUP_WORKERS + constants.DISPATCHER_WORKERS + 4)
     telegram_queue_bot = queue_bot.QueueBot(
         token=BOT_TOKEN,
         request=request,
@@ -757,10 +1570,13 @@ if __name__ == '__main__':
     )
     updater = queue_updater.QueueUpdater(
         bot=telegram_queue_bot,
+        workers=constants.DISPATCHER_WORKERS,
         use_context=True
     )
     job_queue = updater.job_queue
-    analytics_handler = analytics.AnalyticsHandler()
+    analytics_handler = analytics.AnalyticsHandler(yields_to=interactive_lane)
+
+    stats.register_gauge(constants.STATS_ANALYTICS_LANE_SIZE, analytics_handler.lane.__len__)
 
     try:
         analytics_handler.googleToken = config.get('Google', 'Key')
@@ -769,7 +1585,50 @@ if __name__ == '__main__':
 
     analytics_handler.userAgent = BOT_NAME
 
-    requests_cache.install_cache(expire_after=constants.RESULTS_CACHE_TIME)
+    try:
+        lemma_index = lemmas.LemmaIndex(config.get('Autocomplete', 'WordList'), utils.normalize_query)
+    except (configparser.Error, OSError) as error:
+        logger.warning(f'Autocomplete disabled: {error}')
+
+    recent_updates_path = config.get('Webhook', 'RecentUpdates', fallback=None)
+
+    cache_snapshot_path = config.get('Cache', 'Snapshot', fallback=None)
+
+    try:
+        hedging_budget = config.getfloat('Dexonline', 'HedgingBudget', fallback=None)
+
+        if hedging_budget:
+            utils.enable_dex_hedging(hedging_budget / 100)
+    except (configparser.Error, ValueError) as error:
+        logger.warning(f'Config error: {error}')
+
+    try:
+        responses_cache_max_size = config.getint('Cache', 'MaxSize', fallback=responses_cache_max_size // 1024 // 1024) * 1024 * 1024
+        responses_cache_eviction_policy = response_cache.EvictionPolicy(config.get('Cache', 'Eviction', fallback=responses_cache_eviction_policy.value))
+    except (configparser.Error, ValueError) as error:
+        logger.warning(f'Config error: {error}')
+
+    if worker_index is not None:
+        if recent_updates_path is not None:
+            recent_updates_path = f'{recent_updates_path}.{worker_index}'
+
+        if cache_snapshot_path is not None:
+            cache_snapshot_path = f'{cache_snapshot_path}.{worker_index}'
+
+    if config.getboolean('Webhook', 'ReplyInResponse', fallback=False):
+        if worker_index is None:
+            replies = webhook_replies.WebhookReplies(
+                deadline=constants.WEBHOOK_REPLY_DEADLINE,
+                is_reply_expected=is_webhook_reply_expected
+            )
+        else:
+            logger.warning('The replies in the webhook responses are not supported by the workers')
+
+    if recent_updates_path is not None:
+        recent_updates.load(recent_updates_path)
+
+    if cache_snapshot_path is not None:
+        utils.load_caches_snapshot(cache_snapshot_path)
 
     if cli_args.query or cli_args.fragment:
         dummy_inline_query = telegram.InlineQuery(
@@ -790,20 +1649,29 @@ if __name__ == '__main__':
 
         dummy_context = telegram.ext.CallbackContext(updater.dispatcher)
 
-        inline_query_handler(dummy_update, dummy_context)
+        inline_query_handler(dummy_update, dummy_context, None)
     else:
-        timezone = pytz.timezone('Europe/Bucharest')
-        time = datetime.time(
-            hour=12,
-            minute=0,
-            second=0
-        )
-        date = datetime.datetime.combine(datetime.datetime.today(), time)
+        timezone = pytz.timezone(constants.WORD_OF_THE_DAY_TIMEZONE)
+        date = datetime.datetime.combine(datetime.datetime.today(), constants.WORD_OF_THE_DAY_TIME)
         local_time = timezone.localize(date).timetz()
 
-        job_queue.run_daily(
-            callback=word_of_the_day_job_handler,
-            time=local_time
-        )
+        # The word of the day is sent, and the shared responses cache is compacted, only by the first worker.
+        if worker_index is None or worker_index == 0:
+            job_queue.run_daily(
+                callback=word_of_the_day_job_handler,
+                time=local_time
+            )
+
+            resume_word_of_the_day_delivery()
+
+            job_queue.run_repeating(
+                callback=responses_cache_job_handler,
+                interval=constants.RESPONSES_CACHE_COMPACTION_INTERVAL
+            )
+        else:
+            job_queue.run_repeating(
+                callback=responses_cache_accesses_job_handler,
+                interval=constants.RESPONSES_CACHE_COMPACTION_INTERVAL
+            )
 
         main()
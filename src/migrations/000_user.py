@@ -0,0 +1,33 @@
+import typing
+
+import peewee
+import peewee_migrate
+import playhouse.sqlite_ext
+
+
+class User(peewee.Model):
+    """
+    The users table as it was before the first migration, which existing databases already have.
+
+    It used to be created from the model in the database module before the migrations ran, which gave the new databases
+    the columns that the later migrations add, so that they failed. The table is left as is if it already exists.
+    """
+
+    rowid = playhouse.sqlite_ext.RowIDField()
+
+    created_at = peewee.DateTimeField()
+    updated_at = peewee.DateTimeField()
+
+    id = peewee.TextField(unique=True)
+    telegram_id = peewee.BigIntegerField(unique=True)
+    telegram_username = peewee.TextField()
+
+    class Meta:
+        table_name = 'user'
+
+
+def migrate(migrator: peewee_migrate.Migrator, _database: peewee.Database, fake=False, **_kwargs: typing.Any) -> None:
+    if fake is True:
+        return
+
+    migrator.create_table(User)
@@ -0,0 +1,31 @@
+import typing
+
+import peewee
+import peewee_migrate
+import playhouse.sqlite_ext
+
+
+class WordOfTheDay(peewee.Model):
+    """
+    The table as of this migration, because the model in the database module has the columns added after it.
+    """
+
+    rowid = playhouse.sqlite_ext.RowIDField()
+
+    created_at = peewee.DateTimeField()
+    updated_at = peewee.DateTimeField()
+
+    date = peewee.TextField(unique=True)
+    record = peewee.TextField()
+    definition = peewee.TextField(null=True)
+    links_definition = peewee.TextField(null=True)
+
+    class Meta:
+        table_name = 'word_of_the_day'
+
+
+def migrate(migrator: peewee_migrate.Migrator, _database: peewee.Database, fake=False, **_kwargs: typing.Any) -> None:
+    if fake is True:
+        return
+
+    migrator.create_table(WordOfTheDay)
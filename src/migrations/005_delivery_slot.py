@@ -0,0 +1,31 @@
+import typing
+
+import peewee
+import peewee_migrate
+
+# Frozen at the value of `constants.WORD_OF_THE_DAY_DELIVERY_SLOTS` when the column was added, like the rest of the
+# schema of a migration, so that migrating a database gives the same result whenever it runs. The broadcaster takes the
+# stored slots modulo its current number of slots, in `database.User.get_subscribed_users_in_slot`, so the users
+# spread here are still all visited after that number changes.
+DELIVERY_SLOTS = 60
+
+
+# Only the table name is needed to add the column.
+class User(peewee.Model):
+    class Meta:
+        table_name = 'user'
+
+
+def migrate(migrator: peewee_migrate.Migrator, _database: peewee.Database, fake=False, **_kwargs: typing.Any) -> None:
+    if fake is True:
+        return
+
+    delivery_slot = peewee.IntegerField(default=0)
+
+    migrator.add_columns(
+        model=User,
+        delivery_slot=delivery_slot
+    )
+
+    # Spread the existing users like the new ones.
+    migrator.sql(f'UPDATE "user" SET "delivery_slot" = "telegram_id" % {DELIVERY_SLOTS}')
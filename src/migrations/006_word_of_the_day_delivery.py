@@ -0,0 +1,31 @@
+import typing
+
+import peewee
+import peewee_migrate
+
+
+# Only the table name is needed to add the columns.
+class WordOfTheDay(peewee.Model):
+    class Meta:
+        table_name = 'word_of_the_day'
+
+
+def migrate(migrator: peewee_migrate.Migrator, database: peewee.Database, fake=False, **_kwargs: typing.Any) -> None:
+    if fake is True:
+        return
+
+    columns = {
+        'delivered_slots': peewee.IntegerField(null=True),
+        'delivered_messages': peewee.IntegerField(default=0)
+    }
+
+    # Migration 004 used to create the table with these columns already.
+    existing_columns = {column.name for column in database.get_columns(WordOfTheDay._meta.table_name)}
+
+    missing_columns = {name: field for (name, field) in columns.items() if name not in existing_columns}
+
+    if missing_columns:
+        migrator.add_columns(
+            model=WordOfTheDay,
+            **missing_columns
+        )
@@ -0,0 +1,25 @@
+import typing
+
+import peewee
+import peewee_migrate
+import playhouse.sqlite_ext
+
+
+class CallbackDataToken(peewee.Model):
+    rowid = playhouse.sqlite_ext.RowIDField()
+
+    created_at = peewee.DateTimeField()
+    updated_at = peewee.DateTimeField()
+
+    token = peewee.TextField(unique=True)
+    payload = peewee.TextField()
+
+    class Meta:
+        table_name = 'callback_data_token'
+
+
+def migrate(migrator: peewee_migrate.Migrator, _database: peewee.Database, fake=False, **_kwargs: typing.Any) -> None:
+    if fake is True:
+        return
+
+    migrator.create_table(CallbackDataToken)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import datetime
+import threading
+import time
+import typing
+
+
+class NegativeCache:
+    """
+    Remembers the queries that have no definitions, for less time than the responses cache, so that they can be
+    answered without looking them up again.
+    """
+
+    def __init__(self, max_size: int, expire_after: datetime.timedelta) -> None:
+        self._max_size = max_size
+        self._expire_after = expire_after.total_seconds()
+
+        self._expiration_times: typing.OrderedDict[str, float] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, query: str) -> bool:
+        with self._lock:
+            expiration_time = self._expiration_times.get(query)
+
+            if expiration_time is None:
+                return False
+
+            if expiration_time < time.monotonic():
+                del self._expiration_times[query]
+
+                return False
+
+            self._expiration_times.move_to_end(query)
+
+            return True
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._purge_expired()
+
+            return len(self._expiration_times)
+
+    def add(self, query: str) -> None:
+        with self._lock:
+            self._expiration_times[query] = time.monotonic() + self._expire_after
+            self._expiration_times.move_to_end(query)
+
+            while len(self._expiration_times) > self._max_size:
+                self._expiration_times.popitem(last=False)
+
+    def discard(self, query: str) -> bool:
+        with self._lock:
+            return self._expiration_times.pop(query, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expiration_times.clear()
+
+    def get_snapshot(self) -> typing.List[typing.Any]:
+        """
+        The queries that haven't expired, from the least recently used, with their expiration timestamps, so that
+        they are still valid after a restart.
+        """
+
+        now = time.monotonic()
+        timestamp = time.time()
+
+        with self._lock:
+            return [[query, timestamp + expiration_time - now] for (query, expiration_time) in self._expiration_times.items() if expiration_time >= now]
+
+    def load_snapshot(self, snapshot: typing.List[typing.Any]) -> None:
+        now = time.monotonic()
+        timestamp = time.time()
+
+        with self._lock:
+            for (query, expiration_timestamp) in snapshot:
+                if expiration_timestamp >= timestamp:
+                    self._expiration_times[query] = now + expiration_timestamp - timestamp
+
+            while len(self._expiration_times) > self._max_size:
+                self._expiration_times.popitem(last=False)
+
+    def get_recent_queries(self, limit: int) -> typing.List[str]:
+        with self._lock:
+            self._purge_expired()
+
+            return list(reversed(self._expiration_times))[:limit]
+
+    def _purge_expired(self) -> None:
+        """
+        The queries are ordered by their last use, not by their expiration, so all of them are checked.
+        """
+
+        now = time.monotonic()
+
+        for query in [query for (query, expiration_time) in self._expiration_times.items() if expiration_time < now]:
+            del self._expiration_times[query]
@@ -1,11 +1,53 @@
 # -*- coding: utf-8 -*-
 
+from __future__ import annotations
+
 import dataclasses
+import json
+import sys
+import typing
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True)
 class ParsedDefinition:
+    __slots__ = ('index', 'title', 'text', 'footer', 'url')
+
     index: int
     title: str
-    html: str
+
+    # The footer, with the separator before it, is the same for the variants of a definition, so it's kept apart from
+    # their text and shared by them.
+    text: str
+    footer: str
+
     url: str
+
+    def __post_init__(self) -> None:
+        # The variants of a definition, and the definitions reloaded from the caches or the database, share the same
+        # URL and footer.
+        object.__setattr__(self, 'footer', sys.intern(self.footer))
+        object.__setattr__(self, 'url', sys.intern(self.url))
+
+    @property
+    def html(self) -> str:
+        return f'{self.text}{self.footer}'
+
+    def serialize(self) -> str:
+        return json.dumps(dataclasses.astuple(self), ensure_ascii=False)
+
+    @classmethod
+    def deserialize(cls, data: str) -> ParsedDefinition:
+        return cls.from_fields(json.loads(data))
+
+    @classmethod
+    def from_fields(cls, fields: typing.Any) -> ParsedDefinition:
+        # The definitions used to be serialized as objects, and with their footer in their text.
+        if isinstance(fields, dict):
+            fields = [fields['index'], fields['title'], fields['html'], fields['url']]
+
+        if len(fields) == 4:
+            (index, title, html, url) = fields
+
+            return cls(index, title, html, '', url)
+
+        return cls(*fields)
@@ -1,15 +1,71 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import dataclasses
+import json
 import queue
 import typing
 
 import telegram.ext
+import telegram.utils.request
+
+
+class BroadcastPayload:
+    """
+    The parameters of a message sent to many chats, serialized only once, without the `chat_id` that is added to the
+    body of each request.
+    """
+
+    def __init__(self, method: str, data: typing.Dict[str, typing.Any]) -> None:
+        self.method = method
+
+        # The serialized object, without its opening brace, and with the separator after the `chat_id` if it isn't
+        # empty.
+        self._body_tail = json.dumps(data).encode()[1:]
+
+        if data:
+            self._body_tail = b',' + self._body_tail
+
+    def get_body(self, chat_id: int) -> bytes:
+        return b'{"chat_id":%d%s' % (chat_id, self._body_tail)
+
+
+@dataclasses.dataclass
+class Broadcast:
+    """
+    The payloads sent to each subscriber, in order, and the progress of their delivery.
+    """
+
+    payloads: typing.List[BroadcastPayload]
+
+    # The date of the word of the day, under which the progress is saved.
+    date: str
+
+    next_slot: int = 0
+    sent_messages: int = 0
+
+
+class QueueRequest(telegram.utils.request.Request):
+    def post_body(self, url: str, body: bytes) -> typing.Union[typing.Dict[str, typing.Any], bool]:
+        """
+        Posts an already serialized JSON body using the same connections pool, and handles the errors like `post`.
+        """
+
+        result = self._request_wrapper(
+            'POST',
+            url,
+            body=body,
+            headers={'Content-Type': 'application/json'}
+        )
+
+        return self._parse(result)
 
 
 class QueueBot(telegram.Bot):
-    def __init__(self, exception_handler: typing.Callable[[int, Exception], None], *args, **kwargs) -> None:
-        super().__init__(*args, **kwargs)
+    def __init__(self, exception_handler: typing.Callable[[int, Exception], None], request: QueueRequest, *args, **kwargs) -> None:
+        super().__init__(request=request, *args, **kwargs)  # type: ignore[misc]
+
+        self._queue_request = request
 
         self._is_messages_queued_default = True
         self._msg_queue = telegram.ext.MessageQueue()
@@ -48,3 +104,10 @@ class QueueBot(telegram.Bot):
             self.exception_handler(chat_id, exception)
 
         return None
+
+    @telegram.ext.messagequeue.queuedmessage
+    def queue_payload(self, chat_id: int, payload: BroadcastPayload) -> None:
+        try:
+            self._queue_request.post_body(f'{self.base_url}/{payload.method}', payload.get_body(chat_id))
+        except Exception as exception:
+            self.exception_handler(chat_id, exception)
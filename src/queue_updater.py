@@ -1,16 +1,32 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import json
+import multiprocessing.queues
+import queue
+import ssl
+import threading
 import types
+import typing
 
 import telegram.ext
+import telegram.ext.utils.webhookhandler
 
 import queue_bot
+import webhook_replies
 
 
 class QueueUpdater(telegram.ext.Updater):
+    # Declared again, because mypy can't infer them from the overloaded constructor of python-telegram-bot.
+    bot: telegram.Bot
+    dispatcher: telegram.ext.Dispatcher
+    job_queue: telegram.ext.JobQueue
+    running: bool
+    is_idle: bool
+
     def __init__(self, bot: queue_bot.QueueBot, *args, **kwargs) -> None:
         self.queue_bot = bot
+        self.webhook_replies: typing.Optional[webhook_replies.WebhookReplies] = None
 
         super().__init__(bot=bot, *args, **kwargs)  # type: ignore[misc]
 
@@ -18,3 +34,96 @@ class QueueUpdater(telegram.ext.Updater):
         super().signal_handler(signum, frame)
 
         self.queue_bot.stop()
+
+    def stop_receiving(self) -> None:
+        """
+        Stops the webhook, the polling or the forwarded updates, but not the dispatcher, so that the updates already
+        received can still be handled.
+        """
+
+        self.running = False
+
+        self._stop_httpd()
+
+    def start_forwarded(self, updates: multiprocessing.queues.Queue, control_handler: typing.Callable[[typing.Any], None]) -> None:
+        """
+        Handles the updates forwarded by the supervisor, instead of polling or starting a webhook. The messages in the
+        queue that aren't updates are passed to `control_handler`, in order with the updates.
+        """
+
+        if self.running:
+            return
+
+        self.running = True
+
+        self.job_queue.start()
+
+        dispatcher_ready = threading.Event()
+
+        self._init_thread(self.dispatcher.start, 'dispatcher', ready=dispatcher_ready)
+        self._init_thread(self._receive_forwarded_updates, 'forwarded_updates', updates, control_handler)
+
+        dispatcher_ready.wait()
+
+    def _receive_forwarded_updates(self, updates: multiprocessing.queues.Queue, control_handler: typing.Callable[[typing.Any], None]) -> None:
+        while self.running:
+            try:
+                body = updates.get(timeout=1)
+            except queue.Empty:
+                continue
+
+            if not isinstance(body, bytes):
+                control_handler(body)
+
+                continue
+
+            update = telegram.Update.de_json(json.loads(body), self.bot)
+
+            if update is not None:
+                self.update_queue.put(update)
+
+    def _start_webhook(self, listen, port, url_path, cert, key, bootstrap_retries, drop_pending_updates, webhook_url, allowed_updates, ready=None, ip_address=None, max_connections=40):  # type: ignore[no-untyped-def]
+        """
+        Same as the one of python-telegram-bot 13, but with a webhook that can return the replies in its responses.
+        """
+
+        if self.webhook_replies is None:
+            return super()._start_webhook(listen, port, url_path, cert, key, bootstrap_retries, drop_pending_updates, webhook_url, allowed_updates, ready, ip_address, max_connections)
+
+        use_ssl = cert is not None and key is not None
+
+        if not url_path.startswith('/'):
+            url_path = f'/{url_path}'
+
+        app = webhook_replies.ReplyingWebhookAppClass(url_path, self.bot, self.update_queue, self.webhook_replies)
+
+        if use_ssl:
+            try:
+                ssl_ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+                ssl_ctx.load_cert_chain(cert, key)
+            except ssl.SSLError as exc:
+                raise telegram.TelegramError('Invalid SSL Certificate') from exc
+        else:
+            ssl_ctx = None
+
+        self.httpd = telegram.ext.utils.webhookhandler.WebhookServer(listen, port, app, ssl_ctx)
+
+        if not webhook_url:
+            webhook_url = self._gen_webhook_url(listen, port, url_path)
+
+        cert_file = open(cert, 'rb') if cert is not None else None
+
+        self._bootstrap(
+            max_retries=bootstrap_retries,
+            drop_pending_updates=drop_pending_updates,
+            webhook_url=webhook_url,
+            allowed_updates=allowed_updates,
+            cert=cert_file,
+            ip_address=ip_address,
+            max_connections=max_connections
+        )
+
+        if cert_file is not None:
+            cert_file.close()
+
+        self.httpd.serve_forever(ready=ready)
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import threading
+import time
+import typing
+
+
+class _Bucket:
+    __slots__ = ('tokens', 'updated_at', 'is_throttled')
+
+    def __init__(self, tokens: float, updated_at: float) -> None:
+        self.tokens = tokens
+        self.updated_at = updated_at
+        self.is_throttled = False
+
+
+class RateLimiter:
+    """
+    Keeps a token bucket for each user, which refills at a steady rate and allows short bursts. The buckets of the
+    users that have been idle long enough to refill completely are forgotten, because they are the same as new ones,
+    and the least recently used buckets are forgotten first when there are too many.
+    """
+
+    def __init__(self, rate: float, burst: int, max_users: int) -> None:
+        """
+        The rate is in updates per second.
+        """
+
+        self._rate = rate
+        self._burst = burst
+        self._max_users = max_users
+        self._refill_time = burst / rate
+
+        self._buckets: typing.OrderedDict[int, _Bucket] = collections.OrderedDict()
+        self._throttled_users = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    @property
+    def throttled_users(self) -> int:
+        """
+        The users whose latest update was rejected.
+        """
+
+        return self._throttled_users
+
+    def _forget(self, bucket: _Bucket) -> None:
+        if bucket.is_throttled:
+            self._throttled_users -= 1
+
+    def allow(self, user_id: int) -> bool:
+        now = time.monotonic()
+
+        with self._lock:
+            # The buckets are kept in the order of their last update, so the idle ones are at the start. Only a new user
+            # needs room, so that a known user doesn't get a full bucket again by forgetting their own.
+            needs_room = user_id not in self._buckets
+
+            while self._buckets:
+                (oldest_user_id, oldest_bucket) = next(iter(self._buckets.items()))
+
+                if now - oldest_bucket.updated_at < self._refill_time and (len(self._buckets) < self._max_users or not needs_room):
+                    break
+
+                del self._buckets[oldest_user_id]
+
+                self._forget(oldest_bucket)
+
+            bucket = self._buckets.get(user_id)
+
+            if bucket is None:
+                bucket = _Bucket(self._burst, now)
+
+                self._buckets[user_id] = bucket
+            else:
+                bucket.tokens = min(self._burst, bucket.tokens + (now - bucket.updated_at) * self._rate)
+                bucket.updated_at = now
+
+                self._buckets.move_to_end(user_id)
+
+            is_allowed = bucket.tokens >= 1
+
+            if is_allowed:
+                bucket.tokens -= 1
+
+            if is_allowed == bucket.is_throttled:
+                bucket.is_throttled = not is_allowed
+
+                self._throttled_users += -1 if is_allowed else 1
+
+            return is_allowed
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import contextlib
+import dataclasses
+import datetime
+import json
+import logging
+import sqlite3
+import threading
+import time
+import typing
+
+import parsed_definition
+
+logger = logging.getLogger(__name__)
+
+RENDERED_TABLE = 'rendered_definitions'
+
+RenderedDefinitions = typing.Tuple[parsed_definition.ParsedDefinition, parsed_definition.ParsedDefinition]
+
+
+@dataclasses.dataclass
+class RenderedQuery:
+    definitions_count: int
+
+    # The definitions rendered without and with links, by their index.
+    definitions: typing.Dict[int, RenderedDefinitions]
+
+    expiration_time: float
+
+    def has_definitions(self, first_index: int, last_index: int) -> bool:
+        return all(index in self.definitions for index in range(first_index, min(last_index, self.definitions_count)))
+
+
+class RenderedStore:
+    """
+    Keeps the rendered definitions in a table of an SQLite database, in the write-ahead log mode, so that the worker
+    processes share them, and a query rendered by one of them isn't fetched or rendered again by the others. The
+    expiration times are stored as timestamps, because the monotonic clocks of the processes aren't comparable.
+
+    Each thread opens its own connection when it first needs it, so that the store can be created before the workers
+    are forked.
+    """
+
+    def __init__(self, location: str) -> None:
+        self._location = location
+        self._connections = threading.local()
+
+        with contextlib.closing(sqlite3.connect(location)) as connection, connection:
+            connection.execute(
+                f'CREATE TABLE IF NOT EXISTS `{RENDERED_TABLE}` ('
+                f'query TEXT, definition_index INTEGER, definitions_count INTEGER, expires_at REAL, definitions TEXT, '
+                f'PRIMARY KEY (query, definition_index))'
+            )
+
+    def _get_connection(self) -> sqlite3.Connection:
+        connection: typing.Optional[sqlite3.Connection] = getattr(self._connections, 'connection', None)
+
+        if connection is None:
+            connection = sqlite3.connect(self._location)
+
+            self._connections.connection = connection
+
+        return connection
+
+    def __len__(self) -> int:
+        (count,) = self._get_connection().execute(f'SELECT count(DISTINCT query) FROM `{RENDERED_TABLE}`').fetchone()
+
+        return count
+
+    def get(self, query: str) -> typing.Optional[RenderedQuery]:
+        rows = self._get_connection().execute(
+            f'SELECT definition_index, definitions_count, expires_at, definitions FROM `{RENDERED_TABLE}` WHERE query = ? AND expires_at >= ?',
+            (query, time.time())
+        ).fetchall()
+
+        if not rows:
+            return None
+
+        definitions = {}
+
+        for (index, _definitions_count, _expires_at, data) in rows:
+            (without_links, with_links) = json.loads(data)
+
+            definitions[index] = (parsed_definition.ParsedDefinition.from_fields(without_links), parsed_definition.ParsedDefinition.from_fields(with_links))
+
+        return RenderedQuery(
+            definitions_count=rows[0][1],
+            definitions=definitions,
+            expiration_time=time.monotonic() + min(expires_at for (_index, _definitions_count, expires_at, _data) in rows) - time.time()
+        )
+
+    def add(self, query: str, definitions_count: int, definitions: typing.Dict[int, RenderedDefinitions], expiration_timestamp: float) -> None:
+        """
+        Replaces the definitions of the query stored with a different count, which are those of an older response.
+        """
+
+        rows = [
+            (query, index, definitions_count, expiration_timestamp, json.dumps(list(map(dataclasses.astuple, rendered_definitions)), ensure_ascii=False))
+            for (index, rendered_definitions) in definitions.items()
+        ]
+
+        connection = self._get_connection()
+
+        with connection:
+            connection.execute(
+                f'DELETE FROM `{RENDERED_TABLE}` WHERE query = ? AND (definitions_count != ? OR expires_at < ?)',
+                (query, definitions_count, time.time())
+            )
+            connection.executemany(f'INSERT OR REPLACE INTO `{RENDERED_TABLE}` VALUES (?, ?, ?, ?, ?)', rows)
+
+    def discard(self, query: str) -> bool:
+        connection = self._get_connection()
+
+        with connection:
+            return connection.execute(f'DELETE FROM `{RENDERED_TABLE}` WHERE query = ?', (query,)).rowcount > 0
+
+    def clear(self) -> None:
+        connection = self._get_connection()
+
+        with connection:
+            connection.execute(f'DELETE FROM `{RENDERED_TABLE}`')
+
+    def trim(self, max_size: int) -> int:
+        """
+        Deletes the expired definitions, and those of the queries that expire first beyond `max_size`, which are the
+        least recently rendered ones. Returns the number of deleted definitions.
+        """
+
+        connection = self._get_connection()
+
+        with connection:
+            return connection.execute(
+                f'DELETE FROM `{RENDERED_TABLE}` WHERE expires_at < ? OR query NOT IN ('
+                f'SELECT query FROM `{RENDERED_TABLE}` GROUP BY query ORDER BY max(expires_at) DESC LIMIT ?)',
+                (time.time(), max_size)
+            ).rowcount
+
+
+class RenderedCache:
+    """
+    Keeps the rendered definitions of the most recent queries, so that paging and toggling the links don't need to
+    fetch or render them again.
+
+    When the workers share a `RenderedStore`, it's read when a query is missing here, and written with each addition,
+    while this cache keeps the most recent queries of the worker in memory, in front of it. The errors of the store only
+    make it miss.
+    """
+
+    def __init__(self, max_size: int, expire_after: datetime.timedelta) -> None:
+        self._max_size = max_size
+        self._expire_after = expire_after.total_seconds()
+
+        self._queries: typing.OrderedDict[str, RenderedQuery] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+        self.store: typing.Optional[RenderedStore] = None
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+    def get(self, query: str) -> typing.Optional[RenderedQuery]:
+        with self._lock:
+            rendered_query = self._queries.get(query)
+
+            if rendered_query is not None:
+                if rendered_query.expiration_time >= time.monotonic():
+                    self._queries.move_to_end(query)
+
+                    return rendered_query
+
+                del self._queries[query]
+
+        if self.store is None:
+            return None
+
+        try:
+            rendered_query = self.store.get(query)
+        except sqlite3.Error as error:
+            logger.warning(f'Rendered store error: {error}')
+
+            return None
+
+        if rendered_query is None:
+            return None
+
+        with self._lock:
+            self._queries[query] = rendered_query
+
+            self._trim()
+
+        return rendered_query
+
+    def add(self, query: str, definitions_count: int, definitions: typing.Dict[int, RenderedDefinitions]) -> None:
+        with self._lock:
+            rendered_query = self._queries.get(query)
+
+            if rendered_query is None or rendered_query.definitions_count != definitions_count:
+                rendered_query = RenderedQuery(
+                    definitions_count=definitions_count,
+                    definitions={},
+                    expiration_time=time.monotonic() + self._expire_after
+                )
+
+                self._queries[query] = rendered_query
+
+            rendered_query.definitions.update(definitions)
+
+            self._queries.move_to_end(query)
+
+            self._trim()
+
+            expiration_timestamp = time.time() + rendered_query.expiration_time - time.monotonic()
+
+        if self.store is None:
+            return
+
+        try:
+            self.store.add(query, definitions_count, definitions, expiration_timestamp)
+        except sqlite3.Error as error:
+            logger.warning(f'Rendered store error: {error}')
+
+    def discard(self, query: str) -> bool:
+        with self._lock:
+            is_discarded = self._queries.pop(query, None) is not None
+
+        if self.store is not None:
+            try:
+                is_discarded = self.store.discard(query) or is_discarded
+            except sqlite3.Error as error:
+                logger.warning(f'Rendered store error: {error}')
+
+        return is_discarded
+
+    def clear(self) -> None:
+        with self._lock:
+            self._queries.clear()
+
+        if self.store is not None:
+            try:
+                self.store.clear()
+            except sqlite3.Error as error:
+                logger.warning(f'Rendered store error: {error}')
+
+    def _trim(self) -> None:
+        while len(self._queries) > self._max_size:
+            self._queries.popitem(last=False)
+
+    def get_snapshot(self) -> typing.List[typing.Any]:
+        """
+        The queries that haven't expired, from the least recently used, with their expiration timestamps, so that
+        they are still valid after a restart.
+        """
+
+        now = time.monotonic()
+        timestamp = time.time()
+
+        with self._lock:
+            rendered_queries = list(self._queries.items())
+
+        return [
+            [
+                query,
+                rendered_query.definitions_count,
+                timestamp + rendered_query.expiration_time - now,
+                [[index, *map(dataclasses.astuple, definitions)] for (index, definitions) in rendered_query.definitions.items()]
+            ]
+            for (query, rendered_query) in rendered_queries
+            if rendered_query.expiration_time >= now
+        ]
+
+    def load_snapshot(self, snapshot: typing.List[typing.Any]) -> None:
+        now = time.monotonic()
+        timestamp = time.time()
+
+        with self._lock:
+            for (query, definitions_count, expiration_timestamp, definitions) in snapshot:
+                if expiration_timestamp < timestamp:
+                    continue
+
+                self._queries[query] = RenderedQuery(
+                    definitions_count=definitions_count,
+                    definitions={
+                        index: (parsed_definition.ParsedDefinition.from_fields(without_links), parsed_definition.ParsedDefinition.from_fields(with_links))
+                        for (index, without_links, with_links) in definitions
+                    },
+                    expiration_time=now + expiration_timestamp - timestamp
+                )
+
+            self._trim()
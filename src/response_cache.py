@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+
+import dataclasses
+import enum
+import threading
+import time
+import typing
+
+import requests_cache.backends.sqlite
+
+ENTRIES_TABLE = 'entries'
+
+
+class EvictionPolicy(enum.Enum):
+    LEAST_RECENTLY_USED = 'lru'
+    LEAST_FREQUENTLY_USED = 'lfu'
+
+
+_EVICTION_ORDERS = {
+    EvictionPolicy.LEAST_RECENTLY_USED: 'accessed_at',
+    EvictionPolicy.LEAST_FREQUENTLY_USED: 'hits, accessed_at'
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class CacheEntry:
+    __slots__ = ('url', 'size', 'hits')
+
+    url: str
+    size: int
+    hits: int
+
+
+class BoundedResponseCache(requests_cache.backends.sqlite.DbCache):
+    """
+    The SQLite backend of requests_cache, which only marks the responses as expired and never deletes them, with a
+    table that keeps the size, the last access and the hits of each response, so that the least used responses can be
+    evicted when the cache gets too big, without unpickling all of them.
+
+    The accesses are counted in memory and written with the evictions, instead of writing to the database on each hit.
+    """
+
+    def __init__(self, location: str) -> None:
+        super().__init__(location=location)
+
+        # The key of the response itself, for the keys that might be those of a redirect.
+        self._resolved_key_sql = f'coalesce((SELECT value FROM `{self.keys_map.table_name}` WHERE key = ?), ?)'
+
+        # The keys of the responses accessed since the last flush, with the time of their last access and their hits.
+        self._accesses: typing.Dict[str, typing.Tuple[float, int]] = {}
+        self._accesses_lock = threading.Lock()
+
+        with self.responses.connection(commit_on_success=True) as connection:
+            is_created = connection.execute('SELECT 1 FROM sqlite_master WHERE type = \'table\' AND name = ?', (ENTRIES_TABLE,)).fetchone() is not None
+
+            if not is_created:
+                connection.execute(f'CREATE TABLE `{ENTRIES_TABLE}` (key PRIMARY KEY, url, size, accessed_at, hits)')
+
+                # The responses cached before the entries were tracked.
+                connection.execute(
+                    f'INSERT INTO `{ENTRIES_TABLE}` (key, url, size, accessed_at, hits) '
+                    f'SELECT key, NULL, length(value), ?, 0 FROM `{self.responses.table_name}`',
+                    (time.time(),)
+                )
+
+    def save_response(self, key: str, response: typing.Any) -> None:
+        super().save_response(key, response)
+
+        # The first URL of a redirect is the one that was requested.
+        url = response.history[0].url if response.history else response.url
+
+        # The hits of the expired responses are kept when they are refreshed.
+        with self.responses.connection(commit_on_success=True) as connection:
+            connection.execute(
+                f'INSERT INTO `{ENTRIES_TABLE}` (key, url, size, accessed_at, hits) '
+                f'SELECT key, ?, length(value), ?, 0 FROM `{self.responses.table_name}` WHERE key = ? '
+                f'ON CONFLICT (key) DO UPDATE SET url = excluded.url, size = excluded.size, accessed_at = excluded.accessed_at',
+                (url, time.time(), key)
+            )
+
+    def get_response_and_time(self, key: str, default: typing.Any = (None, None)) -> typing.Any:
+        result = super().get_response_and_time(key, default)
+
+        if result[0] is not None:
+            now = time.time()
+
+            with self._accesses_lock:
+                (_accessed_at, hits) = self._accesses.get(key, (now, 0))
+
+                self._accesses[key] = (now, hits + 1)
+
+        return result
+
+    def delete(self, key: str) -> None:
+        with self.responses.connection() as connection:
+            (resolved_key,) = connection.execute(f'SELECT {self._resolved_key_sql}', (key, key)).fetchone()
+
+        super().delete(key)
+
+        with self.responses.connection(commit_on_success=True) as connection:
+            connection.execute(f'DELETE FROM `{ENTRIES_TABLE}` WHERE key = ?', (resolved_key,))
+
+    def clear(self) -> None:
+        super().clear()
+
+        with self.responses.connection(commit_on_success=True) as connection:
+            connection.execute(f'DELETE FROM `{ENTRIES_TABLE}`')
+
+        with self._accesses_lock:
+            self._accesses.clear()
+
+    def flush_accesses(self) -> None:
+        with self._accesses_lock:
+            accesses = self._accesses
+            self._accesses = {}
+
+        if not accesses:
+            return
+
+        with self.responses.connection(commit_on_success=True) as connection:
+            connection.executemany(
+                f'UPDATE `{ENTRIES_TABLE}` SET accessed_at = max(accessed_at, ?), hits = hits + ? WHERE key = {self._resolved_key_sql}',
+                ((accessed_at, hits, key, key) for (key, (accessed_at, hits)) in accesses.items())
+            )
+
+    def _delete_entries(self, keys: typing.List[str]) -> None:
+        with self.responses.connection(commit_on_success=True) as connection:
+            for (table, column) in ((self.responses.table_name, 'key'), (self.keys_map.table_name, 'value'), (ENTRIES_TABLE, 'key')):
+                connection.executemany(f'DELETE FROM `{table}` WHERE {column} = ?', ((key,) for key in keys))
+
+    def get_size(self) -> int:
+        with self.responses.connection() as connection:
+            (size,) = connection.execute(f'SELECT coalesce(sum(size), 0) FROM `{ENTRIES_TABLE}`').fetchone()
+
+        return size
+
+    def get_entries_count(self) -> int:
+        with self.responses.connection() as connection:
+            (count,) = connection.execute(f'SELECT count(*) FROM `{ENTRIES_TABLE}`').fetchone()
+
+        return count
+
+    def get_top_entries(self, limit: int) -> typing.List[CacheEntry]:
+        self.flush_accesses()
+
+        with self.responses.connection() as connection:
+            rows = connection.execute(
+                f'SELECT url, size, hits FROM `{ENTRIES_TABLE}` WHERE url IS NOT NULL ORDER BY hits DESC LIMIT ?',
+                (limit,)
+            ).fetchall()
+
+        return [CacheEntry(*row) for row in rows]
+
+    def evict(self, max_size: int, target_ratio: float, eviction_policy: EvictionPolicy) -> int:
+        """
+        Evicts the least used responses, when the cache is bigger than `max_size` bytes, until it's `target_ratio` of
+        it, so that it isn't full again right away. The sizes are those of the stored responses, without the overhead
+        of the database. Returns the number of evicted responses.
+        """
+
+        self.flush_accesses()
+
+        size = self.get_size()
+
+        if size <= max_size:
+            return 0
+
+        excess_size = size - int(max_size * target_ratio)
+        keys: typing.List[str] = []
+
+        with self.responses.connection() as connection:
+            for (key, entry_size) in connection.execute(f'SELECT key, size FROM `{ENTRIES_TABLE}` ORDER BY {_EVICTION_ORDERS[eviction_policy]}'):
+                keys.append(key)
+
+                excess_size -= entry_size or 0
+
+                if excess_size <= 0:
+                    break
+
+        self._delete_entries(keys)
+
+        return len(keys)
+
+    def fill_urls(self, limit: int) -> int:
+        """
+        Fills in the URLs of up to `limit` of the responses cached before the entries were tracked, which have to be
+        unpickled for it, so that they can be purged and listed too. Returns the number of filled in URLs.
+        """
+
+        with self.responses.connection() as connection:
+            keys = [key for (key,) in connection.execute(f'SELECT key FROM `{ENTRIES_TABLE}` WHERE url IS NULL LIMIT ?', (limit,))]
+
+        urls: typing.List[typing.Tuple[str, str]] = []
+
+        for key in keys:
+            # The parent's method, so that it isn't counted as an access.
+            (response, _timestamp) = super().get_response_and_time(key)
+
+            if response is None:
+                # An empty URL, so that it isn't unpickled again.
+                urls.append(('', key))
+            else:
+                urls.append((response.history[0].url if response.history else response.url, key))
+
+        with self.responses.connection(commit_on_success=True) as connection:
+            connection.executemany(f'UPDATE `{ENTRIES_TABLE}` SET url = ? WHERE key = ?', urls)
+
+        return len(urls)
+
+    def purge(self, url_pattern: str) -> typing.List[str]:
+        """
+        Deletes the responses of the URLs that match the glob pattern, and returns their URLs.
+        """
+
+        with self.responses.connection() as connection:
+            rows = connection.execute(f'SELECT key, url FROM `{ENTRIES_TABLE}` WHERE url GLOB ?', (url_pattern,)).fetchall()
+
+        self._delete_entries([key for (key, _url) in rows])
+
+        return [url for (_key, url) in rows]
+
+    def vacuum(self, pages: int) -> None:
+        """
+        Returns up to this many free pages to the file system. The first time, the whole database is rebuilt, so that
+        it can be vacuumed incrementally after that.
+        """
+
+        with self.responses.connection() as connection:
+            (auto_vacuum,) = connection.execute('PRAGMA auto_vacuum').fetchone()
+
+            # 2 means incremental.
+            if auto_vacuum != 2:
+                connection.execute('PRAGMA auto_vacuum = INCREMENTAL')
+                connection.execute('VACUUM')
+            else:
+                connection.execute(f'PRAGMA incremental_vacuum({int(pages)})').fetchall()
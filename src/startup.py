@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+import builtins
+import collections
+import os
+import threading
+import time
+import types
+import typing
+
+IMPORTS_PHASE = 'Imports'
+
+
+def get_process_age() -> float:
+    """
+    The time since the process was started, read from procfs, so that the startup of the interpreter is counted too.
+    It's zero where procfs isn't available.
+    """
+
+    try:
+        with open('/proc/self/stat') as stat_file:
+            stat = stat_file.read()
+
+        # The name of the command, in parentheses, can contain spaces, and the start time is the 22nd field.
+        start_ticks = int(stat.rpartition(')')[2].split()[19])
+
+        return max(0.0, time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / os.sysconf('SC_CLK_TCK'))
+    except (AttributeError, OSError, IndexError, ValueError):
+        return 0.0
+
+
+class ImportTimer:
+    """
+    Measures the time spent importing each top-level package, without the other packages that it imports, by
+    wrapping `__import__` in the thread that started it, until it's stopped.
+    """
+
+    def __init__(self) -> None:
+        self.durations: typing.DefaultDict[str, float] = collections.defaultdict(float)
+
+        self._original_import = builtins.__import__
+        self._thread_id = threading.get_ident()
+
+        # The time spent in the imports nested in each import that is running.
+        self._nested_durations: typing.List[float] = []
+
+    def start(self) -> None:
+        builtins.__import__ = self._import
+
+    def stop(self) -> None:
+        builtins.__import__ = self._original_import
+
+    def _import(self, name: str, globals: typing.Optional[typing.Mapping[str, object]] = None, locals: typing.Optional[typing.Mapping[str, object]] = None, fromlist: typing.Optional[typing.Sequence[str]] = (), level: int = 0) -> types.ModuleType:
+        if threading.get_ident() != self._thread_id:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        if level > 0 and globals is not None:
+            package = str(globals.get('__package__') or '')
+        else:
+            package = name
+
+        started_at = time.perf_counter()
+
+        self._nested_durations.append(0.0)
+
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            duration = time.perf_counter() - started_at
+
+            self.durations[package.partition('.')[0]] += duration - self._nested_durations.pop()
+
+            if self._nested_durations:
+                self._nested_durations[-1] += duration
+
+
+class StartupReport:
+    """
+    Splits the time from the start of the process until the first update is handled in phases, and the time spent
+    importing in packages, because the bot is restarted often and its updates wait for it meanwhile. The imports are
+    timed from the creation of the report, so it has to be created before the other modules are imported.
+    """
+
+    def __init__(self) -> None:
+        self.imports = ImportTimer()
+
+        self._started_at = time.perf_counter() - get_process_age()
+        self._marked_at = self._started_at
+        self._phases: typing.List[typing.Tuple[str, float]] = []
+
+        self._is_complete = False
+        self._lock = threading.Lock()
+
+        self.mark('Interpreter')
+
+        self.imports.start()
+
+    @property
+    def is_complete(self) -> bool:
+        return self._is_complete
+
+    def mark(self, phase: str) -> None:
+        """
+        Ends the phase that started when the previous one ended.
+        """
+
+        now = time.perf_counter()
+
+        with self._lock:
+            self._phases.append((phase, now - self._marked_at))
+
+            self._marked_at = now
+
+    def finish_imports(self) -> None:
+        self.imports.stop()
+
+        self.mark(IMPORTS_PHASE)
+
+    def complete(self, phase: str) -> bool:
+        """
+        Ends the last phase, only once. Returns `True` for the call that ended it.
+        """
+
+        with self._lock:
+            if self._is_complete:
+                return False
+
+            self._is_complete = True
+
+        self.mark(phase)
+
+        return True
+
+    def get_text(self, imports_limit: int) -> str:
+        lines = [f'Startup: {(self._marked_at - self._started_at) * 1000:.0f} ms']
+
+        for (phase, duration) in self._phases:
+            lines.append(f'{phase}: {duration * 1000:.0f} ms')
+
+            if phase == IMPORTS_PHASE:
+                slowest_imports = sorted(self.imports.durations.items(), key=lambda item: item[1], reverse=True)
+
+                for (package, package_duration) in slowest_imports[:imports_limit]:
+                    lines.append(f'  {package}: {package_duration * 1000:.0f} ms')
+
+        return '\n'.join(lines)
+
+
+report = StartupReport()
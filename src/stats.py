@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import json
+import logging
+import threading
+import typing
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_counters: typing.Counter[str] = collections.Counter()
+_gauges: typing.Dict[str, typing.Callable[[], typing.Any]] = {}
+
+
+def increment(name: str, amount=1) -> None:
+    with _lock:
+        _counters[name] += amount
+
+
+def register_gauge(name: str, getter: typing.Callable[[], typing.Any]) -> None:
+    """
+    Registers a value that is computed only when the stats are requested.
+    """
+
+    with _lock:
+        _gauges[name] = getter
+
+
+def get_counters() -> typing.Dict[str, int]:
+    with _lock:
+        return dict(_counters)
+
+
+def get_gauges() -> typing.Dict[str, typing.Any]:
+    with _lock:
+        gauges = dict(_gauges)
+
+    return {name: getter() for (name, getter) in gauges.items()}
+
+
+def get_values() -> typing.Dict[str, typing.Any]:
+    values: typing.Dict[str, typing.Any] = {}
+
+    values.update(get_counters())
+    values.update(get_gauges())
+
+    return values
+
+
+def combine(snapshots: typing.Iterable[typing.Dict[str, typing.Any]]) -> typing.Dict[str, typing.Any]:
+    """
+    Adds up the values of several processes. The values that aren't numbers are taken from the first process.
+    """
+
+    values: typing.Dict[str, typing.Any] = {}
+
+    for snapshot in snapshots:
+        for (name, value) in snapshot.items():
+            previous_value = values.get(name)
+
+            if previous_value is None:
+                values[name] = value
+            elif isinstance(previous_value, (int, float)) and isinstance(value, (int, float)):
+                values[name] = previous_value + value
+
+    return values
+
+
+def save(path: str) -> None:
+    try:
+        with open(path, 'w') as file:
+            json.dump(get_values(), file, default=str)
+    except OSError as error:
+        logger.warning(f'Could not save the stats: {error}')
+
+
+def load(path: str) -> typing.Optional[typing.Dict[str, typing.Any]]:
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def get_stats_text(values: typing.Optional[typing.Dict[str, typing.Any]] = None) -> str:
+    if values is None:
+        values = get_values()
+
+    lines = [f'{name}: {value}' for (name, value) in sorted(values.items())]
+
+    if not lines:
+        return 'No stats'
+
+    return '\n'.join(lines)
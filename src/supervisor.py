@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import dataclasses
+import enum
+import json
+import logging
+import multiprocessing
+import multiprocessing.queues
+import os
+import signal
+import ssl
+import time
+import typing
+
+import tornado.httpserver
+import tornado.web
+
+import constants
+
+logger = logging.getLogger(__name__)
+
+
+# The updates sent by a user outside of a chat, or about a message that might be in any chat, that are rate limited and
+# superseded by user.
+USER_PARTITIONED_UPDATES = ('inline_query', 'chosen_inline_result', 'callback_query')
+
+
+def get_partition_key(data: typing.Dict[str, typing.Any]) -> int:
+    """
+    The id of the user who sent the inline queries and the callback queries, because the workers keep the rate limit
+    and the latest inline query of each user for themselves, and the id of the chat of the other updates, or of their
+    user when they have no chat, so that the updates of a chat are handled in order by the same worker. The private
+    chats have the id of their user, so their messages and callback queries still go to the same worker.
+    """
+
+    for (key, value) in data.items():
+        if not isinstance(value, dict):
+            continue
+
+        chat = None if key in USER_PARTITIONED_UPDATES else value.get('chat')
+
+        if isinstance(chat, dict) and isinstance(chat.get('id'), int):
+            return chat['id']
+
+        user = value.get('from')
+
+        if isinstance(user, dict) and isinstance(user.get('id'), int):
+            return user['id']
+
+    return data.get('update_id', 0)
+
+
+class ControlCommand(enum.Enum):
+    # Forgets the normalized queries given as arguments from the in-memory caches.
+    DISCARD_CACHED_QUERIES = 'discard_cached_queries'
+    CLEAR_NEGATIVE_RESULTS = 'clear_negative_results'
+
+    # Handles the updates already received, then exits. It's the last message in the queue.
+    DRAIN = 'drain'
+
+
+@dataclasses.dataclass(frozen=True)
+class ControlMessage:
+    """
+    Sent to the workers in the same queues as the updates, so that they apply the changes of the caches that each of
+    them keeps in memory, like the admin commands that clear them.
+    """
+
+    command: ControlCommand
+    args: typing.Tuple[str, ...]
+
+
+class ForwardingWebhookHandler(tornado.web.RequestHandler):
+    SUPPORTED_METHODS = ('POST',)  # type: ignore[assignment]
+
+    def initialize(self, supervisor: 'Supervisor') -> None:
+        self.supervisor = supervisor
+
+    def post(self) -> None:
+        if self.request.headers.get('Content-Type') != 'application/json':
+            raise tornado.web.HTTPError(403)
+
+        # Telegram delivers the update again later, to the workers started next.
+        if self.supervisor.is_draining:
+            raise tornado.web.HTTPError(503)
+
+        try:
+            self.supervisor.forward(self.request.body)
+        except ValueError:
+            raise tornado.web.HTTPError(400)
+
+        self.set_status(200)
+
+
+class Supervisor:
+    """
+    Runs the bot in several worker processes behind a single webhook, which only reads the user of each update and
+    forwards it to the worker of that user. The workers are forked before they start any thread, by a keeper process
+    that forks each of them again when it crashes, so that the others keep running. When the supervisor is stopped,
+    or when a worker asks it to restart all of them, it stops forwarding updates, and the workers handle the ones
+    already forwarded before they exit.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+
+        # The keeper exits only when it's stopped, so its exit otherwise is a failure.
+        self.has_failed = False
+
+        self._queues: typing.List[multiprocessing.queues.Queue] = [multiprocessing.Queue() for _ in range(workers)]
+        self._pid = os.getpid()
+        self._keeper_pid: typing.Optional[int] = None
+
+        self._stopped: typing.Optional[asyncio.Event] = None
+        self._is_restart_requested = False
+        self._is_draining = False
+
+    @property
+    def is_draining(self) -> bool:
+        return self._is_draining
+
+    def fork_workers(self) -> typing.Optional[int]:
+        """
+        Returns the index of the worker in each worker process, and `None` in the supervisor. The workers forked again
+        return from here too.
+        """
+
+        pid = os.fork()
+
+        if pid != 0:
+            self._keeper_pid = pid
+
+            return None
+
+        return self._keep_workers()
+
+    def _keep_workers(self) -> int:
+        """
+        Forks the workers, and forks them again when they exit, until the keeper is stopped. Then it waits for them to
+        exit, and exits too. It only returns in the workers.
+        """
+
+        pids: typing.Dict[int, int] = {}
+        is_stopping = False
+
+        def stop(signum: int, _frame: typing.Any) -> None:
+            nonlocal is_stopping
+
+            is_stopping = True
+
+            # The workers exit by themselves when they are drained.
+            if signum == signal.SIGUSR1:
+                return
+
+            for pid in list(pids):
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGUSR1, stop)
+
+        # The workers get it from the terminal too.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        indexes = list(range(self.workers))
+
+        while True:
+            for index in indexes:
+                pid = os.fork()
+
+                if pid == 0:
+                    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                    signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+                    signal.signal(signal.SIGINT, signal.default_int_handler)
+
+                    return index
+
+                pids[pid] = index
+
+            indexes = []
+
+            if not pids:
+                os._exit(0)
+
+            (pid, status) = os.wait()
+            index = pids.pop(pid)
+
+            if is_stopping:
+                continue
+
+            logger.error(f'Worker {index} exited with status {status}, forking it again')
+
+            time.sleep(constants.WORKER_RESPAWN_DELAY.total_seconds())
+
+            if not is_stopping:
+                indexes = [index]
+
+    def get_updates_queue(self, index: int) -> multiprocessing.queues.Queue:
+        return self._queues[index]
+
+    def forward(self, body: bytes) -> None:
+        data = json.loads(body)
+
+        self._queues[get_partition_key(data) % self.workers].put(body)
+
+    def broadcast(self, message: ControlMessage, excluded_index: typing.Optional[int] = None) -> None:
+        """
+        Sends the message to all the workers, except the excluded one. The workers inherit all the queues, so they can
+        send it too.
+        """
+
+        for (index, updates_queue) in enumerate(self._queues):
+            if index != excluded_index:
+                updates_queue.put(message)
+
+    def request_restart(self) -> None:
+        """
+        Asks the supervisor, from a worker, to restart all the workers.
+        """
+
+        os.kill(self._pid, signal.SIGUSR1)
+
+    def _stop(self, is_restart_requested: bool) -> None:
+        self._is_restart_requested = is_restart_requested
+
+        if self._stopped is not None:
+            self._stopped.set()
+
+    def _has_keeper_exited(self) -> bool:
+        if self._keeper_pid is None:
+            return True
+
+        try:
+            (exited_pid, _status) = os.waitpid(self._keeper_pid, os.WNOHANG)
+        except ChildProcessError:
+            return True
+
+        return exited_pid != 0
+
+    async def _drain_workers(self) -> None:
+        """
+        Stops the keeper from forking the workers again, and asks them to handle the updates already forwarded and
+        exit, after the webhook stopped forwarding them.
+        """
+
+        if self._keeper_pid is None:
+            return
+
+        try:
+            os.kill(self._keeper_pid, signal.SIGUSR1)
+        except ProcessLookupError:
+            return
+
+        self.broadcast(ControlMessage(ControlCommand.DRAIN, ()))
+
+        deadline = time.monotonic() + constants.WORKERS_DRAIN_TIMEOUT.total_seconds()
+
+        while time.monotonic() < deadline:
+            if self._has_keeper_exited():
+                self._keeper_pid = None
+
+                return
+
+            await asyncio.sleep(constants.DRAIN_CHECK_INTERVAL.total_seconds())
+
+        logger.warning('Stopping the workers before they handled all the updates')
+
+    def _stop_workers(self) -> None:
+        if self._keeper_pid is None:
+            return
+
+        try:
+            os.kill(self._keeper_pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+        try:
+            os.waitpid(self._keeper_pid, 0)
+        except ChildProcessError:
+            pass
+
+        self._keeper_pid = None
+
+    async def _serve(self, port: int, url_path: str, ssl_ctx: typing.Optional[ssl.SSLContext]) -> None:
+        self._stopped = asyncio.Event()
+
+        loop = asyncio.get_running_loop()
+
+        for stop_signal in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(stop_signal, self._stop, False)
+
+        loop.add_signal_handler(signal.SIGUSR1, self._stop, True)
+
+        app = tornado.web.Application([
+            (rf'{url_path}/?', ForwardingWebhookHandler, {'supervisor': self})
+        ])
+
+        server = tornado.httpserver.HTTPServer(app, ssl_options=ssl_ctx)
+
+        server.listen(port)
+
+        while not self._stopped.is_set():
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=constants.SUPERVISOR_CHECK_INTERVAL.total_seconds())
+            except asyncio.TimeoutError:
+                if self._has_keeper_exited():
+                    logger.error('The workers keeper exited')
+
+                    self._keeper_pid = None
+                    self.has_failed = True
+
+                    self._stop(False)
+
+        self._is_draining = True
+
+        server.stop()
+
+        await self._drain_workers()
+
+    def serve(self, port: int, url_path: str, cert: typing.Optional[str], key: typing.Optional[str]) -> bool:
+        """
+        Forwards the updates received by the webhook until the supervisor is stopped, then drains the workers, and
+        stops the ones that are still running. Returns `True` if a worker asked for a restart.
+        """
+
+        ssl_ctx: typing.Optional[ssl.SSLContext] = None
+
+        if cert is not None and key is not None:
+            ssl_ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            ssl_ctx.load_cert_chain(cert, key)
+
+        try:
+            asyncio.run(self._serve(port, url_path, ssl_ctx))
+        finally:
+            self._stop_workers()
+
+        return self._is_restart_requested
@@ -8,6 +8,7 @@ import telegram.utils.helpers
 
 import analytics
 import constants
+import inline_answers
 
 
 def check_admin(bot: telegram.Bot, context: telegram.ext.CallbackContext, message: telegram.Message, analytics_handler: analytics.AnalyticsHandler, admin_user_id: int) -> bool:
@@ -16,7 +17,7 @@ def check_admin(bot: telegram.Bot, context: telegram.ext.CallbackContext, messag
     if user is None:
         return False
 
-    analytics_handler.track(context, analytics.AnalyticsType.COMMAND, user, message.text)
+    analytics_handler.track(analytics.AnalyticsType.COMMAND, user, message.text)
 
     if user.id != admin_user_id:
         bot.send_message(message.chat_id, 'You are not allowed to use this command')
@@ -61,6 +62,32 @@ def send_subscription_update_message(bot: telegram.Bot, chat_id: int, text: str)
     )
 
 
+def get_answer_inline_query_data(inline_query_id: str, answer: inline_answers.InlineAnswer, cache_time: int) -> typing.Dict[str, typing.Any]:
+    """
+    The results are passed as they were serialized, which is also accepted by the Bot API.
+    """
+
+    data: typing.Dict[str, typing.Any] = {
+        'inline_query_id': inline_query_id,
+        'results': answer.results,
+        'cache_time': cache_time
+    }
+
+    if answer.next_offset is not None:
+        data['next_offset'] = answer.next_offset
+
+    return data
+
+
+def call_method(bot: telegram.Bot, method: str, data: typing.Dict[str, typing.Any]) -> None:
+    """
+    Calls a Bot API method with parameters that are already serializable, which python-telegram-bot passes through to
+    the request body.
+    """
+
+    bot.request.post(f'{bot.base_url}/{method}', data)
+
+
 def escape_v2_markdown_text(text: str, entity_type: typing.Optional[str] = None) -> str:
     return telegram.utils.helpers.escape_markdown(
         text=text,
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import datetime
+import json
+import logging
+import threading
+import time
+import typing
+
+logger = logging.getLogger(__name__)
+
+
+class RecentUpdates:
+    """
+    Remembers the ids of the recently received updates, because Telegram delivers an update again if the webhook
+    doesn't acknowledge it in time. They can be saved to a file, so that the redeliveries received right after a
+    restart are recognized too.
+    """
+
+    def __init__(self, max_size: int, expire_after: datetime.timedelta) -> None:
+        self._max_size = max_size
+        self._expire_after = expire_after.total_seconds()
+
+        # The expiration times are stored as timestamps, so that they are still valid after a restart.
+        self._expiration_times: typing.OrderedDict[int, float] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._expiration_times)
+
+    def add(self, update_id: int) -> bool:
+        """
+        Returns `False` if the update has already been received recently.
+        """
+
+        now = time.time()
+
+        with self._lock:
+            expiration_time = self._expiration_times.get(update_id)
+
+            if expiration_time is not None and expiration_time >= now:
+                return False
+
+            self._expiration_times[update_id] = now + self._expire_after
+            self._expiration_times.move_to_end(update_id)
+
+            while len(self._expiration_times) > self._max_size:
+                self._expiration_times.popitem(last=False)
+
+        return True
+
+    def save(self, path: str) -> None:
+        now = time.time()
+
+        with self._lock:
+            items = [[update_id, expiration_time] for (update_id, expiration_time) in self._expiration_times.items() if expiration_time >= now]
+
+        try:
+            with open(path, 'w') as file:
+                json.dump(items, file)
+        except OSError as error:
+            logger.warning(f'Could not save the recent updates: {error}')
+
+    def load(self, path: str) -> None:
+        try:
+            with open(path) as file:
+                items = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as error:
+            logger.warning(f'Could not load the recent updates: {error}')
+
+            return
+
+        now = time.time()
+
+        with self._lock:
+            for (update_id, expiration_time) in items:
+                if expiration_time >= now:
+                    self._expiration_times[update_id] = expiration_time
+
+            while len(self._expiration_times) > self._max_size:
+                self._expiration_times.popitem(last=False)
@@ -2,40 +2,403 @@
 
 import argparse
 import base64
-import collections
+import codecs
+import contextlib
+import datetime
+import functools
+import gzip
+import hashlib
 import html
 import json
 import logging
+import os
+import sqlite3
 import time
 import typing
+import unicodedata
 import urllib.parse
-import uuid
 
 import lxml.etree
 import lxml.html.builder
-import regex
+import pytz
 import requests
 import requests_cache
 import telegram
 import telegram.ext
 
 import analytics
+import circuit_breaker
 import complete_definition
 import constants
 import database
+import hedging
+import inline_answers
+import json_stream
+import keyboards
+import lemmas
+import negative_cache
 import parsed_definition
+import rendered_cache
+import response_cache
+import stats
 
 logger = logging.getLogger(__name__)
 
 
+dex_circuit_breaker = circuit_breaker.CircuitBreaker(
+    name='dexonline',
+    failure_threshold=constants.DEX_CIRCUIT_FAILURE_THRESHOLD,
+    slow_response=constants.DEX_CIRCUIT_SLOW_RESPONSE,
+    open_time=constants.DEX_CIRCUIT_OPEN_TIME
+)
+
+# A single session for all the dexonline requests, so that the workers reuse its connections and its cache backend,
+# instead of opening a new connection and a new cache database connection for each request. The expired responses
+# are served when dexonline fails.
+dex_session = requests_cache.CachedSession(
+    backend=response_cache.BoundedResponseCache(constants.RESPONSES_CACHE_LOCATION),
+    expire_after=constants.RESULTS_CACHE_TIME,
+    old_data_on_error=True
+)
+responses_cache = typing.cast(response_cache.BoundedResponseCache, dex_session.cache)
+
+dex_session.mount(constants.DEX_BASE_URL, circuit_breaker.CircuitBreakerAdapter(
+    circuit_breaker=dex_circuit_breaker,
+    timeout=constants.DEX_READ_TIMEOUT,
+    connect_timeout=constants.DEX_CONNECT_TIMEOUT,
+    pool_maxsize=constants.DEX_CONNECTIONS
+))
+
+
+def get_redirected_api_url(url: str) -> typing.Optional[str]:
+    """
+    The API URL of the definition page that an API URL redirected to, or `None` if it's already an API URL.
+    """
+
+    if url.endswith(constants.DEX_API_JSON_PATH):
+        return None
+
+    return f'{url}{constants.DEX_API_JSON_PATH}'
+
+
+negative_results_cache = negative_cache.NegativeCache(
+    max_size=constants.NEGATIVE_RESULTS_CACHE_SIZE,
+    expire_after=constants.NEGATIVE_RESULTS_CACHE_TIME
+)
+
+rendered_definitions_cache = rendered_cache.RenderedCache(
+    max_size=constants.RENDERED_CACHE_SIZE,
+    expire_after=constants.RESULTS_CACHE_TIME
+)
+
+inline_answers_cache = inline_answers.InlineAnswersCache(
+    max_size=constants.INLINE_ANSWERS_CACHE_SIZE,
+    expire_after=constants.RESULTS_CACHE_TIME
+)
+
+stats.register_gauge(constants.STATS_NEGATIVE_RESULTS_CACHE_SIZE, negative_results_cache.__len__)
+stats.register_gauge(constants.STATS_RENDERED_CACHE_SIZE, rendered_definitions_cache.__len__)
+stats.register_gauge(constants.STATS_INLINE_ANSWERS_CACHE_SIZE, inline_answers_cache.__len__)
+stats.register_gauge(constants.STATS_DEX_CIRCUIT_STATE, lambda: dex_circuit_breaker.state.value)
+
+
+def format_latency(latency: typing.Optional[float]) -> typing.Optional[str]:
+    """
+    The latencies aren't numbers in the stats, so that they aren't added up over the workers.
+    """
+
+    if latency is None:
+        return None
+
+    return f'{latency * 1000:.0f} ms'
+
+
+def enable_dex_hedging(budget_ratio: float) -> None:
+    """
+    Sends a duplicate of the slowest dexonline requests, up to `budget_ratio` of all the requests, and returns whichever
+    response arrives first.
+    """
+
+    hedger = hedging.Hedger(budget_ratio)
+
+    adapter = hedging.HedgingAdapter(
+        adapter=dex_session.get_adapter(constants.DEX_BASE_URL),
+        hedger=hedger,
+        workers=constants.DEX_CONNECTIONS
+    )
+
+    dex_session.mount(constants.DEX_BASE_URL, adapter)
+
+    stats.register_gauge(constants.STATS_DEX_HEDGE_DELAY, lambda: format_latency(hedger.hedge_delay))
+    stats.register_gauge(constants.STATS_DEX_P99_LATENCY, lambda: format_latency(hedger.latencies.get_percentile(99)))
+    stats.register_gauge(constants.STATS_DEX_PRIMARY_P99_LATENCY, lambda: format_latency(hedger.primary_latencies.get_percentile(99)))
+
+
+def enable_cache_write_ahead_log() -> None:
+    """
+    Lets several processes share the responses cache, like `database.enable_write_ahead_log`.
+    """
+
+    with contextlib.closing(sqlite3.connect(responses_cache.responses.filename)) as connection:
+        connection.execute('PRAGMA journal_mode=WAL')
+
+
+def enable_shared_rendered_cache() -> None:
+    """
+    Keeps the rendered definitions in the responses cache database too, so that the workers, which get the inline
+    queries of different users, share them.
+    """
+
+    rendered_definitions_cache.store = rendered_cache.RenderedStore(responses_cache.responses.filename)
+
+
+def save_caches_snapshot(path: str) -> None:
+    """
+    Saves the in-memory caches in a compressed file, so that they are still warm after a restart. The responses cache
+    is already on disk.
+    """
+
+    snapshot = {
+        'rendered': rendered_definitions_cache.get_snapshot(),
+        'negative': negative_results_cache.get_snapshot(),
+        'callback_data': keyboards.callback_data_codec.get_snapshot()
+    }
+
+    temporary_path = f'{path}.tmp'
+
+    try:
+        with gzip.open(temporary_path, 'wt', encoding='utf-8') as file:
+            json.dump(snapshot, file, ensure_ascii=False, separators=(',', ':'))
+
+        os.replace(temporary_path, path)
+    except OSError as error:
+        logger.warning(f'Could not save the caches: {error}')
+
+
+def load_caches_snapshot(path: str) -> None:
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as file:
+            snapshot = json.load(file)
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError) as error:
+        logger.warning(f'Could not load the caches: {error}')
+
+        return
+
+    rendered_definitions_cache.load_snapshot(snapshot.get('rendered', []))
+    negative_results_cache.load_snapshot(snapshot.get('negative', []))
+    keyboards.callback_data_codec.load_snapshot(snapshot.get('callback_data', []))
+
+
+class CancelledQueryError(Exception):
+    pass
+
+
+class DexUnavailableError(Exception):
+    pass
+
+
+def get_remaining_timeout(api_url: str, deadline: float) -> typing.Tuple[float, float]:
+    """
+    The timeout of a request that only gets the time left until `deadline`.
+    """
+
+    remaining_time = deadline - time.monotonic()
+
+    if remaining_time <= 0:
+        raise requests.Timeout(f'The lookup of {api_url} timed out')
+
+    return (min(constants.DEX_CONNECT_TIMEOUT.total_seconds(), remaining_time), min(constants.DEX_READ_TIMEOUT.total_seconds(), remaining_time))
+
+
+def get_dex_response(api_url: str, stream=False, deadline: typing.Optional[float] = None, should_cancel: typing.Optional[typing.Callable[[], bool]] = None) -> requests.Response:
+    """
+    Raises `DexUnavailableError` when dexonline doesn't answer in time, or its circuit is open, and the response isn't
+    cached, not even an expired one. The lookup ends by `deadline`, if it's earlier than its own timeout. Raises
+    `CancelledQueryError` instead of making a request when `should_cancel` returns `True`.
+    """
+
+    lookup_deadline = time.monotonic() + constants.DEX_LOOKUP_TIMEOUT.total_seconds()
+    timeout: typing.Optional[typing.Tuple[float, float]] = None
+
+    try:
+        if deadline is not None and deadline < lookup_deadline:
+            lookup_deadline = deadline
+            timeout = get_remaining_timeout(api_url, lookup_deadline)
+
+        if should_cancel is not None and should_cancel():
+            raise CancelledQueryError()
+
+        api_request = dex_session.get(api_url, stream=stream, timeout=timeout)
+        redirected_api_url = get_redirected_api_url(api_request.url)
+
+        if redirected_api_url is not None:
+            api_request.close()
+
+            if should_cancel is not None and should_cancel():
+                raise CancelledQueryError()
+
+            # The request of the redirect only gets the time left.
+            timeout = get_remaining_timeout(api_url, lookup_deadline)
+
+            api_request = dex_session.get(redirected_api_url, stream=stream, timeout=timeout)
+    except requests.RequestException as error:
+        stats.increment(constants.STATS_DEX_UNAVAILABLE_RESPONSES)
+
+        raise DexUnavailableError(str(error)) from error
+
+    return api_request
+
+
 def get_raw_response(api_url: str) -> typing.Dict[str, typing.Any]:
-    api_request = requests.get(api_url)
-    api_final_url = api_request.url
+    return get_dex_response(api_url).json()
 
-    if not api_final_url.endswith(constants.DEX_API_JSON_PATH):
-        api_request = requests.get(f'{api_final_url}{constants.DEX_API_JSON_PATH}')
 
-    return api_request.json()
+def get_displayed_query(query: str) -> str:
+    """
+    The query as the user typed it, with its case and its diacritics, only decoded and with its whitespace trimmed,
+    so that it's shown in the links and kept in the buttons. It's never longer than the normalized one, because case
+    folding doesn't shorten the text, and the cedillas are replaced one for one.
+    """
+
+    displayed_query = urllib.parse.unquote(query)
+    displayed_query = unicodedata.normalize('NFC', displayed_query)
+
+    return ' '.join(displayed_query.split())
+
+
+def normalize_query(query: str) -> str:
+    """
+    Makes the different spellings of the same query use the same cache entries.
+    """
+
+    normalized_query = get_displayed_query(query)
+    normalized_query = normalized_query.translate(constants.CEDILLA_TO_COMMA_BELOW_TRANSLATION_TABLE)
+
+    return normalized_query.casefold()
+
+
+def get_definition_api_url(normalized_query: str) -> str:
+    return constants.DEX_DEFINITION_API_URL_FORMAT.format(urllib.parse.quote(normalized_query, safe=''))
+
+
+def get_definition_url(query: str) -> str:
+    return constants.DEX_DEFINITION_URL_FORMAT.format(query)
+
+
+def get_normalization_report(queries: typing.Iterable[str]) -> str:
+    """
+    Replays the queries in order, through a cache without expiration, once with their raw spellings as keys and once
+    with the normalized ones, so that the cache hits gained by normalization are measured away from the lookups.
+    """
+
+    queries_count = 0
+    normalized_count = 0
+
+    raw_hits = 0
+    normalized_hits = 0
+
+    raw_queries: typing.Set[str] = set()
+    normalized_queries: typing.Set[str] = set()
+
+    for query in queries:
+        normalized_query = normalize_query(query)
+
+        queries_count += 1
+
+        if normalized_query != query:
+            normalized_count += 1
+
+        if query in raw_queries:
+            raw_hits += 1
+        else:
+            raw_queries.add(query)
+
+        if normalized_query in normalized_queries:
+            normalized_hits += 1
+        else:
+            normalized_queries.add(normalized_query)
+
+    return (
+        f'Queries: {queries_count}\n'
+        f'Normalized queries: {normalized_count}\n'
+        f'Cache hits without normalization: {raw_hits}\n'
+        f'Cache hits with normalization: {normalized_hits}\n'
+        f'Cache hits gained by normalization: {normalized_hits - raw_hits}'
+    )
+
+
+def get_cached_response(url: str) -> typing.Optional[requests.Response]:
+    key = responses_cache.create_key(requests.Request('GET', url).prepare())
+
+    (response, _timestamp) = responses_cache.get_response_and_time(key)
+
+    return response
+
+
+def get_cached_dex_response(api_url: str) -> typing.Optional[requests.Response]:
+    """
+    The cached response of the API URL, even if it expired, following the redirects like `get_dex_response` does.
+    """
+
+    response = get_cached_response(api_url)
+
+    if response is not None:
+        redirected_api_url = get_redirected_api_url(response.url)
+
+        if redirected_api_url is not None:
+            response = get_cached_response(redirected_api_url)
+
+    return response
+
+
+def get_cached_raw_definitions(api_url: str) -> typing.Optional[typing.List[typing.Dict[str, typing.Any]]]:
+    """
+    Returns the definitions only if they are already cached, even if they expired, without making any request.
+    """
+
+    response = get_cached_dex_response(api_url)
+
+    if response is None:
+        return None
+
+    try:
+        return response.json()[constants.DEX_API_DEFINITIONS_KEY]
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def iterate_chunks(response: requests.Response, should_cancel: typing.Optional[typing.Callable[[], bool]] = None) -> typing.Iterator[bytes]:
+    for chunk in response.iter_content(chunk_size=constants.DEX_API_STREAM_CHUNK_SIZE):
+        if should_cancel is not None and should_cancel():
+            raise CancelledQueryError()
+
+        yield chunk
+
+
+def iterate_raw_definitions(api_url: str, deadline: typing.Optional[float] = None, should_cancel: typing.Optional[typing.Callable[[], bool]] = None) -> typing.Iterator[typing.Dict[str, typing.Any]]:
+    """
+    Makes the request only when the definitions are first needed, and raises `CancelledQueryError` before it, or
+    between the chunks of the response, as soon as `should_cancel` returns `True`, which closes the response.
+    """
+
+    api_request = get_dex_response(api_url, stream=True, deadline=deadline, should_cancel=should_cancel)
+
+    # The cached session doesn't mark the expired responses that it serves when dexonline fails.
+    from_cache = getattr(api_request, 'from_cache', None)
+
+    if from_cache is None:
+        stats.increment(constants.STATS_STALE_RESPONSES)
+    elif from_cache:
+        stats.increment(constants.STATS_RESPONSE_CACHE_HITS)
+    else:
+        stats.increment(constants.STATS_RESPONSE_CACHE_MISSES)
+
+    with api_request:
+        chunks = codecs.iterdecode(iterate_chunks(api_request, should_cancel), 'utf-8')
+
+        yield from json_stream.iterate_array_items(chunks, constants.DEX_API_DEFINITIONS_KEY)
 
 
 def create_definition_url(raw_definition: typing.Dict[str, typing.Any], url: str) -> str:
@@ -68,7 +431,7 @@ def get_message_limit(footer: str) -> int:
     return message_limit
 
 
-def get_html(raw_definition: typing.Dict[str, typing.Any]) -> lxml.html.HtmlElement:
+def get_html(raw_definition: typing.Dict[str, typing.Any], definition_url: str) -> lxml.html.HtmlElement:
     html_rep = raw_definition['htmlRep']
     fragments = lxml.html.fragments_fromstring(html_rep)
     root = lxml.html.Element('root')
@@ -82,6 +445,12 @@ def get_html(raw_definition: typing.Dict[str, typing.Any]) -> lxml.html.HtmlElem
 
             continue
 
+        if fragment.tag == 'sup':
+            replace_superscript(
+                sup=fragment,
+                definition_url=definition_url
+            )
+
         root.append(fragment)
 
     if text is not None and len(root) > 0:
@@ -90,15 +459,14 @@ def get_html(raw_definition: typing.Dict[str, typing.Any]) -> lxml.html.HtmlElem
     return root
 
 
-def replace_superscripts(root: lxml.html.HtmlElement, definition_url: str) -> None:
-    for sup in root.findall('sup'):
-        sup_text = sup.text_content()
-        superscript_text = get_superscript(sup_text)
+def replace_superscript(sup: lxml.html.HtmlElement, definition_url: str) -> None:
+    sup_text = sup.text_content()
+    superscript_text = get_superscript(sup_text)
 
-        if superscript_text:
-            sup.text = superscript_text
-        else:
-            logger.warning(f'Unsupported superscript "{sup_text}" in definition "{definition_url}"')
+    if superscript_text:
+        sup.text = superscript_text
+    else:
+        logger.warning(f'Unsupported superscript "{sup_text}" in definition "{definition_url}"')
 
 
 def get_word_link(word: str, bot_name: str) -> str:
@@ -122,7 +490,35 @@ def clean_html_element(element: lxml.html.HtmlElement) -> None:
     element.attrib.clear()
 
 
-def get_parsed_definition(raw_definition: typing.Dict[str, typing.Any], url: str, links_toggle: bool, cli_args: argparse.Namespace, bot_name: str, prefix='', suffix='') -> parsed_definition.ParsedDefinition:
+def create_parsed_definition(index: int, title: str, html_text: str, footer: str, suffix: str, url: str, cli_args: argparse.Namespace) -> parsed_definition.ParsedDefinition:
+    if cli_args.debug:
+        title = f'{index}: {title}'
+
+    title = title[:constants.MESSAGE_TITLE_LENGTH_LIMIT]
+
+    if len(title) >= constants.MESSAGE_TITLE_LENGTH_LIMIT:
+        title = title[:- len(constants.ELLIPSIS)]
+        title += constants.ELLIPSIS
+
+    footer = f'{constants.DEFINITION_AND_FOOTER_SEPARATOR}{footer}{suffix}'
+
+    if cli_args.debug:
+        logger.info(f'Result: {index}: {html_text}{footer}')
+
+    return parsed_definition.ParsedDefinition(
+        index=index,
+        title=title,
+        text=html_text,
+        footer=footer,
+        url=url
+    )
+
+
+def get_parsed_definitions(raw_definition: typing.Dict[str, typing.Any], url: str, cli_args: argparse.Namespace, bot_name: str, prefix='', suffix='') -> typing.Tuple[parsed_definition.ParsedDefinition, parsed_definition.ParsedDefinition]:
+    """
+    Returns the definition rendered without and with links, walking its HTML tree only once.
+    """
+
     definition_index = raw_definition.get('index', 'N/A')
 
     definition_url = create_definition_url(
@@ -135,107 +531,141 @@ def get_parsed_definition(raw_definition: typing.Dict[str, typing.Any], url: str
     )
 
     message_limit = get_message_limit(footer)
-    root = get_html(raw_definition)
-
-    definition_title: str
-    definition_html_text = prefix
-    elements: collections.Iterator
-
-    replace_superscripts(
-        root=root,
+    root = get_html(
+        raw_definition=raw_definition,
         definition_url=definition_url
     )
 
-    if links_toggle:
-        lxml.etree.strip_tags(root, '*')
+    definition_title = ''
+    definition_html_text = prefix
+    definition_text_content = ''
+
+    is_truncated = False
 
-        text = root.text
+    # The whole text, as if all the tags were stripped, used by the variant with links.
+    text = root.text or ''
 
-        definition_title = text
-        elements = constants.WORD_REGEX.finditer(text)
-    else:
-        definition_title = ''
-        elements = root.iterchildren()
+    for element in root.iterchildren():
+        clean_html_element(element)
 
-    definition_text_content = ''
+        text_content = element.text_content() + (element.tail or '')
+        text += text_content
 
-    for element in elements:
-        text_content = None
-        extra_text_content = None
-        html_text = None
+        if is_truncated or not text_content:
+            continue
 
-        if links_toggle:
-            word = element.group('word')
-            other = element.group('other')
+        definition_title += text_content
 
-            if word is not None:
-                text_content = html.escape(word)
-                html_text = get_word_link(
-                    word=text_content,
-                    bot_name=bot_name
-                )
+        if len(definition_text_content) + len(text_content) + len(suffix) > message_limit:
+            definition_html_text += constants.ELLIPSIS
 
-            if other is not None:
-                extra_text_content = html.escape(other)
+            is_truncated = True
         else:
-            clean_html_element(element)
+            definition_html_text += lxml.html.tostring(element).decode()
+            definition_text_content += text_content
+
+    links_definition_html_text = prefix
+    links_definition_text_content = ''
 
-            text_content = element.text_content() + (element.tail or '')
-            html_text = lxml.html.tostring(element).decode()
+    for match in constants.WORD_REGEX.finditer(text):
+        word = match.group('word')
+        other = match.group('other')
 
-            definition_title += text_content
+        if word is not None:
+            word_text_content = html.escape(word)
 
-        if text_content:
-            if len(definition_text_content) + len(text_content) + len(suffix) > message_limit:
-                definition_html_text += constants.ELLIPSIS
+            if len(links_definition_text_content) + len(word_text_content) + len(suffix) > message_limit:
+                links_definition_html_text += constants.ELLIPSIS
 
                 break
-            else:
-                definition_html_text += html_text
-                definition_text_content += text_content
 
-        if extra_text_content:
-            definition_html_text += extra_text_content
-            definition_text_content += extra_text_content
+            links_definition_html_text += get_word_link(
+                word=word_text_content,
+                bot_name=bot_name
+            )
+            links_definition_text_content += word_text_content
 
-    if cli_args.debug:
-        definition_title = f'{definition_index}: {definition_title}'
+        if other is not None:
+            other_text_content = html.escape(other)
 
-    definition_title = definition_title[:constants.MESSAGE_TITLE_LENGTH_LIMIT]
+            links_definition_html_text += other_text_content
+            links_definition_text_content += other_text_content
 
-    if len(definition_title) >= constants.MESSAGE_TITLE_LENGTH_LIMIT:
-        definition_title = definition_title[:- len(constants.ELLIPSIS)]
-        definition_title += constants.ELLIPSIS
+    definition = create_parsed_definition(
+        index=definition_index,
+        title=definition_title,
+        html_text=definition_html_text,
+        footer=footer,
+        suffix=suffix,
+        url=definition_url,
+        cli_args=cli_args
+    )
+    links_definition = create_parsed_definition(
+        index=definition_index,
+        title=text,
+        html_text=links_definition_html_text,
+        footer=footer,
+        suffix=suffix,
+        url=definition_url,
+        cli_args=cli_args
+    )
 
-    definition_html_text += f'{constants.DEFINITION_AND_FOOTER_SEPARATOR}{footer}'
-    definition_html_text += suffix
+    return definition, links_definition
 
-    if cli_args.debug:
-        logger.info(f'Result: {definition_index}: {definition_html_text}')
+
+def get_displayed_definition(definition: parsed_definition.ParsedDefinition, normalized_query: str, displayed_query: str) -> parsed_definition.ParsedDefinition:
+    """
+    The definitions are rendered and cached for all the spellings of a query, with the links of the normalized one,
+    and shown with those of the spelling that the user typed. That one isn't longer, so the footer still fits.
+    """
+
+    if displayed_query == normalized_query:
+        return definition
+
+    # Without the spaces, like `create_definition_url`.
+    normalized_url = get_definition_url(normalized_query).replace(' ', '')
+    displayed_url = get_definition_url(displayed_query).replace(' ', '')
+
+    if not definition.url.startswith(f'{normalized_url}/'):
+        return definition
+
+    url = f'{displayed_url}{definition.url[len(normalized_url):]}'
+
+    # The link is at the start of the footer.
+    footer_start = f'{constants.DEFINITION_AND_FOOTER_SEPARATOR}{definition.url}\n'
+
+    if not definition.footer.startswith(footer_start):
+        return definition
 
     return parsed_definition.ParsedDefinition(
-        index=definition_index,
-        title=definition_title,
-        html=definition_html_text,
-        url=definition_url
+        index=definition.index,
+        title=definition.title,
+        text=definition.text,
+        footer=f'{constants.DEFINITION_AND_FOOTER_SEPARATOR}{url}\n{definition.footer[len(footer_start):]}',
+        url=url
     )
 
 
-def get_complete_definition(definition: parsed_definition.ParsedDefinition, inline_keyboard_buttons: typing.List[typing.List[telegram.InlineKeyboardButton]]) -> complete_definition.CompleteDefinition:
+def get_complete_definition(definition: parsed_definition.ParsedDefinition, keyboard: keyboards.Keyboard, image_url: typing.Optional[str] = None, image_author: typing.Optional[str] = None) -> complete_definition.CompleteDefinition:
     return complete_definition.CompleteDefinition(
+        index=definition.index,
         title=definition.title,
         html=definition.html,
         url=definition.url,
 
-        inline_keyboard_buttons=inline_keyboard_buttons
+        keyboard=keyboard,
+
+        image_url=image_url,
+        image_author=image_author
     )
 
 
-def get_inline_query_definition_result(definition: complete_definition.CompleteDefinition) -> telegram.InlineQueryResultArticle:
+def get_inline_query_definition_result(definition: complete_definition.CompleteDefinition, result_id: typing.Optional[str] = None) -> telegram.InlineQueryResultArticle:
     reply_markup = telegram.InlineKeyboardMarkup(definition.inline_keyboard_buttons)
 
     return telegram.InlineQueryResultArticle(
-        id=str(uuid.uuid4()),
+        # Stable identifiers let the Telegram clients reuse the results they already have.
+        id=result_id if result_id is not None else str(definition.index),
         title=definition.title,
         thumb_url=constants.DEX_THUMBNAIL_URL,
         url=definition.url,
@@ -249,9 +679,22 @@ def get_inline_query_definition_result(definition: complete_definition.CompleteD
     )
 
 
-def get_query_definitions(update: telegram.Update, context: telegram.ext.CallbackContext, query: typing.Optional[str], links_toggle: bool, analytics_handler: analytics.AnalyticsHandler, cli_args: argparse.Namespace, bot_name: str) -> typing.Tuple[typing.List[complete_definition.CompleteDefinition], int]:
+def get_query_definitions(update: telegram.Update, context: telegram.ext.CallbackContext, query: typing.Optional[str], links_toggle: bool, analytics_handler: analytics.AnalyticsHandler, cli_args: argparse.Namespace, bot_name: str, definition_index: typing.Optional[int] = None, should_cancel: typing.Optional[typing.Callable[[], bool]] = None, deadline: typing.Optional[float] = None) -> typing.Tuple[typing.List[complete_definition.CompleteDefinition], int]:
+    """
+    Only the definitions that are needed are rendered: the one at `definition_index` if it's specified, or a page of
+    inline query results (plus one more, so that the caller knows if there's a next page) otherwise.
+    Raises `CancelledQueryError` as soon as `should_cancel` returns `True`, abandoning the response stream.
+    The lookup ends by `deadline`, the `time.monotonic` time by which the update must be answered, if any.
+    """
+
     user = update.effective_user
 
+    raw_definitions: typing.Iterable[typing.Dict[str, typing.Any]]
+    url: str
+
+    normalized_query = normalize_query(query or '')
+    displayed_query = get_displayed_query(query or '')
+
     if cli_args.fragment:
         url = 'debug'
 
@@ -262,28 +705,15 @@ def get_query_definitions(update: telegram.Update, context: telegram.ext.Callbac
             'userNick': None
         }]
     else:
-        api_url = constants.DEX_DEFINITION_API_URL_FORMAT.format(query)
-        raw_response = get_raw_response(api_url)
+        if (query or '') != normalized_query:
+            stats.increment(constants.STATS_NORMALIZED_QUERIES)
 
-        raw_definitions = raw_response['definitions']
+        raw_definitions = iterate_raw_definitions(get_definition_api_url(normalized_query), deadline, should_cancel)
 
-        url = api_url[:- len(constants.DEX_API_JSON_PATH)]
-
-    definitions_count = len(raw_definitions)
-
-    # Set the global index of the definitions.
-    for index in range(definitions_count):
-        raw_definitions[index]['index'] = index
-
-    definitions: typing.List[complete_definition.CompleteDefinition] = []
+        url = get_definition_url(normalized_query)
 
     if cli_args.index is not None:
-        if cli_args.index >= definitions_count:
-            logger.warning('Index out of bounds')
-
-            return definitions, 0
-
-        raw_definitions = [raw_definitions[cli_args.index]]
+        definition_index = cli_args.index
 
     offset_string = None
     offset = 0
@@ -295,41 +725,259 @@ def get_query_definitions(update: telegram.Update, context: telegram.ext.Callbac
         offset_string = inline_query.offset
         is_inline_query = True
 
+    first_index = 0
+
     if offset_string:
         offset = int(offset_string)
-
-        if offset < definitions_count:
-            raw_definitions = raw_definitions[offset + 1:]
+        first_index = offset + 1
     elif is_inline_query and user is not None:
-        analytics_handler.track(context, analytics.AnalyticsType.INLINE_QUERY, user, query)
+        analytics_handler.track(analytics.AnalyticsType.INLINE_QUERY, user, query)
 
-    for raw_definition in raw_definitions:
-        parsed_definition_data = get_parsed_definition(
-            raw_definition=raw_definition,
-            url=url,
-            links_toggle=links_toggle,
+    if definition_index is not None:
+        first_index = definition_index
+        last_index = definition_index + 1
+    else:
+        last_index = first_index + telegram.constants.MAX_INLINE_QUERY_RESULTS + 1
+
+    if not cli_args.fragment and normalized_query in negative_results_cache:
+        stats.increment(constants.STATS_NEGATIVE_RESULTS_CACHE_HITS)
+
+        return [], 0
+
+    rendered_query = None
+
+    if not cli_args.fragment:
+        rendered_query = rendered_definitions_cache.get(normalized_query)
+
+    definitions_count = 0
+    rendered_definitions: typing.Dict[int, rendered_cache.RenderedDefinitions]
+
+    if rendered_query is not None and rendered_query.has_definitions(first_index, last_index):
+        stats.increment(constants.STATS_RENDERED_CACHE_HITS)
+
+        definitions_count = rendered_query.definitions_count
+        rendered_definitions = rendered_query.definitions
+    else:
+        needed_raw_definitions: typing.List[typing.Dict[str, typing.Any]] = []
+
+        # The rest of the definitions are still read, because the paging buttons need their count.
+        for index, raw_definition in enumerate(raw_definitions):
+            if should_cancel is not None and should_cancel():
+                raise CancelledQueryError()
+
+            if first_index <= index < last_index:
+                # Set the global index of the definition.
+                raw_definition['index'] = index
+
+                needed_raw_definitions.append(raw_definition)
+
+            definitions_count += 1
+
+        if definitions_count == 0:
+            if not cli_args.fragment:
+                negative_results_cache.add(normalized_query)
+
+            return [], 0
+
+        rendered_definitions = {}
+
+        for raw_definition in needed_raw_definitions:
+            if should_cancel is not None and should_cancel():
+                raise CancelledQueryError()
+
+            rendered_definitions[raw_definition['index']] = get_parsed_definitions(
+                raw_definition=raw_definition,
+                url=url,
+                cli_args=cli_args,
+                bot_name=bot_name
+            )
+
+        if not cli_args.fragment:
+            rendered_definitions_cache.add(normalized_query, definitions_count, rendered_definitions)
+
+    definitions: typing.List[complete_definition.CompleteDefinition] = []
+
+    if definition_index is not None and definition_index >= definitions_count:
+        logger.warning('Index out of bounds')
+
+        return definitions, 0
+
+    for index in range(first_index, min(last_index, definitions_count)):
+        (definition, links_definition) = rendered_definitions[index]
+
+        if cli_args.fragment:
+            complete_definition_data = get_query_definition(
+                definition=links_definition if links_toggle else definition,
+                query=query,
+                definitions_count=definitions_count,
+                links_toggle=links_toggle
+            )
+        else:
+            complete_definition_data = get_query_definition(
+                definition=get_displayed_definition(links_definition if links_toggle else definition, normalized_query, displayed_query),
+                query=displayed_query,
+                definitions_count=definitions_count,
+                links_toggle=links_toggle
+            )
+
+        definitions.append(complete_definition_data)
+
+    return definitions, offset
+
+
+def get_query_definition(definition: parsed_definition.ParsedDefinition, query: typing.Optional[str], definitions_count: int, links_toggle: bool) -> complete_definition.CompleteDefinition:
+    keyboard = keyboards.get_definition_keyboard(query, definitions_count, definition.index, links_toggle)
+
+    return get_complete_definition(
+        definition=definition,
+        keyboard=keyboard
+    )
+
+
+def get_cached_query_definition(query: str, cli_args: argparse.Namespace, bot_name: str) -> typing.Optional[complete_definition.CompleteDefinition]:
+    normalized_query = normalize_query(query)
+    rendered_query = rendered_definitions_cache.get(normalized_query)
+
+    if rendered_query is not None and 0 in rendered_query.definitions:
+        return get_query_definition(
+            definition=rendered_query.definitions[0][0],
+            query=normalized_query,
+            definitions_count=rendered_query.definitions_count,
+            links_toggle=False
+        )
+
+    raw_definitions = get_cached_raw_definitions(get_definition_api_url(normalized_query))
+
+    if not raw_definitions:
+        return None
+
+    raw_definition = raw_definitions[0]
+    raw_definition['index'] = 0
+
+    rendered_definitions = get_parsed_definitions(
+        raw_definition=raw_definition,
+        url=get_definition_url(normalized_query),
+        cli_args=cli_args,
+        bot_name=bot_name
+    )
+
+    rendered_definitions_cache.add(normalized_query, len(raw_definitions), {0: rendered_definitions})
+
+    return get_query_definition(
+        definition=rendered_definitions[0],
+        query=normalized_query,
+        definitions_count=len(raw_definitions),
+        links_toggle=False
+    )
+
+
+def get_suggestion_result_id(lemma: str) -> str:
+    """
+    Stable, like the identifiers of the definition results, and within the 64 bytes that Telegram accepts.
+    """
+
+    return hashlib.blake2b(lemma.encode(), digest_size=constants.SUGGESTION_RESULT_ID_DIGEST_SIZE).hexdigest()
+
+
+def get_inline_query_suggestion_result(lemma: str, bot_name: str) -> telegram.InlineQueryResultArticle:
+    search_button = telegram.InlineKeyboardButton(constants.SUGGESTION_SEARCH_TEXT, switch_inline_query_current_chat=lemma)
+    reply_markup = telegram.InlineKeyboardMarkup([[search_button]])
+
+    return telegram.InlineQueryResultArticle(
+        id=get_suggestion_result_id(lemma),
+        title=lemma,
+        description=constants.SUGGESTION_DESCRIPTION,
+        thumb_url=constants.DEX_THUMBNAIL_URL,
+        reply_markup=reply_markup,
+        input_message_content=telegram.InputTextMessageContent(
+            message_text=get_word_link(
+                word=lemma,
+                bot_name=bot_name
+            ),
+            parse_mode=telegram.ParseMode.HTML,
+            disable_web_page_preview=True
+        )
+    )
+
+
+def is_query_suggestible(query: str, lemma_index: lemmas.LemmaIndex) -> bool:
+    """
+    Whether the query looks like a partial word, so that it can be answered with suggestions before it's looked up,
+    without making any request: it isn't a lemma of the word list, and it wasn't looked up with definitions lately.
+    The inflected forms look like partial words too, and they are looked up exactly with the button of the suggestions.
+    """
+
+    normalized_query = normalize_query(query)
+
+    if normalized_query in lemma_index:
+        return False
+
+    if normalized_query in negative_results_cache:
+        return True
+
+    return rendered_definitions_cache.get(normalized_query) is None and not responses_cache.has_url(get_definition_api_url(normalized_query))
+
+
+def get_query_suggestions(query: str, lemma_index: lemmas.LemmaIndex, cli_args: argparse.Namespace, bot_name: str) -> typing.List[telegram.InlineQueryResultArticle]:
+    """
+    Returns the lemmas that the query is a strict prefix of, using their cached definitions, if any.
+    """
+
+    suggestions: typing.List[telegram.InlineQueryResultArticle] = []
+    normalized_query = normalize_query(query)
+
+    if len(normalized_query) < constants.SUGGESTIONS_MINIMUM_QUERY_LENGTH:
+        return suggestions
+
+    # The query itself is a lemma only if it's the first completion.
+    completions = [lemma for lemma in lemma_index.get_completions(normalized_query, constants.SUGGESTIONS_LIMIT + 1) if lemma != normalized_query]
+
+    for lemma in completions[:constants.SUGGESTIONS_LIMIT]:
+        definition = get_cached_query_definition(
+            query=lemma,
             cli_args=cli_args,
             bot_name=bot_name
         )
-        inline_keyboard_buttons = get_definition_inline_keyboard_buttons(query, definitions_count, parsed_definition_data.index, links_toggle)
-        complete_definition_data = get_complete_definition(
-            definition=parsed_definition_data,
-            inline_keyboard_buttons=inline_keyboard_buttons
-        )
 
-        definitions.append(complete_definition_data)
+        if definition is not None:
+            suggestions.append(get_inline_query_definition_result(definition, get_suggestion_result_id(lemma)))
+        else:
+            suggestions.append(get_inline_query_suggestion_result(
+                lemma=lemma,
+                bot_name=bot_name
+            ))
 
-    return definitions, offset
+    return suggestions
 
 
-def get_word_of_the_day_definition(date: typing.Optional[str], links_toggle: bool, cli_args: argparse.Namespace, bot_name: str, with_stop=False) -> complete_definition.CompleteDefinition:
-    if date is not None:
-        api_url = constants.DEX_SPECIFIC_WORD_OF_THE_DAY_URL_FORMAT.format(date)
-    else:
-        timestamp = int(time.time())
-        api_url = constants.DEX_TODAY_WORD_OF_THE_DAY_URL_FORMAT.format(timestamp)
+def get_current_word_of_the_day_date() -> str:
+    timezone = pytz.timezone(constants.WORD_OF_THE_DAY_TIMEZONE)
 
-    raw_response = get_raw_response(api_url)
+    return datetime.datetime.now(timezone).strftime(constants.WORD_OF_THE_DAY_DATE_FORMAT)
+
+
+def get_word_of_the_day(date: str) -> database.WordOfTheDay:
+    api_url = constants.DEX_SPECIFIC_WORD_OF_THE_DAY_URL_FORMAT.format(date)
+
+    return database.WordOfTheDay.get_or_create_for_date(
+        date=date,
+        get_record=lambda: json.dumps(get_raw_response(api_url), ensure_ascii=False)
+    )
+
+
+def get_word_of_the_day_definition(date: typing.Optional[str], links_toggle: bool, cli_args: argparse.Namespace, bot_name: str, with_stop=False, word_of_the_day: typing.Optional[database.WordOfTheDay] = None) -> complete_definition.CompleteDefinition:
+    """
+    Renders `word_of_the_day`, if it's already loaded, instead of loading the one of `date`.
+    """
+
+    if word_of_the_day is None:
+        if date is None:
+            date = get_current_word_of_the_day_date()
+
+        word_of_the_day = get_word_of_the_day(date)
+    else:
+        date = word_of_the_day.date
+    raw_response = json.loads(word_of_the_day.record)
 
     raw_day = raw_response['day']
     month = raw_response['month']
@@ -346,147 +994,181 @@ def get_word_of_the_day_definition(date: typing.Optional[str], links_toggle: boo
 
     day = f'{raw_day:0>2}'
 
-    url = regex.sub(
-        pattern=constants.DEX_API_SUFFIX_REGEX,
-        repl='',
-        string=api_url
-    )
-    prefix = f'<b>Cuvântul zilei {day}.{month}.{year}:</b>\n\n'
-    suffix = f'\n\n<b>Cheia alegerii:</b> {reason}'
+    stored_definition = word_of_the_day.links_definition if links_toggle else word_of_the_day.definition
 
-    parsed_definition_data = get_parsed_definition(
-        raw_definition=raw_definition,
-        url=url,
-        links_toggle=links_toggle,
-        cli_args=cli_args,
-        bot_name=bot_name,
-        prefix=prefix,
-        suffix=suffix
-    )
-    inline_keyboard_buttons = get_subscription_notification_inline_keyboard_buttons(
+    parsed_definition_data: parsed_definition.ParsedDefinition
+
+    if stored_definition is not None:
+        parsed_definition_data = parsed_definition.ParsedDefinition.deserialize(stored_definition)
+    else:
+        url = constants.DEX_SPECIFIC_WORD_OF_THE_DAY_URL_FORMAT.format(date)[:- len(constants.DEX_API_JSON_PATH)]
+        prefix = f'<b>Cuvântul zilei {day}.{month}.{year}:</b>\n\n'
+        suffix = f'\n\n<b>Cheia alegerii:</b> {reason}'
+
+        (definition_data, links_definition_data) = get_parsed_definitions(
+            raw_definition=raw_definition,
+            url=url,
+            cli_args=cli_args,
+            bot_name=bot_name,
+            prefix=prefix,
+            suffix=suffix
+        )
+
+        word_of_the_day.save_definitions(
+            definition=definition_data.serialize(),
+            links_definition=links_definition_data.serialize()
+        )
+
+        parsed_definition_data = links_definition_data if links_toggle else definition_data
+
+    keyboard = keyboards.WordOfTheDayKeyboard(
         date=f'{year}/{month}/{day}',
         links_toggle=links_toggle,
         with_stop=with_stop
     )
-    completed_definition_data = get_complete_definition(
+    return get_complete_definition(
         definition=parsed_definition_data,
-        inline_keyboard_buttons=inline_keyboard_buttons
+        keyboard=keyboard,
+        image_url=image_url,
+        image_author=image_author
     )
-    completed_definition_data.image_url = image_url
-    completed_definition_data.image_author = image_author
 
-    return completed_definition_data
+
+def discard_cached_queries(normalized_queries: typing.Iterable[str]) -> None:
+    """
+    Forgets the queries from the in-memory caches, which each worker keeps for itself, and from the shared rendered
+    definitions.
+    """
+
+    for normalized_query in normalized_queries:
+        negative_results_cache.discard(normalized_query)
+        rendered_definitions_cache.discard(normalized_query)
+        inline_answers_cache.discard(normalized_query)
 
 
 def clear_definitions_cache(query: str) -> str:
-    api_url = constants.DEX_DEFINITION_API_URL_FORMAT.format(query)
+    normalized_query = normalize_query(query)
+    api_url = get_definition_api_url(normalized_query)
+
+    is_negative_result_deleted = negative_results_cache.discard(normalized_query)
 
-    cache = requests_cache.core.get_cache()
+    rendered_definitions_cache.discard(normalized_query)
+    inline_answers_cache.discard(normalized_query)
 
-    if cache.has_url(api_url):
-        cache.delete_url(api_url)
+    if responses_cache.has_url(api_url):
+        responses_cache.delete_url(api_url)
 
         return f'Cache successfully deleted for "{query}"'
+    elif is_negative_result_deleted:
+        return f'Negative cache successfully deleted for "{query}"'
     else:
         return f'No cache for "{query}"'
 
 
-def get_superscript(text: str) -> typing.Optional[str]:
-    superscript = ''
+def get_query_from_definition_api_url(api_url: str) -> typing.Optional[str]:
+    path = urllib.parse.urlsplit(api_url).path
+    prefix = urllib.parse.urlsplit(constants.DEX_DEFINITION_URL_FORMAT.format('')).path
+
+    if not path.startswith(prefix):
+        return None
 
-    for letter in text:
-        treated_letter = letter.lower().replace('[', '(').replace(']', ')')
+    return urllib.parse.unquote(path[len(prefix):].split('/')[0])
 
-        if treated_letter not in constants.UNICODE_SUPERSCRIPTS:
-            return None
 
-        superscript += constants.UNICODE_SUPERSCRIPTS[treated_letter]
+def purge_definitions_cache(pattern: str) -> typing.Tuple[str, typing.List[str]]:
+    """
+    Deletes the cached definitions of the queries that match the glob pattern, or that start with it, if it isn't a
+    pattern. Returns the description of the result and the purged queries.
+    """
 
-    return superscript
+    normalized_pattern = normalize_query(pattern)
 
+    if not any(character in normalized_pattern for character in '*?['):
+        normalized_pattern += '*'
 
-def get_definition_inline_keyboard_buttons(query: typing.Optional[str], definitions_count: int, offset: int, links_toggle: bool) -> typing.List[typing.List[telegram.InlineKeyboardButton]]:
-    buttons: typing.List[typing.List[telegram.InlineKeyboardButton]] = []
+    api_url_pattern = constants.DEX_DEFINITION_API_URL_FORMAT.format(urllib.parse.quote(normalized_pattern, safe='*?[]'))
 
-    paging_buttons: typing.List[telegram.InlineKeyboardButton] = []
-    links_toggle_buttons: typing.List[telegram.InlineKeyboardButton] = []
+    purged_urls = responses_cache.purge(api_url_pattern)
+    purged_queries = sorted({query for query in map(get_query_from_definition_api_url, purged_urls) if query is not None})
 
-    if definitions_count > 1:
-        is_first_page = offset == 0
-        is_last_page = offset == definitions_count - 1
+    discard_cached_queries(purged_queries)
 
-        previous_offset = offset - 1
-        next_offset = offset + 1
+    return (f'Cache successfully deleted for {len(purged_urls)} responses matching "{normalized_pattern}"', purged_queries)
 
-        previous_text = constants.PREVIOUS_OVERLAP_PAGE_ICON if is_first_page else constants.PREVIOUS_PAGE_ICON
-        current_text = f'{offset + 1} / {definitions_count}'
-        next_text = constants.NEXT_OVERLAP_PAGE_ICON if is_last_page else constants.NEXT_PAGE_ICON
 
-        if is_first_page:
-            previous_offset = definitions_count - 1
+def get_responses_cache_description(stats_values: typing.Dict[str, typing.Any]) -> str:
+    hits = stats_values.get(constants.STATS_RESPONSE_CACHE_HITS, 0)
+    lookups = hits + stats_values.get(constants.STATS_RESPONSE_CACHE_MISSES, 0)
+    hit_rate = f'{hits / lookups:.1%}' if lookups else 'unknown'
 
-        previous_data = {
-            constants.BUTTON_DATA_QUERY_KEY: query,
-            constants.BUTTON_DATA_OFFSET_KEY: previous_offset,
-            constants.BUTTON_DATA_LINKS_TOGGLE_KEY: links_toggle
-        }
+    lines = [
+        f'{responses_cache.get_entries_count()} responses, {responses_cache.get_size() / 1024 / 1024:.1f} MB',
+        f'Hit rate: {hit_rate}'
+    ]
 
-        if offset == 0:
-            first_data = None
-        else:
-            first_data = {
-                constants.BUTTON_DATA_QUERY_KEY: query,
-                constants.BUTTON_DATA_OFFSET_KEY: 0,
-                constants.BUTTON_DATA_LINKS_TOGGLE_KEY: links_toggle
-            }
-
-        if is_last_page:
-            next_offset = 0
-
-        next_data = {
-            constants.BUTTON_DATA_QUERY_KEY: query,
-            constants.BUTTON_DATA_OFFSET_KEY: next_offset,
-            constants.BUTTON_DATA_LINKS_TOGGLE_KEY: links_toggle
-        }
-
-        previous_button = telegram.InlineKeyboardButton(previous_text, callback_data=json.dumps(previous_data))
-        current_button = telegram.InlineKeyboardButton(current_text, callback_data=json.dumps(first_data))
-        next_button = telegram.InlineKeyboardButton(next_text, callback_data=json.dumps(next_data))
-
-        paging_buttons.append(previous_button)
-        paging_buttons.append(current_button)
-        paging_buttons.append(next_button)
-
-    links_toggle_data = {
-        constants.BUTTON_DATA_QUERY_KEY: query,
-        constants.BUTTON_DATA_OFFSET_KEY: offset,
-        constants.BUTTON_DATA_LINKS_TOGGLE_KEY: not links_toggle
-    }
+    top_entries = responses_cache.get_top_entries(constants.RESPONSES_CACHE_DESCRIPTION_LIMIT)
 
-    links_toggle_text = constants.LINKS_TOGGLE_ON_TEXT if links_toggle else constants.LINKS_TOGGLE_OFF_TEXT
+    if top_entries:
+        lines.append('Most used:')
+        lines.extend(
+            f'{get_query_from_definition_api_url(entry.url) or entry.url}: {entry.hits} hits, {entry.size / 1024:.1f} KB'
+            for entry in top_entries
+        )
 
-    links_toggle_button = telegram.InlineKeyboardButton(links_toggle_text, callback_data=json.dumps(links_toggle_data))
+    return '\n'.join(lines)
 
-    links_toggle_buttons.append(links_toggle_button)
 
-    if len(paging_buttons) > 0:
-        buttons.append(paging_buttons)
+def get_negative_results_cache_description() -> str:
+    recent_queries = negative_results_cache.get_recent_queries(constants.NEGATIVE_RESULTS_CACHE_DESCRIPTION_LIMIT)
+    description = f'{len(negative_results_cache)} queries without results'
 
-    buttons.append(links_toggle_buttons)
+    if recent_queries:
+        description += ', most recent:\n'
+        description += '\n'.join(recent_queries)
 
-    return buttons
+    return description
 
 
-def send_subscription_onboarding_message_if_needed(bot: telegram.Bot, user: telegram.User, chat_id: int) -> None:
+def _get_superscripts_translation_table() -> typing.Dict[int, str]:
+    translation_table: typing.Dict[int, str] = {}
+    letters = set(constants.UNICODE_SUPERSCRIPTS) | set(constants.UNICODE_SUPERSCRIPTS_ALIASES)
+
+    for letter in list(letters):
+        letters.add(letter.upper())
+
+    for letter in letters:
+        # Superscripts are matched case-insensitively, using the lowercase variant when it exists.
+        treated_letter = constants.UNICODE_SUPERSCRIPTS_ALIASES.get(letter, letter.lower())
+
+        if treated_letter in constants.UNICODE_SUPERSCRIPTS:
+            translation_table[ord(letter)] = constants.UNICODE_SUPERSCRIPTS[treated_letter]
+
+    return translation_table
+
+
+_SUPERSCRIPTS_TRANSLATION_TABLE = _get_superscripts_translation_table()
+_SUPPORTED_SUPERSCRIPTS = frozenset(map(chr, _SUPERSCRIPTS_TRANSLATION_TABLE))
+
+
+@functools.lru_cache(maxsize=constants.SUPERSCRIPTS_CACHE_SIZE)
+def get_superscript(text: str) -> typing.Optional[str]:
+    if not _SUPPORTED_SUPERSCRIPTS.issuperset(text):
+        return None
+
+    return text.translate(_SUPERSCRIPTS_TRANSLATION_TABLE)
+
+
+def is_subscription_onboarding_needed(user: telegram.User) -> bool:
     db_user = database.User.get_or_none(database.User.telegram_id == user.id)
 
-    if db_user is None:
-        return
+    return db_user is not None and db_user.subscription == database.User.Subscription.undetermined.value
+
 
-    if db_user.subscription != database.User.Subscription.undetermined.value:
+def send_subscription_onboarding_message_if_needed(bot: telegram.Bot, user: telegram.User, chat_id: int) -> None:
+    if not is_subscription_onboarding_needed(user):
         return
 
-    reply_markup = telegram.InlineKeyboardMarkup(get_subscription_onboarding_inline_keyboard_buttons())
+    reply_markup = telegram.InlineKeyboardMarkup(keyboards.get_subscription_onboarding_inline_keyboard_buttons())
 
     bot.send_message(
         chat_id=chat_id,
@@ -510,70 +1192,6 @@ def send_subscription_accepted_message_if_needed(bot: telegram.Bot, user: telegr
     )
 
 
-def get_subscription_onboarding_inline_keyboard_buttons() -> typing.List[typing.List[telegram.InlineKeyboardButton]]:
-    no_data = {
-        constants.BUTTON_DATA_IS_SUBSCRIPTION_ONBOARDING_KEY: True,
-        constants.BUTTON_DATA_SUBSCRIPTION_STATE_KEY: database.User.Subscription.denied.value
-    }
-
-    no_button = telegram.InlineKeyboardButton(
-        text='Nu',
-        callback_data=json.dumps(no_data)
-    )
-
-    yes_data = {
-        constants.BUTTON_DATA_IS_SUBSCRIPTION_ONBOARDING_KEY: True,
-        constants.BUTTON_DATA_SUBSCRIPTION_STATE_KEY: database.User.Subscription.accepted.value
-    }
-
-    yes_button = telegram.InlineKeyboardButton(
-        text='Da',
-        callback_data=json.dumps(yes_data)
-    )
-
-    return [[no_button, yes_button]]
-
-
-def get_subscription_notification_inline_keyboard_buttons(date: typing.Optional[str], links_toggle=False, with_stop=True) -> typing.List[typing.List[telegram.InlineKeyboardButton]]:
-    links_toggle_data = {
-        constants.BUTTON_DATA_DATE_KEY: date,
-        constants.BUTTON_DATA_LINKS_TOGGLE_KEY: not links_toggle,
-        constants.BUTTON_DATA_SUBSCRIPTION_STATE_KEY: None
-    }
-
-    links_toggle_text = constants.LINKS_TOGGLE_ON_TEXT if links_toggle else constants.LINKS_TOGGLE_OFF_TEXT
-
-    links_toggle_button = telegram.InlineKeyboardButton(
-        text=links_toggle_text,
-        callback_data=json.dumps(links_toggle_data)
-    )
-
-    subscription_data: typing.Dict[str, typing.Any]
-    subscription_text: str
-
-    if with_stop:
-        subscription_data = {
-            constants.BUTTON_DATA_LINKS_TOGGLE_KEY: links_toggle,
-            constants.BUTTON_DATA_SUBSCRIPTION_STATE_KEY: database.User.Subscription.revoked.value
-        }
-
-        subscription_text = 'Oprește'
-    else:
-        subscription_data = {
-            constants.BUTTON_DATA_LINKS_TOGGLE_KEY: links_toggle,
-            constants.BUTTON_DATA_SUBSCRIPTION_STATE_KEY: database.User.Subscription.accepted.value
-        }
-
-        subscription_text = 'Repornește'
-
-    subscription_button = telegram.InlineKeyboardButton(
-        text=subscription_text,
-        callback_data=json.dumps(subscription_data)
-    )
-
-    return [[links_toggle_button, subscription_button]]
-
-
 def base64_encode(string: str) -> str:
     """
     Removes any `=` used as padding from the encoded string.
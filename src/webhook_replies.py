@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import concurrent.futures
+import datetime
+import json
+import queue
+import threading
+import typing
+
+import telegram
+import telegram.ext.utils.webhookhandler
+import tornado.web
+
+Reply = typing.Optional[typing.Dict[str, typing.Any]]
+
+
+class WebhookReplies:
+    """
+    Lets the handlers return their reply in the response to the webhook request of their update, which saves a Bot
+    API request, if it's ready before the deadline. After that, the webhook responds without a reply, and the
+    handlers call the Bot API as usual.
+    """
+
+    def __init__(self, deadline: datetime.timedelta, is_reply_expected: typing.Callable[[telegram.Update], bool]) -> None:
+        self._deadline = deadline.total_seconds()
+        self._is_reply_expected = is_reply_expected
+
+        self._pending_replies: typing.Dict[int, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+
+    def expect(self, update: telegram.Update) -> typing.Optional[concurrent.futures.Future]:
+        if not self._is_reply_expected(update):
+            return None
+
+        with self._lock:
+            # A redelivery of an update that is still being handled doesn't get the reply.
+            if update.update_id in self._pending_replies:
+                return None
+
+            future: concurrent.futures.Future = concurrent.futures.Future()
+
+            self._pending_replies[update.update_id] = future
+
+        return future
+
+    def _resolve(self, update_id: int, reply: Reply) -> bool:
+        with self._lock:
+            future = self._pending_replies.pop(update_id, None)
+
+            if future is None:
+                return False
+
+            future.set_result(reply)
+
+        return True
+
+    def offer(self, update_id: int, method: str, data: typing.Dict[str, typing.Any]) -> bool:
+        """
+        Returns `False` if the webhook isn't waiting for the reply anymore, in which case the method must be called.
+        """
+
+        return self._resolve(update_id, dict(data, method=method))
+
+    def finish(self, update_id: int) -> None:
+        """
+        Lets the webhook respond without waiting for the deadline, if the handler didn't offer a reply.
+        """
+
+        self._resolve(update_id, None)
+
+    async def wait(self, update_id: int, future: concurrent.futures.Future) -> Reply:
+        # Waiting doesn't cancel the future on timeout, so that a reply offered meanwhile isn't lost.
+        await asyncio.wait([asyncio.wrap_future(future)], timeout=self._deadline)
+
+        self.finish(update_id)
+
+        return future.result()
+
+
+class ReplyingWebhookHandler(telegram.ext.utils.webhookhandler.WebhookHandler):
+    def initialize(self, bot: telegram.Bot, update_queue: queue.Queue, webhook_replies: WebhookReplies) -> None:  # type: ignore[override]
+        super().initialize(bot, update_queue)
+
+        self.webhook_replies = webhook_replies
+
+    async def post(self) -> None:  # type: ignore[override]
+        self._validate_post()
+
+        data = json.loads(self.request.body.decode())
+
+        self.set_status(200)
+
+        update = telegram.Update.de_json(data, self.bot)
+
+        if update is None:
+            return
+
+        future = self.webhook_replies.expect(update)
+
+        self.update_queue.put(update)
+
+        if future is None:
+            return
+
+        reply = await self.webhook_replies.wait(update.update_id, future)
+
+        # Telegram only calls the method of a reply sent as JSON, or as form data.
+        if reply is not None:
+            self.set_header('Content-Type', 'application/json')
+            self.write(json.dumps(reply))
+
+
+class ReplyingWebhookAppClass(tornado.web.Application):
+    def __init__(self, webhook_path: str, bot: telegram.Bot, update_queue: queue.Queue, webhook_replies: WebhookReplies) -> None:
+        handlers = [(rf'{webhook_path}/?', ReplyingWebhookHandler, {
+            'bot': bot,
+            'update_queue': update_queue,
+            'webhook_replies': webhook_replies
+        })]
+
+        super().__init__(handlers)
+
+    def log_request(self, handler: tornado.web.RequestHandler) -> None:
+        pass
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+"""
+Run the tests from the root of the repository:
+
+    python -m unittest
+"""
+
+import atexit
+import logging
+import os
+import pathlib
+import shutil
+import sys
+import tempfile
+
+SOURCES_PATH = pathlib.Path(__file__).resolve().parent.parent / 'src'
+
+# The modules import each other as top-level modules, like when the bot is run from its directory.
+sys.path.insert(0, str(SOURCES_PATH))
+
+# Some modules open their databases in the working directory when they are imported, so the tests run in a temporary
+# one, with the migrations that they apply.
+working_directory = tempfile.mkdtemp(prefix='dexrobot-tests-')
+
+os.symlink(SOURCES_PATH / 'migrations', os.path.join(working_directory, 'migrations'))
+os.chdir(working_directory)
+
+atexit.register(shutil.rmtree, working_directory, True)
+
+# The expected failures are logged too.
+logging.disable(logging.CRITICAL)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import os
+import tempfile
+import unittest
+
+import utils
+
+CLI_ARGS = argparse.Namespace(fragment=None, index=None, debug=False)
+
+RAW_DEFINITION = {
+    'id': 42,
+    'index': 0,
+    'htmlRep': '<b>ȘARPE</b>, s. m. Reptil fără picioare.',
+    'sourceName': 'DEX \'09',
+    'userNick': 'editor'
+}
+
+
+class CachesSnapshotTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.path = os.path.join(tempfile.mkdtemp(dir='.'), 'caches.json.gz')
+
+        for cache in (utils.rendered_definitions_cache, utils.negative_results_cache):
+            self.addCleanup(cache.clear)
+
+    def test_caches_are_warm_after_a_restart(self) -> None:
+        rendered_definitions = utils.get_parsed_definitions(RAW_DEFINITION, utils.get_definition_url('șarpe'), CLI_ARGS, 'bot')
+
+        utils.rendered_definitions_cache.add('șarpe', 1, {0: rendered_definitions})
+        utils.negative_results_cache.add('șarpee')
+
+        utils.save_caches_snapshot(self.path)
+
+        utils.rendered_definitions_cache.clear()
+        utils.negative_results_cache.clear()
+
+        utils.load_caches_snapshot(self.path)
+
+        self.assertEqual(utils.rendered_definitions_cache.get('șarpe').definitions, {0: rendered_definitions})
+        self.assertIn('șarpee', utils.negative_results_cache)
+
+    def test_missing_or_invalid_snapshot_is_ignored(self) -> None:
+        utils.load_caches_snapshot(self.path)
+
+        with open(self.path, 'wb') as file:
+            file.write(b'not gzip')
+
+        utils.load_caches_snapshot(self.path)
+
+        self.assertIsNone(utils.rendered_definitions_cache.get('șarpe'))
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import json
+import typing
+import unittest
+
+import callback_data
+import constants
+
+LONG_QUERY = 'pneumonoultramicroscopicsilicovolcanoconioză' * 2
+
+
+class CallbackDataCodecTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.codec = callback_data.CallbackDataCodec(max_tokens=10)
+
+    def test_definition_round_trip(self) -> None:
+        for query in (None, 'casă', 'a:b'):
+            for offset in (0, 1, 35, 36, 1000):
+                for links_toggle in (False, True):
+                    data = self.codec.encode_definition(query, offset, links_toggle)
+
+                    self.assertLessEqual(len(data.encode()), constants.CALLBACK_DATA_LENGTH_LIMIT)
+                    self.assertEqual(self.codec.decode(data), {
+                        constants.BUTTON_DATA_QUERY_KEY: query,
+                        constants.BUTTON_DATA_OFFSET_KEY: offset,
+                        constants.BUTTON_DATA_LINKS_TOGGLE_KEY: links_toggle
+                    })
+
+    def test_word_of_the_day_round_trip(self) -> None:
+        for date in (None, '2026/10/19'):
+            self.assertEqual(self.codec.decode(self.codec.encode_word_of_the_day(date, True)), {
+                constants.BUTTON_DATA_DATE_KEY: date,
+                constants.BUTTON_DATA_LINKS_TOGGLE_KEY: True,
+                constants.BUTTON_DATA_SUBSCRIPTION_STATE_KEY: None
+            })
+
+    def test_subscription_round_trip(self) -> None:
+        self.assertEqual(self.codec.decode(self.codec.encode_subscription(2, False)), {
+            constants.BUTTON_DATA_LINKS_TOGGLE_KEY: False,
+            constants.BUTTON_DATA_SUBSCRIPTION_STATE_KEY: 2
+        })
+        self.assertEqual(self.codec.decode(self.codec.encode_subscription_onboarding(1)), {
+            constants.BUTTON_DATA_IS_SUBSCRIPTION_ONBOARDING_KEY: True,
+            constants.BUTTON_DATA_SUBSCRIPTION_STATE_KEY: 1
+        })
+
+    def test_empty(self) -> None:
+        self.assertIsNone(self.codec.decode(''))
+        self.assertIsNone(self.codec.decode(self.codec.encode_empty()))
+
+    def test_legacy_json(self) -> None:
+        payload = {constants.BUTTON_DATA_QUERY_KEY: 'casă', constants.BUTTON_DATA_OFFSET_KEY: 1}
+
+        self.assertEqual(self.codec.decode(json.dumps(payload)), payload)
+
+    def test_malformed_payloads(self) -> None:
+        for data in ('p', 'p1', 'p1:casă', 'p2', 'px0', 'p1-1', 'p1_0', 'p1 1', 'w', 's', 's1', 's0+1', 'o', 'o-1', 'x', '{', '[1]', '1'):
+            with self.subTest(data=data):
+                self.assertIsNone(self.codec.decode(data))
+
+    def test_long_payload_uses_token(self) -> None:
+        data = self.codec.encode_definition(LONG_QUERY, 3, True)
+
+        self.assertTrue(self.codec.is_token(data))
+        self.assertLessEqual(len(data.encode()), constants.CALLBACK_DATA_LENGTH_LIMIT)
+        self.assertEqual(self.codec.encode_definition(LONG_QUERY, 3, True), data)
+        self.assertEqual(self.codec.decode(data)[constants.BUTTON_DATA_QUERY_KEY], LONG_QUERY)
+
+    def test_unknown_token(self) -> None:
+        data = self.codec.encode_definition(LONG_QUERY, 0, False)
+
+        self.assertIsNone(callback_data.CallbackDataCodec(max_tokens=10).decode(data))
+
+    def test_least_recently_used_tokens_are_forgotten(self) -> None:
+        codec = callback_data.CallbackDataCodec(max_tokens=2)
+
+        first = codec.encode_definition(LONG_QUERY, 0, False)
+        second = codec.encode_definition(LONG_QUERY, 1, False)
+
+        codec.decode(first)
+        codec.encode_definition(LONG_QUERY, 2, False)
+
+        self.assertEqual(len(codec), 2)
+        self.assertIsNotNone(codec.decode(first))
+        self.assertIsNone(codec.decode(second))
+
+    def test_tokens_are_shared_through_the_store(self) -> None:
+        store: typing.Dict[str, callback_data.Payload] = {}
+        saved_tokens: typing.List[str] = []
+
+        def save_payload(token: str, payload: callback_data.Payload) -> None:
+            saved_tokens.append(token)
+            store[token] = payload
+
+        encoder = callback_data.CallbackDataCodec(max_tokens=10, save_payload=save_payload, load_payload=store.get, save_interval=datetime.timedelta(hours=1))
+        decoder = callback_data.CallbackDataCodec(max_tokens=10, save_payload=save_payload, load_payload=store.get, save_interval=datetime.timedelta(hours=1))
+
+        data = encoder.encode_definition(LONG_QUERY, 0, True)
+
+        encoder.encode_definition(LONG_QUERY, 0, True)
+
+        # Saved once per interval.
+        self.assertEqual(len(saved_tokens), 1)
+        self.assertEqual(decoder.decode(data)[constants.BUTTON_DATA_LINKS_TOGGLE_KEY], True)
+
+        # A loaded token wasn't saved by this process.
+        decoder.encode_definition(LONG_QUERY, 0, True)
+
+        self.assertEqual(len(saved_tokens), 2)
+
+    def test_tokens_are_saved_again_after_the_interval(self) -> None:
+        saved_tokens: typing.List[str] = []
+
+        codec = callback_data.CallbackDataCodec(max_tokens=10, save_payload=(lambda token, _payload: saved_tokens.append(token)))
+
+        codec.encode_definition(LONG_QUERY, 0, True)
+        codec.encode_definition(LONG_QUERY, 0, True)
+
+        self.assertEqual(len(saved_tokens), 2)
+
+    def test_snapshot(self) -> None:
+        data = self.codec.encode_definition(LONG_QUERY, 0, True)
+        codec = callback_data.CallbackDataCodec(max_tokens=10)
+
+        codec.load_snapshot(self.codec.get_snapshot())
+
+        self.assertEqual(codec.decode(data), self.codec.decode(data))
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import json
+import typing
+import unittest
+import unittest.mock
+
+import utils
+
+API_URL = utils.get_definition_api_url('calculator')
+
+
+class StreamedResponse:
+    """
+    A streamed dexonline response, which counts the chunks that were read.
+    """
+
+    def __init__(self, chunks: typing.List[bytes]) -> None:
+        self.url = API_URL
+        self.from_cache = False
+
+        self.read_chunks = 0
+        self.is_closed = False
+
+        self._chunks = chunks
+
+    def iter_content(self, chunk_size: int) -> typing.Iterator[bytes]:
+        for chunk in self._chunks:
+            self.read_chunks += 1
+
+            yield chunk
+
+    def close(self) -> None:
+        self.is_closed = True
+
+    def __enter__(self) -> 'StreamedResponse':
+        return self
+
+    def __exit__(self, *_args: typing.Any) -> None:
+        self.close()
+
+
+def get_chunks(definitions_count: int) -> typing.List[bytes]:
+    body = json.dumps({'definitions': [{'id': index} for index in range(definitions_count)]}).encode()
+
+    return [body[index:index + 10] for index in range(0, len(body), 10)]
+
+
+class CancellationTests(unittest.TestCase):
+    def test_superseded_query_makes_no_request(self) -> None:
+        with unittest.mock.patch.object(utils.dex_session, 'get') as get:
+            with self.assertRaises(utils.CancelledQueryError):
+                next(utils.iterate_raw_definitions(API_URL, should_cancel=lambda: True))
+
+        get.assert_not_called()
+
+    def test_superseded_query_stops_reading_the_response(self) -> None:
+        response = StreamedResponse(get_chunks(10))
+        raw_definitions = []
+
+        with unittest.mock.patch.object(utils.dex_session, 'get', return_value=response):
+            with self.assertRaises(utils.CancelledQueryError):
+                for raw_definition in utils.iterate_raw_definitions(API_URL, should_cancel=lambda: response.read_chunks >= 3):
+                    raw_definitions.append(raw_definition)
+
+        self.assertEqual(response.read_chunks, 3)
+        self.assertTrue(response.is_closed)
+        self.assertLess(len(raw_definitions), 10)
+
+    def test_current_query_reads_the_whole_response(self) -> None:
+        response = StreamedResponse(get_chunks(10))
+
+        with unittest.mock.patch.object(utils.dex_session, 'get', return_value=response):
+            raw_definitions = list(utils.iterate_raw_definitions(API_URL, should_cancel=lambda: False))
+
+        self.assertEqual([raw_definition['id'] for raw_definition in raw_definitions], list(range(10)))
+        self.assertTrue(response.is_closed)
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import unittest
+
+import circuit_breaker
+
+SLOW_RESPONSE = datetime.timedelta(seconds=3)
+
+
+def get_open_circuit_breaker() -> circuit_breaker.CircuitBreaker:
+    # It lets a probe through right away once it's open.
+    breaker = circuit_breaker.CircuitBreaker('test', 2, SLOW_RESPONSE, datetime.timedelta(0))
+
+    breaker.record_failure()
+    breaker.record_failure()
+
+    return breaker
+
+
+class CircuitBreakerTests(unittest.TestCase):
+    def test_opens_after_consecutive_failures(self) -> None:
+        breaker = circuit_breaker.CircuitBreaker('test', 2, SLOW_RESPONSE, datetime.timedelta(minutes=1))
+
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, circuit_breaker.CircuitState.CLOSED)
+        self.assertTrue(breaker.allow())
+
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, circuit_breaker.CircuitState.OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_success_resets_failures(self) -> None:
+        breaker = circuit_breaker.CircuitBreaker('test', 2, SLOW_RESPONSE, datetime.timedelta(minutes=1))
+
+        breaker.record_failure()
+        breaker.record_success(0)
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, circuit_breaker.CircuitState.CLOSED)
+
+    def test_slow_response_is_failure(self) -> None:
+        breaker = circuit_breaker.CircuitBreaker('test', 1, SLOW_RESPONSE, datetime.timedelta(minutes=1))
+
+        breaker.record_success(SLOW_RESPONSE.total_seconds() + 1)
+
+        self.assertEqual(breaker.state, circuit_breaker.CircuitState.OPEN)
+
+    def test_half_open_lets_single_probe_through(self) -> None:
+        breaker = get_open_circuit_breaker()
+
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, circuit_breaker.CircuitState.HALF_OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_probe_success_closes(self) -> None:
+        breaker = get_open_circuit_breaker()
+
+        breaker.allow()
+        breaker.record_success(0)
+
+        self.assertEqual(breaker.state, circuit_breaker.CircuitState.CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_probe_failure_opens(self) -> None:
+        breaker = get_open_circuit_breaker()
+
+        breaker.allow()
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, circuit_breaker.CircuitState.OPEN)
+
+    def test_probe_long_timeout_opens(self) -> None:
+        breaker = get_open_circuit_breaker()
+
+        breaker.allow()
+
+        self.assertTrue(breaker.record_timeout(SLOW_RESPONSE.total_seconds()))
+        self.assertEqual(breaker.state, circuit_breaker.CircuitState.OPEN)
+
+    def test_probe_short_timeout_lets_next_probe_through(self) -> None:
+        breaker = get_open_circuit_breaker()
+
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.record_timeout(SLOW_RESPONSE.total_seconds() / 2))
+        self.assertEqual(breaker.state, circuit_breaker.CircuitState.HALF_OPEN)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+
+    def test_short_timeout_isnt_failure(self) -> None:
+        breaker = circuit_breaker.CircuitBreaker('test', 1, SLOW_RESPONSE, datetime.timedelta(minutes=1))
+
+        breaker.record_timeout(SLOW_RESPONSE.total_seconds() / 2)
+
+        self.assertEqual(breaker.state, circuit_breaker.CircuitState.CLOSED)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+import json
+import unittest
+
+import complete_definition
+import keyboards
+import parsed_definition
+
+URL = 'https://dexonline.ro/definitie/șarpe/42'
+FOOTER = f'\n\n{URL}\nsursa: DEX \'09'
+
+
+def get_definition(text: str) -> parsed_definition.ParsedDefinition:
+    # Built from new strings each time, like the definitions rendered again.
+    return parsed_definition.ParsedDefinition(index=0, title='șarpe', text=text, footer=''.join(list(FOOTER)), url=''.join(list(URL)))
+
+
+class ParsedDefinitionTests(unittest.TestCase):
+    def test_variants_share_footer_and_url(self) -> None:
+        definition = get_definition('șarpe')
+        links_definition = get_definition('<a>șarpe</a>')
+
+        self.assertIs(definition.footer, links_definition.footer)
+        self.assertIs(definition.url, links_definition.url)
+        self.assertEqual(definition.html, f'șarpe{FOOTER}')
+
+    def test_serialized_definition_is_loaded_again(self) -> None:
+        definition = get_definition('șarpe')
+        loaded_definition = parsed_definition.ParsedDefinition.deserialize(definition.serialize())
+
+        self.assertEqual(loaded_definition, definition)
+        self.assertIs(loaded_definition.footer, definition.footer)
+
+    def test_legacy_definitions_keep_their_html(self) -> None:
+        html = f'șarpe{FOOTER}'
+
+        for fields in ({'index': 0, 'title': 'șarpe', 'html': html, 'url': URL}, [0, 'șarpe', html, URL]):
+            definition = parsed_definition.ParsedDefinition.deserialize(json.dumps(fields))
+
+            self.assertEqual(definition.html, html)
+            self.assertEqual(definition.url, URL)
+
+
+class CompleteDefinitionTests(unittest.TestCase):
+    def assert_loaded_again(self, definition: complete_definition.CompleteDefinition) -> None:
+        loaded_definition = complete_definition.CompleteDefinition.deserialize(definition.serialize())
+
+        self.assertEqual(loaded_definition.html, definition.html)
+        self.assertEqual(loaded_definition.url, definition.url)
+        self.assertEqual(loaded_definition.image_url, definition.image_url)
+        self.assertEqual(keyboards.serialize_keyboard(loaded_definition.keyboard), keyboards.serialize_keyboard(definition.keyboard))
+        self.assertEqual(type(loaded_definition.keyboard), type(definition.keyboard))
+
+    def test_definition_is_loaded_again(self) -> None:
+        self.assert_loaded_again(complete_definition.CompleteDefinition(
+            index=3,
+            title='șarpe',
+            html=f'șarpe{FOOTER}',
+            url=URL,
+            keyboard=keyboards.get_definition_keyboard('șarpe', 10, 3, True),
+            image_url=None,
+            image_author=None
+        ))
+
+    def test_word_of_the_day_is_loaded_again(self) -> None:
+        self.assert_loaded_again(complete_definition.CompleteDefinition(
+            index=0,
+            title='șarpe',
+            html=f'șarpe{FOOTER}',
+            url=URL,
+            keyboard=keyboards.WordOfTheDayKeyboard(date='2021-06-01', links_toggle=False, with_stop=True),
+            image_url='https://dexonline.ro/img/wotd/șarpe.jpg',
+            image_author='autor'
+        ))
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+import typing
+import unittest
+import unittest.mock
+
+import constants
+import database
+
+DATE = '2021/06/02'
+TELEGRAM_IDS = [constants.WORD_OF_THE_DAY_DELIVERY_SLOTS * 1000 + slot for slot in (1, 2)]
+
+
+class DeliverySlotTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.addCleanup(lambda: database.User.delete().where(database.User.telegram_id.in_(TELEGRAM_IDS)).execute())
+        self.addCleanup(lambda: database.WordOfTheDay.delete().where(database.WordOfTheDay.date == DATE).execute())
+
+        for telegram_id in TELEGRAM_IDS:
+            database.User.create_or_update_user(telegram_id, None, unittest.mock.Mock(), 0)
+
+    def get_subscribed_telegram_ids(self, slot: int) -> typing.List[int]:
+        return [user.telegram_id for user in database.User.get_subscribed_users_in_slot(slot) if user.telegram_id in TELEGRAM_IDS]
+
+    def test_subscribed_users_are_delivered_in_their_slot(self) -> None:
+        database.User.update(subscription=database.User.Subscription.accepted.value).where(database.User.telegram_id == TELEGRAM_IDS[0]).execute()
+
+        self.assertEqual(self.get_subscribed_telegram_ids(1), [TELEGRAM_IDS[0]])
+        self.assertEqual(self.get_subscribed_telegram_ids(2), [])
+
+    def test_stored_slots_are_taken_modulo_the_slots(self) -> None:
+        database.User.update(
+            subscription=database.User.Subscription.accepted.value,
+            delivery_slot=constants.WORD_OF_THE_DAY_DELIVERY_SLOTS * 2 + 2
+        ).where(database.User.telegram_id == TELEGRAM_IDS[1]).execute()
+
+        self.assertEqual(self.get_subscribed_telegram_ids(2), [TELEGRAM_IDS[1]])
+
+    def test_delivery_progress_is_stored(self) -> None:
+        database.WordOfTheDay.get_or_create_for_date(DATE, lambda: '{}')
+        database.WordOfTheDay.save_delivery(DATE, 3, 42)
+
+        word_of_the_day = database.WordOfTheDay.get_or_create_for_date(DATE, lambda: '{}')
+
+        self.assertEqual((word_of_the_day.delivered_slots, word_of_the_day.delivered_messages), (3, 42))
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import io
+import os
+import tempfile
+import time
+import typing
+import unittest
+import unittest.mock
+
+import requests
+import requests.adapters
+import requests_cache
+
+import circuit_breaker
+import response_cache
+import utils
+
+API_URL = utils.get_definition_api_url('șarpe')
+
+
+def get_adapter(failure_threshold: int = 2) -> circuit_breaker.CircuitBreakerAdapter:
+    breaker = circuit_breaker.CircuitBreaker('test', failure_threshold, datetime.timedelta(seconds=3), datetime.timedelta(minutes=1))
+
+    return circuit_breaker.CircuitBreakerAdapter(breaker, datetime.timedelta(seconds=3), datetime.timedelta(seconds=1))
+
+
+def get_response(status_code: int) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.raw = io.BytesIO(b'{}')
+
+    return response
+
+
+class CircuitBreakerAdapterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.request = requests.Request('GET', API_URL).prepare()
+
+    def test_server_errors_are_raised_as_failures(self) -> None:
+        adapter = get_adapter()
+
+        with unittest.mock.patch.object(requests.adapters.HTTPAdapter, 'send', return_value=get_response(503)):
+            for _ in range(2):
+                with self.assertRaises(requests.HTTPError):
+                    adapter.send(self.request)
+
+        self.assertEqual(adapter.circuit_breaker.state, circuit_breaker.CircuitState.OPEN)
+
+    def test_open_circuit_sends_no_request(self) -> None:
+        adapter = get_adapter(failure_threshold=1)
+        adapter.circuit_breaker.record_failure()
+
+        with unittest.mock.patch.object(requests.adapters.HTTPAdapter, 'send') as send:
+            with self.assertRaises(circuit_breaker.CircuitOpenError):
+                adapter.send(self.request)
+
+        send.assert_not_called()
+
+    def test_requests_without_timeout_get_the_default_one(self) -> None:
+        adapter = get_adapter()
+
+        with unittest.mock.patch.object(requests.adapters.HTTPAdapter, 'send', return_value=get_response(200)) as send:
+            adapter.send(self.request)
+
+        self.assertEqual(send.call_args.kwargs['timeout'], (1, 3))
+
+
+class LookupDeadlineTests(unittest.TestCase):
+    def test_remaining_timeout_is_capped_by_the_deadline(self) -> None:
+        (connect_timeout, read_timeout) = utils.get_remaining_timeout(API_URL, time.monotonic() + 0.5)
+
+        self.assertLessEqual(connect_timeout, 0.5)
+        self.assertLessEqual(read_timeout, 0.5)
+
+    def test_passed_deadline_makes_dexonline_unavailable(self) -> None:
+        with unittest.mock.patch.object(utils.dex_session, 'get') as get:
+            with self.assertRaises(utils.DexUnavailableError):
+                utils.get_dex_response(API_URL, deadline=time.monotonic() - 1)
+
+        get.assert_not_called()
+
+
+class FlakyAdapter(requests.adapters.BaseAdapter):
+    """
+    Answers the first request, and fails the others.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.requests_count = 0
+
+    def send(self, request: requests.PreparedRequest, **_kwargs: typing.Any) -> requests.Response:  # type: ignore[override]
+        self.requests_count += 1
+
+        if self.requests_count > 1:
+            raise requests.ConnectionError('Refused')
+
+        response = get_response(200)
+        response.url = request.url
+        response.request = request
+
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+class StaleFallbackTests(unittest.TestCase):
+    def test_expired_response_is_served_when_dexonline_fails(self) -> None:
+        session = requests_cache.CachedSession(
+            backend=response_cache.BoundedResponseCache(os.path.join(tempfile.mkdtemp(dir='.'), 'cache')),
+            expire_after=datetime.timedelta(seconds=-1),
+            old_data_on_error=True
+        )
+        adapter = FlakyAdapter()
+
+        session.mount(API_URL, adapter)
+
+        self.assertEqual(session.get(API_URL).json(), {})
+        self.assertEqual(session.get(API_URL).json(), {})
+        self.assertEqual(adapter.requests_count, 2)
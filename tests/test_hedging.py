@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+import io
+import threading
+import time
+import typing
+import unittest
+
+import requests
+import requests.adapters
+
+import hedging
+
+
+def get_response(text: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(text.encode())
+
+    return response
+
+
+class DelayedAdapter(requests.adapters.BaseAdapter):
+    """
+    Answers each request after the delay at its position, or fails it if its delay is `None`.
+    """
+
+    def __init__(self, delays: typing.List[typing.Optional[float]]) -> None:
+        super().__init__()
+
+        self._delays = iter(delays)
+        self._lock = threading.Lock()
+
+    def send(self, request: requests.PreparedRequest, **_kwargs: typing.Any) -> requests.Response:  # type: ignore[override]
+        with self._lock:
+            delay = next(self._delays)
+
+        if delay is None:
+            raise requests.ConnectionError('Refused')
+
+        time.sleep(delay)
+
+        return get_response(f'{delay}')
+
+    def close(self) -> None:
+        pass
+
+
+def get_request() -> requests.PreparedRequest:
+    return requests.Request('GET', 'https://dexonline.ro/definitie/șarpe/json').prepare()
+
+
+class HedgeBudgetTests(unittest.TestCase):
+    def test_hedges_are_earned_by_the_requests(self) -> None:
+        budget = hedging.HedgeBudget(ratio=0.25, burst=1)
+
+        self.assertFalse(budget.spend())
+
+        for _ in range(8):
+            budget.earn()
+
+        # The burst caps the saved hedges.
+        self.assertTrue(budget.spend())
+        self.assertFalse(budget.spend())
+
+
+class HedgerTests(unittest.TestCase):
+    def test_concurrent_requests_are_all_counted(self) -> None:
+        hedger = hedging.Hedger(budget_ratio=0.1)
+
+        def start_requests() -> None:
+            for _ in range(1000):
+                hedger.start_request()
+
+        threads = [threading.Thread(target=start_requests) for _ in range(8)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(hedger._requests_count, 8000)
+
+
+class HedgingAdapterTests(unittest.TestCase):
+    def test_failed_primary_requests_are_latencies_too(self) -> None:
+        hedger = hedging.Hedger(budget_ratio=0.1)
+        adapter = hedging.HedgingAdapter(DelayedAdapter([None]), hedger, workers=2)
+
+        self.addCleanup(adapter.close)
+
+        with self.assertRaises(requests.ConnectionError):
+            adapter.send(get_request())
+
+        self.assertEqual(len(hedger.primary_latencies), 1)
+
+    def test_slow_primary_request_is_hedged(self) -> None:
+        hedger = hedging.Hedger(budget_ratio=1)
+        hedger.hedge_delay = 0.01
+
+        adapter = hedging.HedgingAdapter(DelayedAdapter([0.5, 0]), hedger, workers=2)
+
+        self.addCleanup(adapter.close)
+
+        self.assertEqual(adapter.send(get_request()).text, '0')
+        self.assertEqual(len(hedger.latencies), 1)
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import unittest
+
+import inline_answers
+
+
+def get_answer(results: str) -> inline_answers.InlineAnswer:
+    return inline_answers.InlineAnswer(results=results, next_offset=None)
+
+
+class InlineAnswersCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache = inline_answers.InlineAnswersCache(max_size=2, expire_after=datetime.timedelta(hours=1))
+
+    def test_answers_are_kept_by_spelling_and_page(self) -> None:
+        self.cache.add('șarpe', 'Șarpe', '', get_answer('first'))
+        self.cache.add('șarpe', 'Șarpe', '50', get_answer('second'))
+        self.cache.add('șarpe', 'şarpe', '', get_answer('cedilla'))
+
+        self.assertEqual(self.cache.get('șarpe', 'Șarpe', '').results, 'first')
+        self.assertEqual(self.cache.get('șarpe', 'Șarpe', '50').results, 'second')
+        self.assertEqual(self.cache.get('șarpe', 'şarpe', '').results, 'cedilla')
+        self.assertIsNone(self.cache.get('șarpe', 'ȘARPE', ''))
+        self.assertEqual(len(self.cache), 1)
+
+    def test_discard_forgets_every_spelling(self) -> None:
+        self.cache.add('șarpe', 'Șarpe', '', get_answer('first'))
+        self.cache.add('șarpe', 'şarpe', '', get_answer('cedilla'))
+
+        self.assertTrue(self.cache.discard('șarpe'))
+        self.assertIsNone(self.cache.get('șarpe', 'Șarpe', ''))
+        self.assertIsNone(self.cache.get('șarpe', 'şarpe', ''))
+        self.assertFalse(self.cache.discard('șarpe'))
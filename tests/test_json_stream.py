@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+import json
+import typing
+import unittest
+
+import json_stream
+
+DOCUMENT = {
+    'word': 'șarpe',
+    'count': 12345,
+    'definitions': [
+        {'id': 1, 'htmlRep': 'A "quoted" ] bracket, and a } brace', 'score': -1.5e3},
+        {'id': 2, 'htmlRep': 'ȘARPE', 'tags': [True, False, None]},
+        []
+    ],
+    'last': {'definitions': []}
+}
+
+
+def get_chunks(text: str, size: int) -> typing.List[str]:
+    return [text[index:index + size] for index in range(0, len(text), size)]
+
+
+class IterateArrayItemsTests(unittest.TestCase):
+    def test_items_are_parsed_from_any_chunks(self) -> None:
+        text = json.dumps(DOCUMENT, ensure_ascii=False, indent=1)
+
+        for size in (1, 2, 3, 7, len(text)):
+            with self.subTest(size=size):
+                self.assertEqual(list(json_stream.iterate_array_items(get_chunks(text, size), 'definitions')), DOCUMENT['definitions'])
+
+    def test_numbers_split_between_chunks_are_whole(self) -> None:
+        self.assertEqual(list(json_stream.iterate_array_items(['{"a": [12', '34, 5', '6]}'], 'a')), [1234, 56])
+
+    def test_items_are_yielded_before_the_rest_is_received(self) -> None:
+        def get_chunks_until_first_item() -> typing.Iterator[str]:
+            yield '{"a": [1, '
+
+            self.fail('The rest of the document was read')
+
+        self.assertEqual(next(json_stream.iterate_array_items(get_chunks_until_first_item(), 'a')), 1)
+
+    def test_empty_array_has_no_items(self) -> None:
+        self.assertEqual(list(json_stream.iterate_array_items(['{"a": [ ]}'], 'a')), [])
+
+    def test_missing_key_raises(self) -> None:
+        for text in ('{}', '{"b": [1]}'):
+            with self.subTest(text=text), self.assertRaises(KeyError):
+                list(json_stream.iterate_array_items([text], 'a'))
+
+    def test_truncated_document_raises(self) -> None:
+        with self.assertRaises(json.JSONDecodeError):
+            list(json_stream.iterate_array_items(['{"a": [1, {"b": '], 'a'))
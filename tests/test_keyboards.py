@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+import typing
+import unittest
+
+import constants
+import keyboards
+
+
+def get_offset(data: str) -> typing.Optional[int]:
+    # The button of the current page does nothing on the first page.
+    decoded_data = keyboards.callback_data_codec.decode(data)
+
+    return None if decoded_data is None else decoded_data[constants.BUTTON_DATA_OFFSET_KEY]
+
+
+def get_offsets(buttons: keyboards.InlineKeyboardButtons) -> typing.List[typing.List[typing.Optional[int]]]:
+    return [[get_offset(button.callback_data) for button in row] for row in buttons]
+
+
+class DefinitionKeyboardTests(unittest.TestCase):
+    def test_pages_wrap_around(self) -> None:
+        first_page = keyboards.get_definition_keyboard('șarpe', 3, 0, False).get_inline_keyboard_buttons()
+        last_page = keyboards.get_definition_keyboard('șarpe', 3, 2, False).get_inline_keyboard_buttons()
+
+        self.assertEqual([button.text for button in first_page[0]], [constants.PREVIOUS_OVERLAP_PAGE_ICON, '1 / 3', constants.NEXT_PAGE_ICON])
+        self.assertEqual(get_offsets(first_page), [[2, None, 1], [0]])
+
+        self.assertEqual([button.text for button in last_page[0]], [constants.PREVIOUS_PAGE_ICON, '3 / 3', constants.NEXT_OVERLAP_PAGE_ICON])
+        self.assertEqual(get_offsets(last_page), [[1, 0, 0], [2]])
+
+    def test_single_definition_has_only_the_links_toggle(self) -> None:
+        buttons = keyboards.get_definition_keyboard('șarpe', 1, 0, True).get_inline_keyboard_buttons()
+
+        self.assertEqual([[button.text for button in row] for row in buttons], [[constants.LINKS_TOGGLE_ON_TEXT]])
+
+        data = keyboards.callback_data_codec.decode(buttons[0][0].callback_data)
+
+        self.assertEqual(data[constants.BUTTON_DATA_QUERY_KEY], 'șarpe')
+        self.assertFalse(data[constants.BUTTON_DATA_LINKS_TOGGLE_KEY])
+
+    def test_definitions_of_a_query_share_their_template(self) -> None:
+        first_keyboard = keyboards.get_definition_keyboard('șarpe', 3, 0, False)
+        second_keyboard = keyboards.get_definition_keyboard('șarpe', 3, 1, False)
+
+        self.assertIs(first_keyboard.template, second_keyboard.template)
+        self.assertIsNot(first_keyboard.template, keyboards.get_definition_keyboard('șarpe', 3, 0, True).template)
+
+    def test_callback_data_is_encoded_once(self) -> None:
+        template = keyboards.DefinitionKeyboardTemplate('șarpe', 3, False)
+
+        self.assertIs(template.get_callback_data(1), template.get_callback_data(1))
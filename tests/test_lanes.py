@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import typing
+import unittest
+
+import lanes
+
+TIMEOUT = 5
+
+
+def get_lane(name: str, workers: int = 1, max_size: int = 2, yields_to: typing.Optional[lanes.Lane] = None) -> lanes.Lane:
+    return lanes.Lane(name=name, workers=workers, max_size=max_size, yields_to=yields_to)
+
+
+class LaneTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.unblocked = threading.Event()
+
+        # Unblocks the work left, so that the lanes can shut down.
+        self.addCleanup(self.unblocked.set)
+
+    def block(self) -> None:
+        self.unblocked.wait(TIMEOUT)
+
+    def test_full_lane_rejects_work(self) -> None:
+        lane = get_lane('full')
+
+        self.addCleanup(lane.shutdown)
+
+        self.assertTrue(lane.submit(self.block))
+        self.assertTrue(lane.submit(self.block))
+        self.assertFalse(lane.submit(self.block))
+        self.assertTrue(lane.is_backlogged())
+
+        self.unblocked.set()
+        lane.shutdown()
+
+        self.assertEqual(len(lane), 0)
+
+    def test_failed_work_frees_its_place(self) -> None:
+        lane = get_lane('failing', max_size=1)
+
+        self.assertTrue(lane.submit(lambda: 1 / 0))
+
+        lane.shutdown()
+
+        self.assertEqual(len(lane), 0)
+
+    def test_work_yields_to_backlogged_lane(self) -> None:
+        interactive_lane = get_lane('interactive', max_size=10)
+        background_lane = get_lane('background', yields_to=interactive_lane)
+
+        self.addCleanup(interactive_lane.shutdown)
+        self.addCleanup(background_lane.shutdown)
+
+        done = threading.Event()
+
+        interactive_lane.submit(self.block)
+        interactive_lane.submit(self.block)
+
+        self.assertTrue(background_lane.submit(done.set))
+        self.assertFalse(done.wait(0.1))
+
+        # Held back, but still counted, so that the lane fills up.
+        self.assertEqual(len(background_lane), 1)
+
+        self.unblocked.set()
+
+        self.assertTrue(done.wait(TIMEOUT))
+
+    def test_work_runs_when_the_other_lane_isnt_backlogged(self) -> None:
+        interactive_lane = get_lane('interactive')
+        background_lane = get_lane('background', yields_to=interactive_lane)
+
+        self.addCleanup(interactive_lane.shutdown)
+        self.addCleanup(background_lane.shutdown)
+
+        done = threading.Event()
+
+        self.assertTrue(background_lane.submit(done.set))
+        self.assertTrue(done.wait(TIMEOUT))
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+
+import lemmas
+import utils
+
+
+class LemmaIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+
+        self.addCleanup(directory.cleanup)
+
+        words_path = os.path.join(directory.name, 'words.txt')
+        self.lemmas_path = os.path.join(directory.name, 'lemmas.txt')
+
+        with open(words_path, 'w', encoding='utf-8') as words_file:
+            # Unsorted, with duplicates, cedillas and uppercase letters.
+            words_file.write('casă\nCasetă\ncaş\ncasă\n\nşarpe\ncaserolă\nȚară\n')
+
+        self.lemmas_count = lemmas.write_word_list(words_path, self.lemmas_path, utils.normalize_query)
+        self.index = lemmas.LemmaIndex(self.lemmas_path, utils.normalize_query)
+
+    def test_word_list_is_normalized_and_sorted(self) -> None:
+        with open(self.lemmas_path, 'rb') as lemmas_file:
+            lines = lemmas_file.read().splitlines()
+
+        self.assertEqual(self.lemmas_count, 6)
+        self.assertEqual(lines, sorted(lines))
+        self.assertIn('caș'.encode(), lines)
+        self.assertIn('țară'.encode(), lines)
+
+    def test_contains_matches_normalized_spellings(self) -> None:
+        self.assertIn('casă', self.index)
+        self.assertIn('CASĂ', self.index)
+        self.assertIn('caș', self.index)
+        self.assertIn('caş', self.index)
+        self.assertIn('ŞARPE', self.index)
+        self.assertIn('Țară', self.index)
+        self.assertNotIn('cas', self.index)
+        self.assertNotIn('casă mare', self.index)
+
+    def test_completions(self) -> None:
+        self.assertEqual(self.index.get_completions('case', 10), ['caserolă', 'casetă'])
+        self.assertEqual(self.index.get_completions('ŞA', 10), ['șarpe'])
+        self.assertEqual(self.index.get_completions('x', 10), [])
+        self.assertEqual(self.index.get_completions('', 10), [])
+
+    def test_completions_are_in_order_and_limited(self) -> None:
+        completions = self.index.get_completions('ca', 10)
+
+        self.assertEqual(completions, sorted(completions))
+        self.assertEqual(len(self.index.get_completions('ca', 2)), 2)
+        self.assertEqual(self.index.get_completions('ca', 2), completions[:2])
+
+    def test_empty_word_list(self) -> None:
+        open(self.lemmas_path, 'w').close()
+
+        index = lemmas.LemmaIndex(self.lemmas_path, utils.normalize_query)
+
+        self.assertNotIn('casă', index)
+        self.assertEqual(index.get_completions('ca', 10), [])
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import time
+import unittest
+import unittest.mock
+
+import negative_cache
+
+
+def get_cache(max_size: int = 3) -> negative_cache.NegativeCache:
+    return negative_cache.NegativeCache(max_size=max_size, expire_after=datetime.timedelta(minutes=1))
+
+
+class NegativeCacheTests(unittest.TestCase):
+    def test_expired_queries_arent_counted(self) -> None:
+        cache = get_cache()
+        now = time.monotonic()
+
+        with unittest.mock.patch('time.monotonic', return_value=now):
+            cache.add('a')
+
+        with unittest.mock.patch('time.monotonic', return_value=now + 30):
+            cache.add('b')
+
+            # Used last, but still the first one to expire.
+            self.assertIn('a', cache)
+
+        with unittest.mock.patch('time.monotonic', return_value=now + 61):
+            self.assertEqual(len(cache), 1)
+            self.assertEqual(cache.get_recent_queries(10), ['b'])
+            self.assertNotIn('a', cache)
+
+    def test_least_recently_used_query_is_evicted(self) -> None:
+        cache = get_cache(max_size=2)
+
+        cache.add('a')
+        cache.add('b')
+        self.assertIn('a', cache)
+        cache.add('c')
+
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.get_recent_queries(10), ['a', 'c'])
+
+    def test_snapshot_is_loaded_again(self) -> None:
+        cache = get_cache()
+        cache.add('a')
+        cache.add('b')
+
+        loaded_cache = get_cache()
+        loaded_cache.load_snapshot(cache.get_snapshot())
+
+        self.assertEqual(loaded_cache.get_recent_queries(10), ['b', 'a'])
+
+    def test_expired_snapshot_queries_are_skipped(self) -> None:
+        cache = get_cache()
+        cache.load_snapshot([['a', time.time() - 1], ['b', time.time() + 60]])
+
+        self.assertEqual(len(cache), 1)
+        self.assertIn('b', cache)
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import unicodedata
+import unittest
+
+import telegram
+
+import analytics
+import utils
+
+CLI_ARGS = argparse.Namespace(fragment=None, index=None, debug=False)
+
+RAW_DEFINITION = {
+    'id': 42,
+    'index': 0,
+    'htmlRep': '<b>ȘARPE</b>, <i>șerpi</i>, s. m. Reptil fără picioare.',
+    'sourceName': 'DEX \'09',
+    'userNick': 'editor'
+}
+
+
+class QueryNormalizationTests(unittest.TestCase):
+    def test_spellings_share_normalized_query(self) -> None:
+        spellings = ['Șarpe', 'şarpe', 'ŞARPE', ' șarpe  ', '%C8%98arpe', unicodedata.normalize('NFD', 'Șarpe')]
+
+        self.assertEqual({utils.normalize_query(spelling) for spelling in spellings}, {'șarpe'})
+
+    def test_displayed_query_keeps_spelling(self) -> None:
+        self.assertEqual(utils.get_displayed_query(' ŞARPE '), 'ŞARPE')
+        self.assertEqual(utils.get_displayed_query('%C8%98arpe'), 'Șarpe')
+        self.assertEqual(utils.get_displayed_query(unicodedata.normalize('NFD', 'Șarpe')), 'Șarpe')
+        self.assertEqual(utils.get_displayed_query('casă   mare'), 'casă mare')
+
+    def test_displayed_query_isnt_longer(self) -> None:
+        for query in ('ȘARPE', 'Straße', 'İnsulă', 'şarpe'):
+            self.assertLessEqual(len(utils.get_displayed_query(query)), len(utils.normalize_query(query)))
+
+    def test_displayed_definition_links_to_spelling(self) -> None:
+        (definition, links_definition) = utils.get_parsed_definitions(RAW_DEFINITION, utils.get_definition_url('șarpe'), CLI_ARGS, 'bot')
+
+        for rendered_definition in (definition, links_definition):
+            displayed_definition = utils.get_displayed_definition(rendered_definition, 'șarpe', 'Şarpe')
+
+            self.assertEqual(displayed_definition.url, 'https://dexonline.ro/definitie/Şarpe/42')
+            self.assertIn('https://dexonline.ro/definitie/Şarpe/42\n', displayed_definition.html)
+            self.assertNotIn('definitie/șarpe', displayed_definition.html)
+            self.assertEqual(displayed_definition.title, rendered_definition.title)
+
+        self.assertIs(utils.get_displayed_definition(definition, 'șarpe', 'șarpe'), definition)
+
+    def test_cached_definitions_are_shown_with_spelling(self) -> None:
+        self.addCleanup(utils.rendered_definitions_cache.clear)
+
+        utils.rendered_definitions_cache.add('șarpe', 1, {0: utils.get_parsed_definitions(RAW_DEFINITION, utils.get_definition_url('șarpe'), CLI_ARGS, 'bot')})
+
+        update = telegram.Update(update_id=1)
+
+        for spelling in ('ŞARPE', 'Șarpe', 'șarpe'):
+            (definitions, _offset) = utils.get_query_definitions(update, None, spelling, False, analytics.AnalyticsHandler(), CLI_ARGS, 'bot', definition_index=0)
+
+            self.assertEqual(len(definitions), 1)
+            self.assertEqual(definitions[0].url, f'https://dexonline.ro/definitie/{spelling}/42')
+            self.assertEqual(definitions[0].keyboard.template.query, spelling)
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+
+import json
+import unittest
+
+import queue_bot
+
+
+class BroadcastPayloadTests(unittest.TestCase):
+    def test_body_is_the_data_with_the_chat(self) -> None:
+        data = {'text': 'Cuvântul zilei: <b>șarpe</b>', 'parse_mode': 'HTML', 'reply_markup': {'inline_keyboard': [[{'text': '➡', 'callback_data': 'w1'}]]}}
+        payload = queue_bot.BroadcastPayload('sendMessage', data)
+
+        for chat_id in (1, -100123):
+            self.assertEqual(json.loads(payload.get_body(chat_id)), dict(data, chat_id=chat_id))
+
+    def test_empty_data_has_only_the_chat(self) -> None:
+        payload = queue_bot.BroadcastPayload('sendPhoto', {})
+
+        self.assertEqual(json.loads(payload.get_body(1)), {'chat_id': 1})
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+import time
+import unittest
+import unittest.mock
+
+import rate_limits
+
+
+class RateLimiterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = time.monotonic()
+
+        patcher = unittest.mock.patch('time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+
+        self.addCleanup(patcher.stop)
+
+    def test_burst_is_allowed_then_refilled(self) -> None:
+        rate_limiter = rate_limits.RateLimiter(rate=1, burst=3, max_users=10)
+
+        self.assertEqual([rate_limiter.allow(1) for _ in range(4)], [True, True, True, False])
+        self.assertEqual(rate_limiter.throttled_users, 1)
+
+        self.now += 1
+
+        self.assertTrue(rate_limiter.allow(1))
+        self.assertFalse(rate_limiter.allow(1))
+
+    def test_users_have_their_own_buckets(self) -> None:
+        rate_limiter = rate_limits.RateLimiter(rate=1, burst=1, max_users=10)
+
+        self.assertTrue(rate_limiter.allow(1))
+        self.assertFalse(rate_limiter.allow(1))
+        self.assertTrue(rate_limiter.allow(2))
+        self.assertEqual(rate_limiter.throttled_users, 1)
+
+    def test_throttled_users_are_counted_once(self) -> None:
+        rate_limiter = rate_limits.RateLimiter(rate=1, burst=1, max_users=10)
+
+        rate_limiter.allow(1)
+
+        for _ in range(3):
+            rate_limiter.allow(1)
+
+        self.assertEqual(rate_limiter.throttled_users, 1)
+
+        self.now += 1
+
+        self.assertTrue(rate_limiter.allow(1))
+        self.assertEqual(rate_limiter.throttled_users, 0)
+
+    def test_refilled_buckets_are_forgotten(self) -> None:
+        rate_limiter = rate_limits.RateLimiter(rate=1, burst=2, max_users=10)
+
+        rate_limiter.allow(1)
+        rate_limiter.allow(1)
+        rate_limiter.allow(1)
+
+        self.now += 2
+
+        rate_limiter.allow(2)
+
+        self.assertEqual(len(rate_limiter), 1)
+        self.assertEqual(rate_limiter.throttled_users, 0)
+
+    def test_least_recently_used_buckets_are_forgotten_first(self) -> None:
+        rate_limiter = rate_limits.RateLimiter(rate=1, burst=1, max_users=2)
+
+        for user_id in range(5):
+            rate_limiter.allow(user_id)
+
+        self.assertLessEqual(len(rate_limiter), 2)
+
+    def test_known_users_keep_their_buckets_when_full(self) -> None:
+        rate_limiter = rate_limits.RateLimiter(rate=1, burst=1, max_users=2)
+
+        rate_limiter.allow(1)
+        rate_limiter.allow(2)
+
+        # The oldest bucket is the throttled user's own one.
+        self.assertFalse(rate_limiter.allow(1))
+        self.assertFalse(rate_limiter.allow(1))
+        self.assertEqual(len(rate_limiter), 2)
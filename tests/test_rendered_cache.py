@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import os
+import tempfile
+import time
+import unittest
+
+import parsed_definition
+import rendered_cache
+
+
+def get_rendered_definitions(index: int) -> rendered_cache.RenderedDefinitions:
+    url = 'https://dexonline.ro/definitie/șarpe'
+
+    return (
+        parsed_definition.ParsedDefinition(index=index, title='șarpe', text=f'{index}', footer=f'\n\n{url}', url=url),
+        parsed_definition.ParsedDefinition(index=index, title='șarpe', text=f'<a>{index}</a>', footer=f'\n\n{url}', url=url)
+    )
+
+
+def get_cache(max_size: int = 2) -> rendered_cache.RenderedCache:
+    return rendered_cache.RenderedCache(max_size=max_size, expire_after=datetime.timedelta(hours=1))
+
+
+class RenderedCacheTests(unittest.TestCase):
+    def test_definitions_are_merged_by_count(self) -> None:
+        cache = get_cache()
+
+        cache.add('șarpe', 3, {0: get_rendered_definitions(0)})
+        cache.add('șarpe', 3, {1: get_rendered_definitions(1)})
+
+        rendered_query = cache.get('șarpe')
+
+        self.assertEqual(sorted(rendered_query.definitions), [0, 1])
+        self.assertTrue(rendered_query.has_definitions(0, 2))
+        self.assertFalse(rendered_query.has_definitions(0, 3))
+
+        cache.add('șarpe', 4, {2: get_rendered_definitions(2)})
+
+        self.assertEqual(sorted(cache.get('șarpe').definitions), [2])
+
+    def test_least_recently_used_query_is_evicted(self) -> None:
+        cache = get_cache()
+
+        cache.add('a', 1, {0: get_rendered_definitions(0)})
+        cache.add('b', 1, {0: get_rendered_definitions(0)})
+        cache.get('a')
+        cache.add('c', 1, {0: get_rendered_definitions(0)})
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+
+    def test_snapshot_is_loaded_again(self) -> None:
+        cache = get_cache()
+        cache.add('șarpe', 2, {0: get_rendered_definitions(0)})
+
+        loaded_cache = get_cache()
+        loaded_cache.load_snapshot(cache.get_snapshot())
+
+        self.assertEqual(loaded_cache.get('șarpe').definitions, cache.get('șarpe').definitions)
+
+
+class RenderedStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        (file, self.location) = tempfile.mkstemp(suffix='.sqlite')
+
+        os.close(file)
+
+        self.addCleanup(os.remove, self.location)
+
+    def get_shared_cache(self) -> rendered_cache.RenderedCache:
+        cache = get_cache()
+        cache.store = rendered_cache.RenderedStore(self.location)
+
+        return cache
+
+    def test_workers_share_the_rendered_definitions(self) -> None:
+        first_worker_cache = self.get_shared_cache()
+        second_worker_cache = self.get_shared_cache()
+
+        first_worker_cache.add('șarpe', 3, {0: get_rendered_definitions(0)})
+        first_worker_cache.add('șarpe', 3, {1: get_rendered_definitions(1)})
+
+        rendered_query = second_worker_cache.get('șarpe')
+
+        self.assertEqual(rendered_query.definitions_count, 3)
+        self.assertEqual(rendered_query.definitions, first_worker_cache.get('șarpe').definitions)
+        self.assertLessEqual(rendered_query.expiration_time, first_worker_cache.get('șarpe').expiration_time + 1)
+
+    def test_discard_forgets_the_shared_definitions(self) -> None:
+        first_worker_cache = self.get_shared_cache()
+        second_worker_cache = self.get_shared_cache()
+
+        first_worker_cache.add('șarpe', 1, {0: get_rendered_definitions(0)})
+
+        self.assertTrue(second_worker_cache.discard('șarpe'))
+        self.assertIsNone(get_cache().get('șarpe'))
+        self.assertIsNone(first_worker_cache.store.get('șarpe'))
+
+    def test_definitions_of_another_count_are_replaced(self) -> None:
+        store = rendered_cache.RenderedStore(self.location)
+        expiration_timestamp = time.time() + 60
+
+        store.add('șarpe', 3, {0: get_rendered_definitions(0), 1: get_rendered_definitions(1)}, expiration_timestamp)
+        store.add('șarpe', 4, {2: get_rendered_definitions(2)}, expiration_timestamp)
+
+        rendered_query = store.get('șarpe')
+
+        self.assertEqual(rendered_query.definitions_count, 4)
+        self.assertEqual(sorted(rendered_query.definitions), [2])
+
+    def test_trim_deletes_the_expired_and_the_oldest_queries(self) -> None:
+        store = rendered_cache.RenderedStore(self.location)
+        now = time.time()
+
+        store.add('expired', 1, {0: get_rendered_definitions(0)}, now - 1)
+        store.add('older', 1, {0: get_rendered_definitions(0)}, now + 60)
+        store.add('newer', 2, {0: get_rendered_definitions(0), 1: get_rendered_definitions(1)}, now + 120)
+
+        self.assertIsNone(store.get('expired'))
+        self.assertEqual(store.trim(1), 2)
+        self.assertEqual(len(store), 1)
+        self.assertIsNotNone(store.get('newer'))
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import unittest
+
+import lxml.html
+import telegram
+
+import constants
+import utils
+
+CLI_ARGS = argparse.Namespace(fragment=None, index=None, debug=False)
+
+RAW_DEFINITION = {
+    'id': 42,
+    'index': 0,
+    'htmlRep': '<b>ȘARPE</b>, <i>șerpi</i>, s. m. Reptil fără picioare.',
+    'sourceName': 'DEX \'09',
+    'userNick': 'editor'
+}
+
+
+class DualVariantRenderingTests(unittest.TestCase):
+    def test_variants_are_rendered_together(self) -> None:
+        (definition, links_definition) = utils.get_parsed_definitions(RAW_DEFINITION, utils.get_definition_url('șarpe'), CLI_ARGS, 'bot')
+
+        self.assertEqual(lxml.html.fragment_fromstring(definition.text, create_parent=True).text_content(), 'ȘARPE, șerpi, s. m. Reptil fără picioare.')
+        self.assertNotIn('<a ', definition.text)
+
+        self.assertIn(utils.get_word_link('Reptil', 'bot'), links_definition.text)
+        self.assertIn(utils.get_word_link('picioare', 'bot'), links_definition.text)
+
+        self.assertIs(definition.footer, links_definition.footer)
+        self.assertEqual(definition.url, 'https://dexonline.ro/definitie/șarpe/42')
+
+    def test_long_variants_are_truncated_before_the_footer(self) -> None:
+        raw_definition = dict(RAW_DEFINITION, htmlRep='<i>cuvânt lung</i> ' * 1000)
+
+        # The limit is on the text, without the tags.
+        for definition in utils.get_parsed_definitions(raw_definition, utils.get_definition_url('șarpe'), CLI_ARGS, 'bot'):
+            text_content = lxml.html.fragment_fromstring(definition.html, create_parent=True).text_content()
+
+            self.assertLessEqual(len(text_content), telegram.constants.MAX_MESSAGE_LENGTH)
+            self.assertTrue(definition.text.endswith(constants.ELLIPSIS))
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+import io
+import itertools
+import os
+import tempfile
+import typing
+import unittest
+import unittest.mock
+
+import requests
+import requests_cache.backends.sqlite
+
+import response_cache
+
+BASE_URL = 'https://dexonline.ro/definitie'
+
+
+def get_response(url: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.raw = io.BytesIO(b'')
+    response.request = requests.Request('GET', url).prepare()
+
+    # The same size for all the responses.
+    response._content = b'{"definitions": []}'
+
+    return response
+
+
+class BoundedResponseCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.location = os.path.join(tempfile.mkdtemp(dir='.'), 'cache')
+
+        # Each access is later than the previous one.
+        clock = itertools.count(1000)
+        patcher = unittest.mock.patch('time.time', side_effect=lambda: float(next(clock)))
+        patcher.start()
+
+        self.addCleanup(patcher.stop)
+
+    def save_responses(self, cache: requests_cache.backends.sqlite.DbCache, *words: str) -> None:
+        for word in words:
+            response = get_response(f'{BASE_URL}/{word}/json')
+
+            cache.save_response(cache.create_key(response.request), response)
+
+    def access(self, cache: response_cache.BoundedResponseCache, word: str) -> None:
+        (response, _timestamp) = cache.get_response_and_time(cache.create_key(get_response(f'{BASE_URL}/{word}/json').request))
+
+        self.assertIsNotNone(response)
+
+    def get_cached_words(self, cache: response_cache.BoundedResponseCache) -> typing.List[str]:
+        return sorted(word for word in ('a', 'b', 'c') if cache.has_url(f'{BASE_URL}/{word}/json'))
+
+    def evict_one(self, cache: response_cache.BoundedResponseCache, eviction_policy: response_cache.EvictionPolicy) -> int:
+        return cache.evict(cache.get_size() - 1, 1, eviction_policy)
+
+    def test_least_recently_used_response_is_evicted(self) -> None:
+        cache = response_cache.BoundedResponseCache(self.location)
+
+        self.save_responses(cache, 'a', 'b', 'c')
+        self.access(cache, 'a')
+
+        self.assertEqual(self.evict_one(cache, response_cache.EvictionPolicy.LEAST_RECENTLY_USED), 1)
+        self.assertEqual(self.get_cached_words(cache), ['a', 'c'])
+
+    def test_least_frequently_used_response_is_evicted(self) -> None:
+        cache = response_cache.BoundedResponseCache(self.location)
+
+        self.save_responses(cache, 'a', 'b', 'c')
+        self.access(cache, 'b')
+        self.access(cache, 'c')
+
+        self.assertEqual(self.evict_one(cache, response_cache.EvictionPolicy.LEAST_FREQUENTLY_USED), 1)
+        self.assertEqual(self.get_cached_words(cache), ['b', 'c'])
+
+    def test_cache_under_its_size_isnt_evicted(self) -> None:
+        cache = response_cache.BoundedResponseCache(self.location)
+
+        self.save_responses(cache, 'a', 'b')
+
+        self.assertEqual(cache.evict(cache.get_size(), 0.5, response_cache.EvictionPolicy.LEAST_RECENTLY_USED), 0)
+        self.assertEqual(cache.get_entries_count(), 2)
+
+    def test_accesses_are_flushed_as_hits(self) -> None:
+        cache = response_cache.BoundedResponseCache(self.location)
+
+        self.save_responses(cache, 'a', 'b')
+        self.access(cache, 'b')
+        self.access(cache, 'b')
+
+        self.assertEqual([(entry.url, entry.hits) for entry in cache.get_top_entries(1)], [(f'{BASE_URL}/b/json', 2)])
+
+    def test_purge_deletes_the_matching_responses(self) -> None:
+        cache = response_cache.BoundedResponseCache(self.location)
+
+        self.save_responses(cache, 'a', 'b', 'c')
+
+        self.assertEqual(cache.purge(f'{BASE_URL}/[ab]/json'), [f'{BASE_URL}/a/json', f'{BASE_URL}/b/json'])
+        self.assertEqual(self.get_cached_words(cache), ['c'])
+        self.assertEqual(cache.get_entries_count(), 1)
+
+    def test_responses_cached_before_the_entries_are_tracked(self) -> None:
+        self.save_responses(requests_cache.backends.sqlite.DbCache(location=self.location), 'a', 'b')
+
+        cache = response_cache.BoundedResponseCache(self.location)
+
+        self.assertEqual(cache.get_entries_count(), 2)
+        self.assertEqual(cache.get_top_entries(10), [])
+        self.assertEqual(cache.fill_urls(10), 2)
+        self.assertEqual(sorted(entry.url for entry in cache.get_top_entries(10)), [f'{BASE_URL}/a/json', f'{BASE_URL}/b/json'])
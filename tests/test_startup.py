@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+import builtins
+import sys
+import unittest
+
+import database
+import startup
+
+
+class StartupTests(unittest.TestCase):
+    def test_applied_migrations_arent_pending(self) -> None:
+        self.assertEqual(database.get_pending_migrations(), [])
+
+    def test_imports_are_timed_by_package(self) -> None:
+        original_import = builtins.__import__
+
+        sys.modules.pop('colorsys', None)
+
+        timer = startup.ImportTimer()
+        timer.start()
+
+        try:
+            import colorsys
+        finally:
+            timer.stop()
+
+        self.assertIs(builtins.__import__, original_import)
+        self.assertIn('colorsys', timer.durations)
+        self.assertTrue(callable(colorsys.rgb_to_hsv))
+
+    def test_startup_is_completed_once(self) -> None:
+        report = startup.StartupReport()
+        report.finish_imports()
+
+        self.assertTrue(report.complete('First update'))
+        self.assertFalse(report.complete('First update'))
+        self.assertTrue(report.is_complete)
+        self.assertIn('First update', report.get_text(5))
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import os
+import tempfile
+import unittest
+
+import lemmas
+import utils
+
+
+class QuerySuggestionsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+
+        self.addCleanup(directory.cleanup)
+
+        words_path = os.path.join(directory.name, 'words.txt')
+        lemmas_path = os.path.join(directory.name, 'lemmas.txt')
+
+        with open(words_path, 'w', encoding='utf-8') as words_file:
+            words_file.write('casă\ncasetă\ncaserolă\ncasetofon\n')
+
+        lemmas.write_word_list(words_path, lemmas_path, utils.normalize_query)
+
+        self.index = lemmas.LemmaIndex(lemmas_path, utils.normalize_query)
+        self.cli_args = argparse.Namespace(fragment=None, index=None, debug=False)
+
+        self.addCleanup(utils.negative_results_cache.clear)
+        self.addCleanup(utils.rendered_definitions_cache.clear)
+
+    def test_lemma_isnt_suggestible(self) -> None:
+        self.assertFalse(utils.is_query_suggestible('casă', self.index))
+        self.assertFalse(utils.is_query_suggestible('Casă', self.index))
+
+    def test_partial_word_is_suggestible(self) -> None:
+        self.assertTrue(utils.is_query_suggestible('case', self.index))
+
+    def test_looked_up_word_isnt_suggestible(self) -> None:
+        utils.rendered_definitions_cache.add('case', 1, {})
+
+        self.assertFalse(utils.is_query_suggestible('case', self.index))
+        self.assertFalse(utils.is_query_suggestible('CASE', self.index))
+
+    def test_word_without_definitions_is_suggestible(self) -> None:
+        utils.rendered_definitions_cache.add('case', 1, {})
+        utils.negative_results_cache.add('case')
+
+        self.assertTrue(utils.is_query_suggestible('case', self.index))
+
+    def test_suggestions_are_strict_completions(self) -> None:
+        suggestions = utils.get_query_suggestions('case', self.index, self.cli_args, 'bot')
+
+        self.assertEqual([suggestion.title for suggestion in suggestions], ['caserolă', 'casetofon', 'casetă'])
+
+        suggestions = utils.get_query_suggestions('casetă', self.index, self.cli_args, 'bot')
+
+        self.assertEqual(suggestions, [])
+
+    def test_suggestion_ids_are_stable(self) -> None:
+        first_ids = [suggestion.id for suggestion in utils.get_query_suggestions('case', self.index, self.cli_args, 'bot')]
+        second_ids = [suggestion.id for suggestion in utils.get_query_suggestions('CASE', self.index, self.cli_args, 'bot')]
+
+        self.assertEqual(first_ids, second_ids)
+        self.assertEqual(len(set(first_ids)), len(first_ids))
+
+    def test_short_queries_have_no_suggestions(self) -> None:
+        self.assertEqual(utils.get_query_suggestions('c', self.index, self.cli_args, 'bot'), [])
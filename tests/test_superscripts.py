@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+import lxml.html
+
+import utils
+
+
+class SuperscriptTests(unittest.TestCase):
+    def test_digits_and_signs_are_converted(self) -> None:
+        self.assertEqual(utils.get_superscript('12'), '¹²')
+        self.assertEqual(utils.get_superscript('(-3)'), '⁽⁻³⁾')
+
+    def test_brackets_are_aliases_of_parentheses(self) -> None:
+        self.assertEqual(utils.get_superscript('[2]'), '⁽²⁾')
+
+    def test_letters_use_their_lowercase_variant(self) -> None:
+        self.assertEqual(utils.get_superscript('A'), 'ᵃ')
+        self.assertEqual(utils.get_superscript('Ab'), 'ᵃᵇ')
+
+    def test_unsupported_text_isnt_converted(self) -> None:
+        self.assertIsNone(utils.get_superscript('q'))
+        self.assertIsNone(utils.get_superscript('2q'))
+
+    def test_superscript_element_is_replaced(self) -> None:
+        sup = lxml.html.fragment_fromstring('<sup>2</sup>')
+
+        utils.replace_superscript(sup, 'https://dexonline.ro/definitie/șarpe/42')
+
+        self.assertEqual(sup.text, '²')
+
+    def test_unsupported_superscript_element_is_kept(self) -> None:
+        sup = lxml.html.fragment_fromstring('<sup>q</sup>')
+
+        utils.replace_superscript(sup, 'https://dexonline.ro/definitie/șarpe/42')
+
+        self.assertEqual(sup.text, 'q')
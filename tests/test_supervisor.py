@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+import supervisor
+
+USER = {'id': 1}
+GROUP = {'id': -100}
+
+
+class PartitionKeyTests(unittest.TestCase):
+    def test_messages_are_partitioned_by_chat(self) -> None:
+        update = {'update_id': 5, 'message': {'from': USER, 'chat': GROUP, 'text': 'șarpe'}}
+
+        self.assertEqual(supervisor.get_partition_key(update), GROUP['id'])
+
+    def test_inline_queries_are_partitioned_by_user(self) -> None:
+        update = {'update_id': 5, 'inline_query': {'from': USER, 'query': 'șarpe'}}
+
+        self.assertEqual(supervisor.get_partition_key(update), USER['id'])
+
+    def test_callback_queries_are_partitioned_by_user(self) -> None:
+        update = {'update_id': 5, 'callback_query': {'from': USER, 'message': {'chat': GROUP}, 'data': 'p1'}}
+
+        self.assertEqual(supervisor.get_partition_key(update), USER['id'])
+
+    def test_private_chats_keep_their_updates_together(self) -> None:
+        message = {'update_id': 5, 'message': {'from': USER, 'chat': USER}}
+        callback_query = {'update_id': 6, 'callback_query': {'from': USER, 'message': {'chat': USER}}}
+
+        self.assertEqual(supervisor.get_partition_key(message), supervisor.get_partition_key(callback_query))
+
+    def test_updates_without_a_sender_fall_back_to_their_id(self) -> None:
+        self.assertEqual(supervisor.get_partition_key({'update_id': 5, 'poll': {'id': 'poll'}}), 5)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import os
+import tempfile
+import time
+import unittest
+import unittest.mock
+
+import updates
+
+
+def get_recent_updates(max_size: int = 3) -> updates.RecentUpdates:
+    return updates.RecentUpdates(max_size=max_size, expire_after=datetime.timedelta(minutes=1))
+
+
+class RecentUpdatesTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.path = os.path.join(tempfile.mkdtemp(dir='.'), 'updates.json')
+
+    def test_redelivered_updates_are_recognized(self) -> None:
+        recent_updates = get_recent_updates()
+
+        self.assertTrue(recent_updates.add(1))
+        self.assertFalse(recent_updates.add(1))
+        self.assertTrue(recent_updates.add(2))
+
+    def test_expired_updates_are_received_again(self) -> None:
+        recent_updates = get_recent_updates()
+        now = time.time()
+
+        with unittest.mock.patch('time.time', return_value=now):
+            recent_updates.add(1)
+
+        with unittest.mock.patch('time.time', return_value=now + 61):
+            self.assertTrue(recent_updates.add(1))
+
+    def test_oldest_updates_are_forgotten(self) -> None:
+        recent_updates = get_recent_updates(max_size=2)
+
+        for update_id in range(3):
+            recent_updates.add(update_id)
+
+        self.assertEqual(len(recent_updates), 2)
+        self.assertTrue(recent_updates.add(0))
+
+    def test_saved_updates_are_recognized_after_a_restart(self) -> None:
+        recent_updates = get_recent_updates()
+        recent_updates.add(1)
+        recent_updates.save(self.path)
+
+        restarted_updates = get_recent_updates()
+        restarted_updates.load(self.path)
+
+        self.assertFalse(restarted_updates.add(1))
+        self.assertTrue(restarted_updates.add(2))
+
+    def test_missing_or_invalid_file_is_ignored(self) -> None:
+        recent_updates = get_recent_updates()
+        recent_updates.load(self.path)
+
+        with open(self.path, 'w') as file:
+            file.write('{')
+
+        recent_updates.load(self.path)
+
+        self.assertEqual(len(recent_updates), 0)
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import datetime
+import threading
+import unittest
+
+import telegram
+
+import webhook_replies
+
+
+def get_replies(deadline: datetime.timedelta = datetime.timedelta(seconds=5)) -> webhook_replies.WebhookReplies:
+    return webhook_replies.WebhookReplies(deadline, lambda update: update.update_id > 0)
+
+
+class WebhookRepliesTests(unittest.TestCase):
+    def test_reply_offered_in_time_is_returned(self) -> None:
+        replies = get_replies()
+        future = replies.expect(telegram.Update(1))
+
+        threading.Timer(0.01, lambda: self.assertTrue(replies.offer(1, 'answerInlineQuery', {'results': '[]'}))).start()
+
+        self.assertEqual(asyncio.run(replies.wait(1, future)), {'method': 'answerInlineQuery', 'results': '[]'})
+
+    def test_late_reply_is_refused(self) -> None:
+        replies = get_replies(datetime.timedelta(milliseconds=10))
+        future = replies.expect(telegram.Update(1))
+
+        self.assertIsNone(asyncio.run(replies.wait(1, future)))
+        self.assertFalse(replies.offer(1, 'sendMessage', {'text': 'șarpe'}))
+
+    def test_finished_handler_without_reply_isnt_waited_for(self) -> None:
+        replies = get_replies()
+        future = replies.expect(telegram.Update(1))
+
+        replies.finish(1)
+
+        self.assertIsNone(asyncio.run(replies.wait(1, future)))
+
+    def test_redelivered_update_gets_no_reply(self) -> None:
+        replies = get_replies()
+
+        self.assertIsNotNone(replies.expect(telegram.Update(1)))
+        self.assertIsNone(replies.expect(telegram.Update(1)))
+
+    def test_unexpected_reply_isnt_waited_for(self) -> None:
+        replies = get_replies()
+
+        self.assertIsNone(replies.expect(telegram.Update(0)))
+        self.assertFalse(replies.offer(0, 'sendMessage', {}))
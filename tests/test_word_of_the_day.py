@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+import database
+import parsed_definition
+
+DATE = '2021/06/01'
+
+
+class WordOfTheDayTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.addCleanup(lambda: database.WordOfTheDay.delete().where(database.WordOfTheDay.date == DATE).execute())
+
+        self.requested_records = 0
+
+    def get_record(self) -> str:
+        self.requested_records += 1
+
+        return '{"day": 1}'
+
+    def test_record_is_requested_once_for_each_date(self) -> None:
+        first_word_of_the_day = database.WordOfTheDay.get_or_create_for_date(DATE, self.get_record)
+        second_word_of_the_day = database.WordOfTheDay.get_or_create_for_date(DATE, self.get_record)
+
+        self.assertEqual(self.requested_records, 1)
+        self.assertEqual(second_word_of_the_day.rowid, first_word_of_the_day.rowid)
+        self.assertEqual(second_word_of_the_day.record, '{"day": 1}')
+
+    def test_rendered_definitions_are_stored(self) -> None:
+        definition = parsed_definition.ParsedDefinition(index=0, title='șarpe', text='șarpe', footer='\n\nsursa', url='https://dexonline.ro/definitie/șarpe/42')
+        links_definition = parsed_definition.ParsedDefinition(index=0, title='șarpe', text='<a>șarpe</a>', footer='\n\nsursa', url=definition.url)
+
+        database.WordOfTheDay.get_or_create_for_date(DATE, self.get_record).save_definitions(definition.serialize(), links_definition.serialize())
+
+        word_of_the_day = database.WordOfTheDay.get_or_create_for_date(DATE, self.get_record)
+
+        self.assertEqual(parsed_definition.ParsedDefinition.deserialize(word_of_the_day.definition), definition)
+        self.assertEqual(parsed_definition.ParsedDefinition.deserialize(word_of_the_day.links_definition), links_definition)
+